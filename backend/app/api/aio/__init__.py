@@ -0,0 +1,7 @@
+"""
+Async handlers for the application, pipeline and run routes (ASYNC_DB=true)
+
+They serve the same paths and models as their sync counterparts in app/api,
+using an AsyncSession so requests don't go through Starlette's threadpool.
+Less frequent operations reuse the sync services through `AsyncSession.run_sync`.
+"""
@@ -0,0 +1,69 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models import LoanApplicationCreate, LoanApplicationResponse
+from app.db_models import LoanApplication
+from app.services import idempotency
+
+router = APIRouter(prefix="/api/applications", tags=["applications"])
+
+
+@router.post("", response_model=LoanApplicationResponse, status_code=201)
+async def create_application_async(
+    application: LoanApplicationCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new loan application. Retries carrying the same Idempotency-Key header get the first one back."""
+    if idempotency_key:
+        try:
+            application_id = await db.run_sync(
+                idempotency.begin, "applications", idempotency_key, application.model_dump()
+            )
+        except idempotency.IdempotencyKeyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except idempotency.IdempotencyKeyInProgress as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if application_id is not None:
+            response.status_code = 200
+            response.headers["Idempotent-Replayed"] = "true"
+            return await db.get(LoanApplication, application_id)
+
+    try:
+        db_application = LoanApplication(**application.model_dump(), status="PENDING")
+        db.add(db_application)
+        await db.commit()
+        await db.refresh(db_application)
+    except Exception as e:
+        if idempotency_key:
+            await db.run_sync(idempotency.abandon, "applications", idempotency_key)
+        raise HTTPException(status_code=500, detail=f"Application could not be saved: {str(e)}")
+    if idempotency_key:
+        await db.run_sync(idempotency.complete, "applications", idempotency_key, db_application.id)
+    return db_application
+
+
+@router.get("", response_model=List[LoanApplicationResponse])
+async def list_applications_async(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List all loan applications"""
+    result = await db.execute(select(LoanApplication).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/{application_id}", response_model=LoanApplicationResponse)
+async def get_application_async(
+    application_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific loan application"""
+    application = await db.get(LoanApplication, application_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return application
@@ -0,0 +1,66 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models import PipelineCreate, PipelineUpdate, PipelineResponse
+from app.db_models import Pipeline
+from app.services import run_summary
+from app.api.pipelines import _apply_update, _new_pipeline, _pipeline_to_response
+
+router = APIRouter(prefix="/api/pipelines", tags=["pipelines"])
+
+
+@router.post("", response_model=PipelineResponse, status_code=201)
+async def create_pipeline_async(
+    pipeline: PipelineCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new pipeline"""
+    db_pipeline = _new_pipeline(pipeline)
+    db.add(db_pipeline)
+    await db.commit()
+    await db.refresh(db_pipeline)
+    return _pipeline_to_response(db_pipeline)
+
+
+@router.get("", response_model=List[PipelineResponse])
+async def list_pipelines_async(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List all pipelines"""
+    result = await db.execute(select(Pipeline).offset(skip).limit(limit))
+    return [_pipeline_to_response(p) for p in result.scalars()]
+
+
+@router.get("/{pipeline_id}", response_model=PipelineResponse)
+async def get_pipeline_async(
+    pipeline_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific pipeline"""
+    pipeline = await db.get(Pipeline, pipeline_id)
+    if not pipeline:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return _pipeline_to_response(pipeline)
+
+
+@router.put("/{pipeline_id}", response_model=PipelineResponse)
+async def update_pipeline_async(
+    pipeline_id: int,
+    pipeline_update: PipelineUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update a pipeline"""
+    db_pipeline = await db.get(Pipeline, pipeline_id)
+    if not db_pipeline:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+
+    _apply_update(db_pipeline, pipeline_update)
+    if pipeline_update.name is not None:
+        await db.run_sync(run_summary.rename_pipeline, pipeline_id, pipeline_update.name)
+    await db.commit()
+    await db.refresh(db_pipeline)
+    return _pipeline_to_response(db_pipeline)
@@ -0,0 +1,101 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_async_db
+from app.models import RunRequest, RunResponse
+from app.db_models import PipelineRun
+from app.services import AsyncPipelineExecutor, PipelineExecutor, idempotency, run_archive
+from app.services.shadow import shadow_runner
+from app.api.runs import _load_run, _run_to_response
+
+router = APIRouter(prefix="/api/runs", tags=["runs"])
+
+
+@router.post("", response_model=RunResponse, status_code=201)
+async def execute_pipeline_async(
+    run_request: RunRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Execute a pipeline on a loan application
+
+    Same contract as the sync route: Idempotency-Key replays and `reuse`
+    answer 200, and new runs of a pipeline with a challenger queue a shadow run.
+    """
+    if idempotency_key:
+        try:
+            run_id = await db.run_sync(
+                idempotency.begin, "runs", idempotency_key, run_request.model_dump(), idempotency.run_lease_seconds()
+            )
+        except idempotency.IdempotencyKeyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except idempotency.IdempotencyKeyInProgress as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if run_id is not None:
+            response.status_code = 200
+            response.headers["Idempotent-Replayed"] = "true"
+            return _run_to_response(await db.run_sync(_load_run, run_id))
+
+    try:
+        run = None
+        if run_request.reuse:
+            run = await db.run_sync(
+                lambda session: PipelineExecutor(session).find_reusable_run(
+                    run_request.application_id, run_request.pipeline_id
+                )
+            )
+        reused = run is not None
+        if not reused:
+            run = await AsyncPipelineExecutor(db).execute(
+                run_request.application_id,
+                run_request.pipeline_id,
+                run_request.timeout_ms,
+                settings.idempotency_run_timeout_ms if idempotency_key else None
+            )
+    except ValueError as e:
+        if idempotency_key:
+            await db.run_sync(idempotency.abandon, "runs", idempotency_key)
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        if idempotency_key:
+            await db.run_sync(idempotency.abandon, "runs", idempotency_key)
+        raise HTTPException(status_code=500, detail=f"Pipeline execution failed: {str(e)}")
+
+    if idempotency_key:
+        await db.run_sync(idempotency.complete, "runs", idempotency_key, run.id)
+    if reused:
+        response.status_code = 200
+    else:
+        await db.run_sync(shadow_runner.submit_for, run)
+    return _run_to_response(run, reused)
+
+
+@router.get("", response_model=List[RunResponse])
+async def list_runs_async(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List all pipeline runs (history)"""
+    result = await db.execute(
+        select(PipelineRun).order_by(PipelineRun.executed_at.desc()).offset(skip).limit(limit)
+    )
+    return [_run_to_response(r) for r in result.scalars()]
+
+
+@router.get("/{run_id}", response_model=RunResponse)
+async def get_run_async(
+    run_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific pipeline run, from the hot table or the run archive"""
+    run = await db.get(PipelineRun, run_id)
+    if not run:
+        run = await db.run_sync(run_archive.load_run, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _run_to_response(run)
@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services import analytics
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+@router.get("")
+def get_analytics(
+    pipeline_id: Optional[int] = None,
+    country: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get decision analytics: runs and approval rates overall and by country,
+    pipeline and day, mean DTI and risk, and DTI/risk histograms
+
+    Served from rollups maintained as runs are written, so the cost does not
+    grow with the number of runs. Days are UTC and `start`/`end` inclusive.
+    """
+    return analytics.summarize(db, pipeline_id, country, start, end)
@@ -1,9 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import LoanApplicationCreate, LoanApplicationResponse
+from app.models import LoanApplicationCreate, LoanApplicationResponse, RunResponse
 from app.db_models import LoanApplication
+from app.services import idempotency, run_history
+from app.api.runs import _run_to_response
 
 router = APIRouter(prefix="/api/applications", tags=["applications"])
 
@@ -11,21 +13,42 @@ router = APIRouter(prefix="/api/applications", tags=["applications"])
 @router.post("", response_model=LoanApplicationResponse, status_code=201)
 def create_application(
     application: LoanApplicationCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db)
 ):
-    """Create a new loan application"""
-    db_application = LoanApplication(
-        applicant_name=application.applicant_name,
-        amount=application.amount,
-        monthly_income=application.monthly_income,
-        declared_debts=application.declared_debts,
-        country=application.country,
-        loan_purpose=application.loan_purpose,
-        status="PENDING"
-    )
-    db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    """Create a new loan application. Retries carrying the same Idempotency-Key header get the first one back."""
+    if idempotency_key:
+        try:
+            application_id = idempotency.begin(db, "applications", idempotency_key, application.model_dump())
+        except idempotency.IdempotencyKeyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except idempotency.IdempotencyKeyInProgress as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if application_id is not None:
+            response.status_code = 200
+            response.headers["Idempotent-Replayed"] = "true"
+            return db.query(LoanApplication).filter(LoanApplication.id == application_id).first()
+
+    try:
+        db_application = LoanApplication(
+            applicant_name=application.applicant_name,
+            amount=application.amount,
+            monthly_income=application.monthly_income,
+            declared_debts=application.declared_debts,
+            country=application.country,
+            loan_purpose=application.loan_purpose,
+            status="PENDING"
+        )
+        db.add(db_application)
+        db.commit()
+        db.refresh(db_application)
+    except Exception as e:
+        if idempotency_key:
+            idempotency.abandon(db, "applications", idempotency_key)
+        raise HTTPException(status_code=500, detail=f"Application could not be saved: {str(e)}")
+    if idempotency_key:
+        idempotency.complete(db, "applications", idempotency_key, db_application.id)
     return db_application
 
 
@@ -52,3 +75,16 @@ def get_application(
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     return application
+
+
+@router.get("/{application_id}/runs", response_model=List[RunResponse])
+def list_application_runs(
+    application_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """List an application's runs, newest first"""
+    if db.get(LoanApplication, application_id) is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return [_run_to_response(r) for r in run_history.application_runs(db, application_id, skip, limit)]
@@ -0,0 +1,38 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services import export
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+@router.get("/applications")
+def export_applications(
+    format: Literal["parquet", "arrow"] = "parquet",
+    pipeline_id: Optional[int] = Query(None, description="Join each application's latest run of this pipeline"),
+    batch_size: int = Query(10000, ge=1, le=100000, description="Applications per row group / record batch"),
+    db: Session = Depends(get_db)
+):
+    """
+    Export applications joined with their latest run as Parquet or an Arrow IPC stream
+
+    One row per application, with typed columns for every step output
+    (`{step_type}_{value}`) and `{step_type}_passed`; applications without a
+    run have nulls there. The file is streamed one row group (Parquet) or
+    record batch (Arrow) at a time, so memory stays bounded by `batch_size`.
+    """
+    try:
+        stream = export.export_stream(db, format, pipeline_id, batch_size)
+    except export.ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    media_type, extension = export.FORMATS[format]
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="applications.{extension}"'}
+    )
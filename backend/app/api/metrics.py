@@ -0,0 +1,66 @@
+from fastapi import APIRouter
+from app.config import settings
+from app.metrics import metrics
+from app.sentiment import openai_guard
+from app.services.shadow import shadow_runner
+from app.services.sweeper import sweeper_metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/runs")
+def get_run_metrics():
+    """Get run counts, reused runs, how often steps timed out or degraded to meet the deadline, and steps skipped by short-circuiting"""
+    total = metrics.get("runs.total")
+    degraded = metrics.get("runs.degraded")
+    return {
+        "runs_total": int(total),
+        "runs_degraded": int(degraded),
+        "degradation_rate": round(degraded / total, 4) if total else 0.0,
+        "runs_reused": int(metrics.get("runs.reused")),
+        "steps_degraded": {k: int(v) for k, v in metrics.snapshot("runs.steps_degraded.").items()},
+        "steps_timed_out": {k: int(v) for k, v in metrics.snapshot("runs.steps_timed_out.").items()},
+        "steps_skipped": {k: int(v) for k, v in metrics.snapshot("runs.steps_skipped.").items()},
+    }
+
+
+@router.get("/llm")
+def get_llm_metrics():
+    """Get OpenAI guard state: circuit breaker, adaptive concurrency and rate limit"""
+    return openai_guard.state()
+
+
+@router.get("/sentiment")
+def get_sentiment_metrics():
+    """Get sentiment cascade counters: calls and latency per tier, which tier decided, LLM calls avoided"""
+    tiers = {}
+    for tier in ("keywords", "local_model", "llm"):
+        calls = metrics.get(f"sentiment.tier.{tier}.calls")
+        seconds = metrics.get(f"sentiment.tier.{tier}.seconds")
+        tiers[tier] = {
+            "calls": int(calls),
+            "mean_latency_ms": round(seconds / calls * 1000, 4) if calls else 0.0,
+        }
+    decided = {k: int(v) for k, v in metrics.snapshot("sentiment.cascade.decided.").items()}
+    return {
+        "tiers": tiers,
+        "decided": decided,
+        # Every cascade decision that did not reach the provider
+        "llm_calls_avoided": sum(decided.values()) - tiers["llm"]["calls"],
+    }
+
+
+@router.get("/sweeper")
+def get_sweeper_metrics():
+    """Get background sweeper counters and throughput"""
+    return {
+        "enabled": settings.sweeper_pipeline_id is not None,
+        "pipeline_id": settings.sweeper_pipeline_id,
+        **sweeper_metrics(),
+    }
+
+
+@router.get("/shadow")
+def get_shadow_metrics():
+    """Get shadow run queue depth and counts of submitted, completed, failed and shed shadow runs"""
+    return shadow_runner.state()
@@ -3,8 +3,15 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import PipelineCreate, PipelineUpdate, PipelineResponse
+from app.models import (
+    PipelineCreate, PipelineUpdate, PipelineResponse, ExecutionOrderPin, ExecutionOrderResponse,
+    ShadowConfig, ShadowResponse, RunResponse
+)
 from app.db_models import Pipeline
+from app.services import CompiledPipeline, run_history, run_summary
+from app.services.pipeline_optimizer import optimize_pipeline
+from app.services.shadow import shadow_agreement
+from app.api.runs import _run_to_response
 
 router = APIRouter(prefix="/api/pipelines", tags=["pipelines"])
 
@@ -15,12 +22,7 @@ def create_pipeline(
     db: Session = Depends(get_db)
 ):
     """Create a new pipeline"""
-    db_pipeline = Pipeline(
-        name=pipeline.name,
-        description=pipeline.description,
-        steps_config=json.dumps([step.model_dump() for step in pipeline.steps]),
-        terminal_rules=json.dumps([rule.model_dump() for rule in pipeline.terminal_rules])
-    )
+    db_pipeline = _new_pipeline(pipeline)
     db.add(db_pipeline)
     db.commit()
     db.refresh(db_pipeline)
@@ -63,28 +65,204 @@ def update_pipeline(
     if not db_pipeline:
         raise HTTPException(status_code=404, detail="Pipeline not found")
 
-    # Update fields if provided
+    _apply_update(db_pipeline, pipeline_update)
+    if pipeline_update.name is not None:
+        run_summary.rename_pipeline(db, pipeline_id, pipeline_update.name)
+    db.commit()
+    db.refresh(db_pipeline)
+    return _pipeline_to_response(db_pipeline)
+
+
+@router.get("/{pipeline_id}/runs", response_model=List[RunResponse])
+def list_pipeline_runs(
+    pipeline_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """List a pipeline's runs, newest first"""
+    _get_pipeline_or_404(db, pipeline_id)
+    return [_run_to_response(r) for r in run_history.pipeline_runs(db, pipeline_id, skip, limit)]
+
+
+@router.get("/{pipeline_id}/execution-order", response_model=ExecutionOrderResponse)
+def get_execution_order(
+    pipeline_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the step order runs use, where it comes from, and the runtime step statistics behind it"""
+    return _execution_order_response(_get_pipeline_or_404(db, pipeline_id))
+
+
+@router.put("/{pipeline_id}/execution-order", response_model=ExecutionOrderResponse)
+def pin_execution_order(
+    pipeline_id: int,
+    pin: ExecutionOrderPin,
+    db: Session = Depends(get_db)
+):
+    """Pin the step order, stopping adaptive reordering. Without step_order, pins the order in use."""
+    pipeline = _get_pipeline_or_404(db, pipeline_id)
+    step_types = sorted(step["step_type"] for step in json.loads(pipeline.steps_config))
+    step_order = pin.step_order or [step[0] for step in CompiledPipeline.from_db(pipeline).steps]
+    if sorted(step_order) != step_types:
+        raise HTTPException(status_code=400, detail="step_order must list each pipeline step exactly once")
+
+    plan = json.loads(pipeline.execution_plan) if pipeline.execution_plan else {}
+    plan.update(step_order=step_order, pinned=True)
+    pipeline.execution_plan = json.dumps(plan)
+    db.commit()
+    return _execution_order_response(pipeline)
+
+
+@router.delete("/{pipeline_id}/execution-order", response_model=ExecutionOrderResponse)
+def unpin_execution_order(
+    pipeline_id: int,
+    db: Session = Depends(get_db)
+):
+    """Unpin the step order: runs go back to the optimizer's plan and adaptive reordering"""
+    pipeline = _get_pipeline_or_404(db, pipeline_id)
+    _plan_execution(pipeline, keep_pin=False)
+    db.commit()
+    return _execution_order_response(pipeline)
+
+
+@router.get("/{pipeline_id}/shadow", response_model=ShadowResponse)
+def get_shadow(
+    pipeline_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the pipeline's challenger and how often its shadow runs agreed with the pipeline"""
+    return _shadow_response(db, _get_pipeline_or_404(db, pipeline_id))
+
+
+@router.put("/{pipeline_id}/shadow", response_model=ShadowResponse)
+def set_shadow(
+    pipeline_id: int,
+    shadow: ShadowConfig,
+    db: Session = Depends(get_db)
+):
+    """Run a challenger pipeline in the background on every API run of this pipeline"""
+    pipeline = _get_pipeline_or_404(db, pipeline_id)
+    if shadow.shadow_pipeline_id == pipeline_id:
+        raise HTTPException(status_code=400, detail="A pipeline cannot shadow itself")
+    if not db.query(Pipeline).filter(Pipeline.id == shadow.shadow_pipeline_id).first():
+        raise HTTPException(status_code=400, detail=f"Pipeline {shadow.shadow_pipeline_id} not found")
+    pipeline.shadow_pipeline_id = shadow.shadow_pipeline_id
+    db.commit()
+    return _shadow_response(db, pipeline)
+
+
+@router.delete("/{pipeline_id}/shadow", response_model=ShadowResponse)
+def remove_shadow(
+    pipeline_id: int,
+    db: Session = Depends(get_db)
+):
+    """Stop shadow runs for this pipeline; recorded shadow runs are kept"""
+    pipeline = _get_pipeline_or_404(db, pipeline_id)
+    pipeline.shadow_pipeline_id = None
+    db.commit()
+    return _shadow_response(db, pipeline)
+
+
+def _shadow_response(db: Session, pipeline: Pipeline) -> ShadowResponse:
+    stats = shadow_agreement(db, pipeline.id, pipeline.shadow_pipeline_id) if pipeline.shadow_pipeline_id else {
+        "runs": 0, "agreed": 0, "agreement_rate": 0.0, "outcomes": {}
+    }
+    return ShadowResponse(pipeline_id=pipeline.id, shadow_pipeline_id=pipeline.shadow_pipeline_id, **stats)
+
+
+def _get_pipeline_or_404(db: Session, pipeline_id: int) -> Pipeline:
+    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
+    if not pipeline:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return pipeline
+
+
+def _execution_order_response(pipeline: Pipeline) -> ExecutionOrderResponse:
+    plan = json.loads(pipeline.execution_plan) if pipeline.execution_plan else {}
+    compiled = CompiledPipeline.from_db(pipeline)
+    step_order = [step[0] for step in compiled.steps]
+    if plan.get("pinned"):
+        source = "pinned"
+    elif compiled.stats.order and step_order == compiled.stats.order:
+        source = "adaptive"
+    else:
+        source = "plan"
+    return ExecutionOrderResponse(
+        pipeline_id=pipeline.id,
+        step_order=step_order,
+        source=source,
+        pinned=bool(plan.get("pinned")),
+        runs_recorded=compiled.stats.runs,
+        step_stats=compiled.stats.snapshot()
+    )
+
+
+def _new_pipeline(pipeline: PipelineCreate) -> Pipeline:
+    """Build a Pipeline DB model with its execution plan"""
+    db_pipeline = Pipeline(
+        name=pipeline.name,
+        description=pipeline.description,
+        steps_config=json.dumps([step.model_dump() for step in pipeline.steps]),
+        terminal_rules=json.dumps([rule.model_dump() for rule in pipeline.terminal_rules]),
+        timeout_ms=pipeline.timeout_ms,
+        short_circuit=pipeline.short_circuit
+    )
+    _plan_execution(db_pipeline)
+    return db_pipeline
+
+
+def _apply_update(db_pipeline: Pipeline, pipeline_update: PipelineUpdate):
+    """Apply the provided fields of an update and re-plan execution"""
     if pipeline_update.name is not None:
         db_pipeline.name = pipeline_update.name
     if pipeline_update.description is not None:
         db_pipeline.description = pipeline_update.description
+    # Changes that can alter run outcomes start a new pipeline version
+    if any(value is not None for value in (
+        pipeline_update.steps, pipeline_update.terminal_rules,
+        pipeline_update.timeout_ms, pipeline_update.short_circuit
+    )):
+        db_pipeline.version = (db_pipeline.version or 1) + 1
     if pipeline_update.steps is not None:
         db_pipeline.steps_config = json.dumps([step.model_dump() for step in pipeline_update.steps])
     if pipeline_update.terminal_rules is not None:
         db_pipeline.terminal_rules = json.dumps([rule.model_dump() for rule in pipeline_update.terminal_rules])
+    if pipeline_update.timeout_ms is not None:
+        db_pipeline.timeout_ms = pipeline_update.timeout_ms
+    if pipeline_update.short_circuit is not None:
+        db_pipeline.short_circuit = pipeline_update.short_circuit
 
-    db.commit()
-    db.refresh(db_pipeline)
-    return _pipeline_to_response(db_pipeline)
+    _plan_execution(db_pipeline)
+
+
+def _plan_execution(pipeline: Pipeline, keep_pin: bool = True):
+    """
+    Analyze the pipeline as it will be stored and save its execution plan
+
+    A pinned order survives while it still lists exactly the pipeline's steps.
+    """
+    previous = json.loads(pipeline.execution_plan) if pipeline.execution_plan else {}
+    plan = optimize_pipeline(json.loads(pipeline.steps_config), json.loads(pipeline.terminal_rules))
+    if keep_pin and previous.get("pinned") and sorted(previous["step_order"]) == sorted(plan["step_order"]):
+        plan.update(step_order=previous["step_order"], pinned=True)
+    pipeline.execution_plan = json.dumps(plan)
 
 
 def _pipeline_to_response(pipeline: Pipeline) -> PipelineResponse:
     """Convert Pipeline DB model to PipelineResponse"""
+    plan = json.loads(pipeline.execution_plan) if pipeline.execution_plan else None
     return PipelineResponse(
         id=pipeline.id,
         name=pipeline.name,
         description=pipeline.description,
         steps=json.loads(pipeline.steps_config),
         terminal_rules=json.loads(pipeline.terminal_rules),
+        timeout_ms=pipeline.timeout_ms,
+        short_circuit=bool(pipeline.short_circuit),
+        version=pipeline.version or 1,
+        shadow_pipeline_id=pipeline.shadow_pipeline_id,
+        execution_plan=plan,
+        warnings=plan["warnings"] if plan else [],
         created_at=pipeline.created_at
     )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models import CountryPolicyUpdate, CountryPolicyResponse
+from app.reference_data import CountryPolicySnapshot, load_version, reference_data
+
+router = APIRouter(prefix="/api/reference-data", tags=["reference-data"])
+
+
+@router.get("/country-policies", response_model=CountryPolicyResponse)
+def get_country_policies():
+    """Get the country policy snapshot new runs use"""
+    return _snapshot_to_response(reference_data.snapshot)
+
+
+@router.post("/country-policies", response_model=CountryPolicyResponse, status_code=201)
+def publish_country_policies(
+    update: CountryPolicyUpdate,
+    db: Session = Depends(get_db)
+):
+    """Publish a new version of the country policy table and switch new runs to it"""
+    return _snapshot_to_response(reference_data.publish(db, update.caps))
+
+
+@router.get("/country-policies/{version}", response_model=CountryPolicyResponse)
+def get_country_policies_version(
+    version: int,
+    db: Session = Depends(get_db)
+):
+    """Get a stored version of the country policy table, e.g. the one a run referenced"""
+    snapshot = load_version(db, version)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Country policy version not found")
+    return _snapshot_to_response(snapshot)
+
+
+def _snapshot_to_response(snapshot: CountryPolicySnapshot) -> CountryPolicyResponse:
+    return CountryPolicyResponse(version=snapshot.version, caps=dict(snapshot.caps))
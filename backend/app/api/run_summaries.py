@@ -0,0 +1,42 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models import FinalStatus, RunSummaryResponse
+from app.db_models import RunSummary
+
+router = APIRouter(prefix="/api/run-summaries", tags=["runs"])
+
+
+@router.get("", response_model=List[RunSummaryResponse])
+def list_run_summaries(
+    status: Optional[FinalStatus] = None,
+    pipeline_id: Optional[int] = None,
+    application_id: Optional[int] = None,
+    before_id: Optional[int] = Query(None, description="Only runs older than this run id (keyset paging)"),
+    include_archived: bool = Query(False, description="Also list runs moved to the run archive"),
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    List run history rows, newest first
+
+    Serves the denormalized run_summary table: applicant and pipeline names,
+    outcome and key scores, without the step logs. Each filter is backed by
+    an index ending in run_id, so pages are single index range scans; pass the
+    last run_id of a page as `before_id` to page without OFFSET. Runs moved
+    to the run archive are left out unless `include_archived` is set.
+    """
+    query = db.query(RunSummary)
+    if not include_archived:
+        query = query.filter(RunSummary.archived.is_(False))
+    if status is not None:
+        query = query.filter(RunSummary.final_status == status.value)
+    if pipeline_id is not None:
+        query = query.filter(RunSummary.pipeline_id == pipeline_id)
+    if application_id is not None:
+        query = query.filter(RunSummary.application_id == application_id)
+    if before_id is not None:
+        query = query.filter(RunSummary.run_id < before_id)
+    return query.order_by(RunSummary.run_id.desc()).offset(skip).limit(limit).all()
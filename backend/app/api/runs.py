@@ -1,11 +1,14 @@
 import json
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import get_db
 from app.models import RunRequest, RunResponse
 from app.db_models import PipelineRun
-from app.services import PipelineExecutor
+from app.services import PipelineExecutor, idempotency, run_archive, run_history
+from app.services.pipeline_executor import render_run_logs
+from app.services.shadow import shadow_runner
 
 router = APIRouter(prefix="/api/runs", tags=["runs"])
 
@@ -13,18 +16,64 @@ router = APIRouter(prefix="/api/runs", tags=["runs"])
 @router.post("", response_model=RunResponse, status_code=201)
 def execute_pipeline(
     run_request: RunRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db)
 ):
-    """Execute a pipeline on a loan application"""
+    """
+    Execute a pipeline on a loan application
+
+    Retries carrying the same Idempotency-Key header get the first run back.
+    With `reuse`, the latest run is returned when executing again would
+    reproduce it. Both answer 200 instead of 201. New runs of a pipeline with
+    a challenger queue a shadow run.
+    """
+    if idempotency_key:
+        try:
+            run_id = idempotency.begin(
+                db, "runs", idempotency_key, run_request.model_dump(), idempotency.run_lease_seconds()
+            )
+        except idempotency.IdempotencyKeyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except idempotency.IdempotencyKeyInProgress as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if run_id is not None:
+            response.status_code = 200
+            response.headers["Idempotent-Replayed"] = "true"
+            return _run_to_response(_load_run(db, run_id))
+
     try:
         executor = PipelineExecutor(db)
-        run = executor.execute(run_request.application_id, run_request.pipeline_id)
-        return _run_to_response(run)
+        run = None
+        if run_request.reuse:
+            run = executor.find_reusable_run(run_request.application_id, run_request.pipeline_id)
+        reused = run is not None
+        if not reused:
+            # A run with a key gets a finite budget that its key's lease outlasts
+            run = executor.execute(
+                run_request.application_id,
+                run_request.pipeline_id,
+                run_request.timeout_ms,
+                settings.idempotency_run_timeout_ms if idempotency_key else None
+            )
     except ValueError as e:
+        if idempotency_key:
+            idempotency.abandon(db, "runs", idempotency_key)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
+        if idempotency_key:
+            idempotency.abandon(db, "runs", idempotency_key)
         raise HTTPException(status_code=500, detail=f"Pipeline execution failed: {str(e)}")
 
+    if idempotency_key:
+        idempotency.complete(db, "runs", idempotency_key, run.id)
+    if reused:
+        response.status_code = 200
+    else:
+        # The challenger, if any, runs in the background after this response
+        shadow_runner.submit_for(db, run)
+    return _run_to_response(run, reused)
+
 
 @router.get("", response_model=List[RunResponse])
 def list_runs(
@@ -37,26 +86,57 @@ def list_runs(
     return [_run_to_response(r) for r in runs]
 
 
+@router.get("/latest", response_model=List[RunResponse])
+def list_latest_runs(
+    pipeline_id: Optional[int] = None,
+    application_id: Optional[List[int]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    after_application_id: Optional[int] = Query(None, description="Last application id of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the latest run of each application, optionally of one pipeline or for the given application ids
+
+    Paged in application id order: pass the last `application_id` of a page as
+    `after_application_id` to get the next one.
+    """
+    runs = run_history.latest_runs(db, pipeline_id, application_id, limit, after_application_id)
+    return [_run_to_response(r) for r in runs]
+
+
 @router.get("/{run_id}", response_model=RunResponse)
 def get_run(
     run_id: int,
     db: Session = Depends(get_db)
 ):
-    """Get a specific pipeline run"""
-    run = db.query(PipelineRun).filter(PipelineRun.id == run_id).first()
+    """Get a specific pipeline run, from the hot table or the run archive"""
+    run = _load_run(db, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     return _run_to_response(run)
 
 
-def _run_to_response(run: PipelineRun) -> RunResponse:
+def _load_run(db: Session, run_id: int) -> Optional[PipelineRun]:
+    """A run from the hot table, else from the run archive"""
+    run = db.query(PipelineRun).filter(PipelineRun.id == run_id).first()
+    return run if run is not None else run_archive.load_run(db, run_id)
+
+
+def _run_to_response(run: PipelineRun, reused: bool = False) -> RunResponse:
     """Convert PipelineRun DB model to RunResponse"""
+    step_logs, terminal_rule_logs = render_run_logs(
+        json.loads(run.step_logs),
+        json.loads(run.terminal_rule_logs)
+    )
     return RunResponse(
         id=run.id,
         application_id=run.application_id,
         pipeline_id=run.pipeline_id,
-        step_logs=json.loads(run.step_logs),
-        terminal_rule_logs=json.loads(run.terminal_rule_logs),
+        step_logs=step_logs,
+        terminal_rule_logs=terminal_rule_logs,
         final_status=run.final_status,
+        reference_version=run.reference_version,
+        pipeline_version=run.pipeline_version,
+        reused=reused,
         executed_at=run.executed_at
     )
@@ -8,6 +8,64 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./loan_box.db"
     cors_origins: List[str] = ["http://localhost:3000", "http://localhost:5173"]
     openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None
+
+    # Serve the application, pipeline and run routes with async handlers on an async engine (aiosqlite)
+    async_db: bool = False
+
+    # Default time budget for a pipeline run (None disables the limit)
+    run_timeout_ms: Optional[int] = None
+
+    # How often runs check for country policy versions published by other processes
+    reference_data_refresh_seconds: float = 5
+
+    # Shared guard for OpenAI calls: rate limit, adaptive concurrency, retries, circuit breaker
+    openai_rate_limit_per_second: float = 10
+    openai_rate_limit_burst: int = 20
+    openai_max_concurrency: int = 8
+    openai_latency_target_ms: int = 15000
+    openai_max_retries: int = 2
+    openai_backoff_base_ms: int = 200
+    openai_backoff_max_ms: int = 5000
+    openai_breaker_failure_threshold: int = 5
+    openai_breaker_reset_seconds: float = 30
+
+    # Adaptive step ordering: recompute every N runs of a pipeline, using steps with enough samples
+    adaptive_order_interval_runs: int = 200
+    adaptive_order_min_samples: int = 50
+
+    # Background sweeper of PENDING applications (disabled without a pipeline id)
+    sweeper_pipeline_id: Optional[int] = None
+    sweeper_interval_seconds: float = 5
+    sweeper_chunk_size: int = 200
+    sweeper_workers: int = 1
+    # Claims older than this are taken to belong to a dead sweeper and are released
+    sweeper_claim_lease_seconds: float = 600
+
+    # Shadow (challenger) runs: queue bound, max wait before a queued run is dropped, worker threads
+    shadow_queue_size: int = 1000
+    shadow_max_queue_delay_ms: int = 30000
+    shadow_workers: int = 1
+
+    # How long an Idempotency-Key is remembered, and how long a retry waits before taking over an unfinished one
+    idempotency_key_ttl_hours: int = 24
+    idempotency_lease_seconds: int = 60
+    # Longest time budget of a run sent with an Idempotency-Key; its key is leased for this plus the lease above
+    idempotency_run_timeout_ms: int = 60000
+
+    # Local text-risk classifier for SentimentCheck's local_model analyzer (see train_text_model.py)
+    text_model_path: str = "./text_risk_model.npz"
+
+    # Run archive: runs older than the retention window move to monthly columnar files (see archive_runs.py)
+    archive_dir: str = "./archive"
+    archive_retention_days: int = 90
+
+    # Memory-mapped columnar snapshot of applications for offline batch scoring (see build_app_snapshot.py)
+    app_snapshot_path: str = "./snapshots/applications.snap"
+
+    # Micro-batching of sentiment LLM calls (0 disables batching)
+    sentiment_batch_window_ms: int = 0
+    sentiment_batch_max_items: int = 16
 
 
 settings = Settings()
@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator, Optional
+from sqlalchemy import create_engine, inspect, literal, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.config import settings
 
@@ -24,7 +27,93 @@ def get_db():
         db.close()
 
 
+def async_database_url(url: str) -> str:
+    """The async driver's URL for a database URL (sqlite -> sqlite+aiosqlite)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+# Async engine, created on first use so the sync-only setup doesn't need aiosqlite
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        _async_engine = create_async_engine(async_database_url(settings.database_url))
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_session_factory
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_session_factory = None
+
+
+# Dependency to get an async DB session (ASYNC_DB=true)
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def _column_ddl(column, dialect) -> str:
+    """Column definition for ALTER TABLE ... ADD COLUMN; NOT NULL needs a constant default"""
+    ddl = f"{column.name} {column.type.compile(dialect=dialect)}"
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        ddl += " DEFAULT " + str(literal(default, column.type).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        ))
+    if not column.nullable:
+        if default is None:
+            raise RuntimeError(
+                f"Cannot add NOT NULL column {column.table.name}.{column.name} without a default; "
+                "rebuild the database"
+            )
+        ddl += " NOT NULL"
+    return ddl
+
+
+def upgrade_schema(bind: Optional[Engine] = None):
+    """
+    Bring tables created by an older version up to the models
+
+    `create_all` only creates missing tables, so columns and indexes added to
+    existing tables are added here: ALTER TABLE ... ADD COLUMN for each
+    missing column (existing rows get the column default) and CREATE INDEX
+    IF NOT EXISTS for each index. Foreign keys the models no longer declare
+    are dropped where the database supports it (SQLite cannot drop them,
+    and does not enforce them unless asked to). Safe to run on every startup.
+    """
+    bind = bind or engine
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, conn.dialect)}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+            if conn.dialect.name == "sqlite":
+                continue
+            declared = {
+                (tuple(fk.column_keys), fk.referred_table.name) for fk in table.foreign_key_constraints
+            }
+            for fk in inspector.get_foreign_keys(table.name):
+                if fk["name"] and (tuple(fk["constrained_columns"]), fk["referred_table"]) not in declared:
+                    conn.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT {fk['name']}"))
+
+
 # Initialize database
 def init_db():
-    """Create all tables"""
+    """Create all tables and upgrade existing ones"""
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
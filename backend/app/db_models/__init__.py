@@ -1,5 +1,14 @@
 from app.db_models.application import LoanApplication
 from app.db_models.pipeline import Pipeline
 from app.db_models.run import PipelineRun
+from app.db_models.reference_data import CountryPolicy
+from app.db_models.idempotency import IdempotencyKey
+from app.db_models.shadow import ShadowRun
+from app.db_models.run_summary import RunSummary
+from app.db_models.analytics import DecisionRollup, ScoreHistogram
+from app.db_models.run_archive import RunArchiveSegment
 
-__all__ = ["LoanApplication", "Pipeline", "PipelineRun"]
+__all__ = [
+    "LoanApplication", "Pipeline", "PipelineRun", "CountryPolicy", "IdempotencyKey", "ShadowRun", "RunSummary",
+    "DecisionRollup", "ScoreHistogram", "RunArchiveSegment"
+]
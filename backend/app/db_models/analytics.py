@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, String, Date
+from app.database import Base
+
+
+class DecisionRollup(Base):
+    """Run counts and score sums per pipeline, day, country and outcome, kept up to date as runs are written"""
+
+    __tablename__ = "decision_rollups"
+
+    pipeline_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC
+    country = Column(String, primary_key=True)
+    final_status = Column(String, primary_key=True)
+    runs = Column(Integer, nullable=False, default=0)
+    dti_count = Column(Integer, nullable=False, default=0)  # Runs that computed a DTI
+    dti_sum = Column(Float, nullable=False, default=0.0)
+    risk_count = Column(Integer, nullable=False, default=0)
+    risk_sum = Column(Float, nullable=False, default=0.0)
+
+
+class ScoreHistogram(Base):
+    """Run counts per score bucket, with the same keys as DecisionRollup"""
+
+    __tablename__ = "score_histograms"
+
+    pipeline_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    country = Column(String, primary_key=True)
+    final_status = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)  # "dti" or "risk"
+    bucket = Column(Integer, primary_key=True)  # Index of the bucket, see app.services.analytics
+    runs = Column(Integer, nullable=False, default=0)
@@ -13,5 +13,7 @@ class LoanApplication(Base):
     declared_debts = Column(Integer, nullable=False)
     country = Column(String, nullable=False)
     loan_purpose = Column(String, nullable=False)
-    status = Column(String, default="PENDING")  # PENDING, APPROVED, REJECTED, NEEDS_REVIEW
+    status = Column(String, default="PENDING")  # PENDING, PROCESSING, APPROVED, REJECTED, NEEDS_REVIEW
+    claimed_by = Column(String, nullable=True)  # Sweeper that last claimed the application
+    claimed_at = Column(DateTime, nullable=True)  # Naive UTC
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """A client-supplied Idempotency-Key and the resource its first request created"""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("scope", "key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False)  # Endpoint the key was used on, e.g. "runs"
+    key = Column(String, nullable=False)
+    request_hash = Column(String, nullable=False)  # Fingerprint of the request body
+    resource_id = Column(Integer, nullable=True)  # None while the first request is in flight
+    expires_at = Column(DateTime, nullable=False)  # Naive UTC
+    lease_expires_at = Column(DateTime, nullable=True)  # Naive UTC; a retry may take over an unfinished key after it
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
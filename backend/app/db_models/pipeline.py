@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -11,4 +11,9 @@ class Pipeline(Base):
     description = Column(String, nullable=True)
     steps_config = Column(Text, nullable=False)  # JSON string
     terminal_rules = Column(Text, nullable=False)  # JSON string
+    timeout_ms = Column(Integer, nullable=True)  # Run time budget, None for no limit
+    short_circuit = Column(Boolean, nullable=False, default=False)  # Skip steps once the outcome is decided
+    execution_plan = Column(Text, nullable=True)  # JSON string from the save-time optimizer
+    version = Column(Integer, nullable=False, default=1)  # Bumped when an update can change outcomes
+    shadow_pipeline_id = Column(Integer, ForeignKey("pipelines.id"), nullable=True)  # Challenger run in the background
     created_at = Column(DateTime(timezone=True), server_default=func.now())
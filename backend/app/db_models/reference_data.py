@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class CountryPolicy(Base):
+    """One country's loan cap in one version of the country policy table"""
+
+    __tablename__ = "country_policies"
+    __table_args__ = (UniqueConstraint("version", "country"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, nullable=False, index=True)
+    country = Column(String, nullable=False)
+    cap = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
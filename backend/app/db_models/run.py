@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 
 class PipelineRun(Base):
     __tablename__ = "pipeline_runs"
+    __table_args__ = (
+        # Latest run of a pipeline on an application, for run reuse
+        Index("ix_pipeline_runs_application_pipeline", "application_id", "pipeline_id"),
+        # Run history of one application or one pipeline, newest first
+        Index("ix_pipeline_runs_application_executed", "application_id", "executed_at"),
+        Index("ix_pipeline_runs_pipeline_executed", "pipeline_id", "executed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("applications.id"), nullable=False)
@@ -12,4 +19,7 @@ class PipelineRun(Base):
     step_logs = Column(Text, nullable=False)  # JSON string
     terminal_rule_logs = Column(Text, nullable=False, default="[]")  # JSON string
     final_status = Column(String, nullable=False)  # APPROVED, REJECTED, NEEDS_REVIEW
+    reference_version = Column(Integer, nullable=True)  # Country policy snapshot the run used
+    pipeline_version = Column(Integer, nullable=True)  # Pipeline.version the run executed
+    input_hash = Column(String, nullable=True)  # Fingerprint of the application data the run scored
     executed_at = Column(DateTime(timezone=True), server_default=func.now())
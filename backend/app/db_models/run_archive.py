@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class RunArchiveSegment(Base):
+    """
+    One segment of archived runs appended to a monthly archive file
+
+    A segment only counts once its row is committed, together with the
+    deletion of its runs from pipeline_runs.
+    """
+
+    __tablename__ = "run_archive_segments"
+    __table_args__ = (
+        Index("ix_run_archive_segments_run_ids", "min_run_id", "max_run_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String, nullable=False)  # YYYY-MM of the runs' executed_at
+    path = Column(String, nullable=False)  # Archive file, relative to ARCHIVE_DIR
+    offset = Column(Integer, nullable=False)  # Byte offset of the segment in the file
+    length = Column(Integer, nullable=False)
+    runs = Column(Integer, nullable=False)
+    min_run_id = Column(Integer, nullable=False)
+    max_run_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
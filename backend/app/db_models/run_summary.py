@@ -0,0 +1,35 @@
+from sqlalchemy import Boolean, Column, Integer, Float, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class RunSummary(Base):
+    """
+    Denormalized row per pipeline run for the run history dashboard
+
+    Written in the same transaction as the run; carries the applicant and
+    pipeline names and the key scores so listing runs needs no joins and no
+    JSON parsing. Rows outlive their run's move to the run archive (then
+    `archived` is set), so `run_id` is not a foreign key.
+    """
+
+    __tablename__ = "run_summary"
+    __table_args__ = (
+        Index("ix_run_summary_status", "final_status", "run_id"),
+        Index("ix_run_summary_pipeline", "pipeline_id", "run_id"),
+        Index("ix_run_summary_application", "application_id", "run_id"),
+    )
+
+    run_id = Column(Integer, primary_key=True)  # pipeline_runs.id, or an archived run's id
+    application_id = Column(Integer, nullable=False)
+    pipeline_id = Column(Integer, nullable=False)
+    applicant_name = Column(String, nullable=False)
+    country = Column(String, nullable=False)
+    amount = Column(Integer, nullable=False)
+    pipeline_name = Column(String, nullable=False)
+    final_status = Column(String, nullable=False)
+    dti = Column(Float, nullable=True)
+    risk = Column(Float, nullable=True)  # risk_scoring's risk
+    sentiment_risk = Column(Integer, nullable=True)  # sentiment_check's risk_score
+    executed_at = Column(DateTime(timezone=True), server_default=func.now())
+    archived = Column(Boolean, nullable=False, default=False)  # The run was moved to the run archive
@@ -0,0 +1,26 @@
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ShadowRun(Base):
+    """A challenger pipeline's run on the same application as a primary run, kept apart from real runs"""
+
+    __tablename__ = "shadow_runs"
+    __table_args__ = (
+        Index("ix_shadow_runs_pipelines", "primary_pipeline_id", "shadow_pipeline_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    primary_run_id = Column(Integer, nullable=False)  # Not a foreign key: the primary run may be archived
+    application_id = Column(Integer, ForeignKey("applications.id"), nullable=False)
+    primary_pipeline_id = Column(Integer, ForeignKey("pipelines.id"), nullable=False)
+    shadow_pipeline_id = Column(Integer, ForeignKey("pipelines.id"), nullable=False)
+    shadow_pipeline_version = Column(Integer, nullable=True)
+    step_logs = Column(Text, nullable=False)  # JSON string
+    terminal_rule_logs = Column(Text, nullable=False, default="[]")  # JSON string
+    primary_status = Column(String, nullable=False)
+    final_status = Column(String, nullable=False)  # The challenger's outcome
+    agreed = Column(Boolean, nullable=False)
+    reference_version = Column(Integer, nullable=True)
+    executed_at = Column(DateTime(timezone=True), server_default=func.now())
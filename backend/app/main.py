@@ -1,9 +1,22 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import init_db
-from app.api import applications, pipelines, runs, catalog
+from app.database import SessionLocal, dispose_async_engine, init_db
+from app.api import (
+    analytics, applications, pipelines, runs, run_summaries, catalog, metrics, reference_data as reference_data_api,
+    export
+)
+from app.api.aio import (
+    applications as async_applications,
+    pipelines as async_pipelines,
+    runs as async_runs
+)
+from app.reference_data import reference_data
+from app.sentiment import local_text_model
+from app.services import run_summary
+from app.services.shadow import shadow_runner
+from app.services.sweeper import PendingSweeper
 
 
 @asynccontextmanager
@@ -15,6 +28,7 @@ async def lifespan(app: FastAPI):
     print("="*60)
     print(f"Database URL: {settings.database_url}")
     print(f"CORS Origins: {settings.cors_origins}")
+    print(f"Async DB routes: {'ENABLED' if settings.async_db else 'disabled'}")
 
     # Print OpenAI API key status (masked for security)
     if settings.openai_api_key:
@@ -27,7 +41,42 @@ async def lifespan(app: FastAPI):
     print("="*60 + "\n")
 
     init_db()
+
+    # Load the current country policy snapshot
+    db = SessionLocal()
+    try:
+        snapshot = reference_data.load(db)
+        print(f"Country policy version: {snapshot.version}")
+        # Runs stored before the run_summary table existed
+        backfilled = run_summary.backfill(db)
+        if backfilled:
+            print(f"Run summaries backfilled: {backfilled}")
+    finally:
+        db.close()
+
+    # Load the local text-risk classifier once, if one has been trained
+    model = local_text_model.load(settings.text_model_path)
+    if model is not None:
+        print(f"Local text model: {settings.text_model_path} ({model.metadata['samples']} samples)")
+
+    # Drain PENDING applications in the background when a default pipeline is configured
+    sweeper = None
+    if settings.sweeper_pipeline_id is not None:
+        sweeper = PendingSweeper(
+            SessionLocal,
+            settings.sweeper_pipeline_id,
+            chunk_size=settings.sweeper_chunk_size,
+            workers=settings.sweeper_workers,
+            interval_seconds=settings.sweeper_interval_seconds,
+            claim_lease_seconds=settings.sweeper_claim_lease_seconds
+        )
+        sweeper.start()
+        print(f"Pending sweeper: pipeline {settings.sweeper_pipeline_id}, {settings.sweeper_workers} worker(s)")
     yield
+    if sweeper is not None:
+        await sweeper.stop()
+    shadow_runner.stop()
+    await dispose_async_engine()
 
 
 # Create FastAPI app
@@ -47,11 +96,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(applications.router)
-app.include_router(pipelines.router)
-app.include_router(runs.router)
-app.include_router(catalog.router)
+
+def include_routers(app: FastAPI, async_db: bool):
+    """
+    Add the API routers
+
+    With async_db, the async application, pipeline and run handlers serve
+    their paths and the sync routers only contribute the routes they don't
+    cover (execution order, shadow configuration, ...). Those go first so
+    fixed paths such as /api/runs/latest win over /api/runs/{run_id}.
+    """
+    sync_routers = [
+        applications.router, pipelines.router, runs.router, run_summaries.router,
+        catalog.router, metrics.router, reference_data_api.router, analytics.router, export.router
+    ]
+    async_routers = [async_applications.router, async_pipelines.router, async_runs.router] if async_db else []
+    served = {(route.path, method) for router in async_routers for route in router.routes for method in route.methods}
+
+    for router in sync_routers:
+        remaining = APIRouter()
+        remaining.routes = [
+            route for route in router.routes
+            if not any((route.path, method) in served for method in route.methods)
+        ]
+        app.include_router(remaining)
+    for router in async_routers:
+        app.include_router(router)
+
+
+include_routers(app, settings.async_db)
 
 
 @app.get("/")
@@ -0,0 +1,35 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Counters:
+    """Thread-safe in-process counters, keyed by dotted name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = defaultdict(float)
+
+    def increment(self, name: str, amount: float = 1):
+        with self._lock:
+            self._values[name] += amount
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, float]:
+        """Current values, optionally limited to names starting with prefix"""
+        with self._lock:
+            return {
+                name[len(prefix):]: value
+                for name, value in sorted(self._values.items())
+                if name.startswith(prefix)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+metrics = Counters()
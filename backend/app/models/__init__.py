@@ -1,15 +1,22 @@
-from app.models.enums import FinalStatus, StepType
+from app.models.enums import ApplicationStatus, FinalStatus, StepType
 from app.models.application import LoanApplicationCreate, LoanApplicationResponse
 from app.models.pipeline import (
     PipelineStepConfig,
     TerminalRule,
     PipelineCreate,
     PipelineUpdate,
-    PipelineResponse
+    PipelineResponse,
+    ExecutionPlan,
+    ExecutionOrderPin,
+    ExecutionOrderResponse,
+    ShadowConfig,
+    ShadowResponse
 )
-from app.models.run import StepLog, TerminalRuleLog, RunRequest, RunResponse
+from app.models.run import StepLog, TerminalRuleLog, RunRequest, RunResponse, RunSummaryResponse
+from app.models.reference_data import CountryPolicyUpdate, CountryPolicyResponse
 
 __all__ = [
+    "ApplicationStatus",
     "FinalStatus",
     "StepType",
     "LoanApplicationCreate",
@@ -19,8 +26,16 @@ __all__ = [
     "PipelineCreate",
     "PipelineUpdate",
     "PipelineResponse",
+    "ExecutionPlan",
+    "ExecutionOrderPin",
+    "ExecutionOrderResponse",
+    "ShadowConfig",
+    "ShadowResponse",
     "StepLog",
     "TerminalRuleLog",
     "RunRequest",
     "RunResponse",
+    "RunSummaryResponse",
+    "CountryPolicyUpdate",
+    "CountryPolicyResponse",
 ]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from app.models.enums import FinalStatus
+from app.models.enums import ApplicationStatus
 
 
 class LoanApplicationCreate(BaseModel):
@@ -22,5 +22,5 @@ class LoanApplicationResponse(BaseModel):
     declared_debts: int
     country: str
     loan_purpose: str
-    status: FinalStatus
+    status: ApplicationStatus
     created_at: datetime
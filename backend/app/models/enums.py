@@ -8,6 +8,15 @@ class FinalStatus(str, Enum):
     NEEDS_REVIEW = "NEEDS_REVIEW"
 
 
+class ApplicationStatus(str, Enum):
+    """Status of a stored application: a run outcome, or where it is before its first run"""
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"  # Claimed by the background sweeper, never a run outcome
+    APPROVED = "APPROVED"
+    REJECTED = "REJECTED"
+    NEEDS_REVIEW = "NEEDS_REVIEW"
+
+
 class StepType(str, Enum):
     DTI_RULE = "dti_rule"
     AMOUNT_POLICY = "amount_policy"
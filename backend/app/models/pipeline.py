@@ -21,6 +21,8 @@ class PipelineCreate(BaseModel):
     description: Optional[str] = None
     steps: List[PipelineStepConfig] = Field(..., min_length=1)
     terminal_rules: List[TerminalRule] = Field(..., min_length=1)
+    timeout_ms: Optional[int] = Field(None, gt=0)
+    short_circuit: bool = False
 
 
 class PipelineUpdate(BaseModel):
@@ -28,6 +30,41 @@ class PipelineUpdate(BaseModel):
     description: Optional[str] = None
     steps: Optional[List[PipelineStepConfig]] = Field(None, min_length=1)
     terminal_rules: Optional[List[TerminalRule]] = Field(None, min_length=1)
+    timeout_ms: Optional[int] = Field(None, gt=0)
+    short_circuit: Optional[bool] = None
+
+
+class ExecutionPlan(BaseModel):
+    step_order: List[str]
+    unreferenced_steps: List[str] = Field(default_factory=list)
+    unreachable_rules: List[int] = Field(default_factory=list)
+    pinned: bool = False
+
+
+class ExecutionOrderPin(BaseModel):
+    step_order: Optional[List[str]] = None  # None pins the order currently in use
+
+
+class ExecutionOrderResponse(BaseModel):
+    pipeline_id: int
+    step_order: List[str]
+    source: str  # pinned, adaptive or plan
+    pinned: bool
+    runs_recorded: int
+    step_stats: Dict[str, Dict[str, float]]
+
+
+class ShadowConfig(BaseModel):
+    shadow_pipeline_id: int = Field(..., gt=0)
+
+
+class ShadowResponse(BaseModel):
+    pipeline_id: int
+    shadow_pipeline_id: Optional[int]
+    runs: int
+    agreed: int
+    agreement_rate: float
+    outcomes: Dict[str, Dict[str, int]]  # primary status -> shadow status -> count
 
 
 class PipelineResponse(BaseModel):
@@ -38,4 +75,10 @@ class PipelineResponse(BaseModel):
     description: Optional[str]
     steps: List[PipelineStepConfig]
     terminal_rules: List[TerminalRule]
+    timeout_ms: Optional[int] = None
+    short_circuit: bool = False
+    version: int = 1
+    shadow_pipeline_id: Optional[int] = None
+    execution_plan: Optional[ExecutionPlan] = None
+    warnings: List[str] = Field(default_factory=list)
     created_at: datetime
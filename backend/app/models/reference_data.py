@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict
+
+
+class CountryPolicyUpdate(BaseModel):
+    caps: Dict[str, int] = Field(..., min_length=1)
+
+    @field_validator("caps")
+    @classmethod
+    def check_caps(cls, caps: Dict[str, int]) -> Dict[str, int]:
+        if "OTHER" not in caps:
+            raise ValueError("caps must include an OTHER fallback")
+        if any(cap <= 0 for cap in caps.values()):
+            raise ValueError("caps must be positive")
+        return caps
+
+
+class CountryPolicyResponse(BaseModel):
+    version: int
+    caps: Dict[str, int]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 from app.models.enums import FinalStatus
 
@@ -9,7 +9,11 @@ class StepLog(BaseModel):
     order: int
     passed: bool
     computed_values: Dict[str, Any]
-    message: str
+    message: Optional[str] = None  # Rendered from trace when read
+    trace: Optional[List[Any]] = None  # Message code and operands, see app.steps.messages
+    timed_out: bool = False  # Not executed because the run deadline passed
+    degraded: bool = False  # Fell back to a cheaper method to meet the deadline
+    skipped: bool = False  # Not executed because the outcome was already decided
 
 
 class TerminalRuleLog(BaseModel):
@@ -18,12 +22,15 @@ class TerminalRuleLog(BaseModel):
     order: int
     evaluated: bool
     matched: bool
-    reason: str
+    reason: Optional[str] = None  # Rendered from trace when read
+    trace: Optional[List[Any]] = None  # Condition trace, see app.services.conditions
 
 
 class RunRequest(BaseModel):
     application_id: int = Field(..., gt=0)
     pipeline_id: int = Field(..., gt=0)
+    timeout_ms: Optional[int] = Field(None, gt=0)
+    reuse: bool = False  # Return the latest run instead when nothing that affects its outcome changed
 
 
 class RunResponse(BaseModel):
@@ -35,4 +42,25 @@ class RunResponse(BaseModel):
     step_logs: List[StepLog]
     terminal_rule_logs: List[TerminalRuleLog]
     final_status: FinalStatus
+    reference_version: Optional[int] = None
+    pipeline_version: Optional[int] = None
+    reused: bool = False  # An earlier run returned instead of executing again
     executed_at: datetime
+
+
+class RunSummaryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    run_id: int
+    application_id: int
+    pipeline_id: int
+    applicant_name: str
+    country: str
+    amount: int
+    pipeline_name: str
+    final_status: FinalStatus
+    dti: Optional[float] = None
+    risk: Optional[float] = None
+    sentiment_risk: Optional[int] = None
+    executed_at: Optional[datetime] = None
+    archived: bool = False
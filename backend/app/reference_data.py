@@ -0,0 +1,140 @@
+"""
+Versioned reference data
+
+The country policy table (loan cap per country) lives in the database, one
+row per country per version; publishing a change writes a new version rather
+than editing rows. The current version is held in memory as an immutable
+CountryPolicySnapshot that is swapped atomically, so a run pins the snapshot
+it started with and records its version instead of copying the caps.
+
+Several server processes can share the database: a publish that loses the
+race for a version number retries with the next one, and each process picks
+up versions published elsewhere on the run path, checking the table at most
+every `reference_data_refresh_seconds`.
+"""
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.db_models import CountryPolicy
+
+# Version 1 of the table, written on first load of an empty database
+DEFAULT_COUNTRY_CAPS: Dict[str, int] = {
+    "ES": 30000,
+    "FR": 25000,
+    "DE": 35000,
+    "OTHER": 20000
+}
+
+
+class CountryPolicySnapshot:
+    """One immutable version of the country policy table"""
+
+    __slots__ = ("version", "caps")
+
+    def __init__(self, version: int, caps: Mapping[str, int]):
+        if "OTHER" not in caps:
+            raise ValueError("Country policy table must define an OTHER cap")
+        self.version = version
+        # Country codes are interned so lookups with interned codes compare by identity
+        self.caps: Mapping[str, int] = MappingProxyType({sys.intern(c): int(cap) for c, cap in caps.items()})
+
+
+class ReferenceData:
+    """
+    Holder of the current country policy snapshot
+
+    Readers take `snapshot` without locking; `swap` replaces it with a newer
+    version in a single reference assignment.
+    """
+
+    # Attempts at a version number before publish gives up to concurrent publishers
+    PUBLISH_ATTEMPTS = 5
+
+    def __init__(self):
+        # Built-in defaults until a database has been loaded
+        self._snapshot = CountryPolicySnapshot(0, DEFAULT_COUNTRY_CAPS)
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+
+    @property
+    def snapshot(self) -> CountryPolicySnapshot:
+        return self._snapshot
+
+    def swap(self, snapshot: CountryPolicySnapshot) -> CountryPolicySnapshot:
+        """Install a snapshot unless a newer one is already current"""
+        with self._lock:
+            if snapshot.version >= self._snapshot.version:
+                self._snapshot = snapshot
+            return self._snapshot
+
+    def load(self, db: Session) -> CountryPolicySnapshot:
+        """Load the latest version from the database, writing the defaults into an empty table"""
+        snapshot = load_version(db, latest_version(db))
+        if snapshot is None:
+            return self.publish(db, DEFAULT_COUNTRY_CAPS)
+        return self.swap(snapshot)
+
+    def refresh(self, db: Session) -> CountryPolicySnapshot:
+        """Install the latest stored version if another process published a newer one"""
+        self._checked_at = time.monotonic()
+        version = latest_version(db)
+        if version is None or version <= self._snapshot.version:
+            return self._snapshot
+        snapshot = load_version(db, version)
+        return self.swap(snapshot) if snapshot is not None else self._snapshot
+
+    def refresh_if_due(self, db: Session) -> CountryPolicySnapshot:
+        """`refresh`, at most once every `reference_data_refresh_seconds`"""
+        if time.monotonic() - self._checked_at < settings.reference_data_refresh_seconds:
+            return self._snapshot
+        return self.refresh(db)
+
+    def publish(self, db: Session, caps: Mapping[str, int]) -> CountryPolicySnapshot:
+        """
+        Store caps as a new version and make it current
+
+        Raises:
+            IntegrityError: If concurrent publishers took every version tried
+        """
+        with self._lock:
+            for attempt in range(self.PUBLISH_ATTEMPTS):
+                snapshot = CountryPolicySnapshot((latest_version(db) or 0) + 1, caps)
+                db.add_all([
+                    CountryPolicy(version=snapshot.version, country=country, cap=cap)
+                    for country, cap in snapshot.caps.items()
+                ])
+                try:
+                    db.commit()
+                    break
+                except IntegrityError:
+                    # Another process published this version first
+                    db.rollback()
+                    if attempt == self.PUBLISH_ATTEMPTS - 1:
+                        raise
+            if snapshot.version >= self._snapshot.version:
+                self._snapshot = snapshot
+            return snapshot
+
+
+def latest_version(db: Session) -> Optional[int]:
+    return db.query(func.max(CountryPolicy.version)).scalar()
+
+
+def load_version(db: Session, version: Optional[int]) -> Optional[CountryPolicySnapshot]:
+    """Read one stored version, None if it does not exist"""
+    if version is None:
+        return None
+    rows = db.query(CountryPolicy).filter(CountryPolicy.version == version).all()
+    if not rows:
+        return None
+    return CountryPolicySnapshot(version, {row.country: row.cap for row in rows})
+
+
+# Country policy snapshot shared by every run in the process
+reference_data = ReferenceData()
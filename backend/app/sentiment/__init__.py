@@ -0,0 +1,27 @@
+from app.sentiment.batcher import SentimentBatcher
+from app.sentiment.provider_guard import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    ProviderGuard,
+    ProviderUnavailableError,
+    TokenBucket,
+    openai_guard
+)
+from app.sentiment.singleflight import SingleFlight
+from app.sentiment.text import normalize_purpose
+from app.sentiment.text_model import LocalTextModel, TextRiskModel, local_text_model
+
+__all__ = [
+    "SentimentBatcher",
+    "AdaptiveConcurrencyLimiter",
+    "CircuitBreaker",
+    "ProviderGuard",
+    "ProviderUnavailableError",
+    "TokenBucket",
+    "openai_guard",
+    "SingleFlight",
+    "normalize_purpose",
+    "LocalTextModel",
+    "TextRiskModel",
+    "local_text_model",
+]
@@ -0,0 +1,92 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# send_batch(loan_purposes, risky_terms, api_model, timeout) -> one result per purpose, in order
+SendBatch = Callable[[List[str], List[str], str, Optional[float]], List[Any]]
+
+# (loan purpose, caller's future, caller's monotonic deadline or None)
+_Item = Tuple[str, Future, Optional[float]]
+
+
+class _Batch:
+    def __init__(self):
+        self.items: List[_Item] = []
+        self.closed = threading.Event()
+
+
+class SentimentBatcher:
+    """
+    Micro-batching for sentiment requests
+
+    Concurrent callers asking with the same model and risky terms are grouped
+    into one batch. The first caller of a batch becomes its leader: it waits up
+    to `window_ms` (or until `max_items` have joined), sends the whole batch with
+    a single `send_batch` call and fans the results back out. Every other caller
+    just blocks on its own future.
+
+    The batch call is bounded by the tightest deadline among its callers, so
+    no caller waits on the provider past its own timeout.
+    """
+
+    def __init__(self, send_batch: SendBatch, window_ms: int = 20, max_items: int = 16):
+        self.send_batch = send_batch
+        self.window_ms = window_ms
+        self.max_items = max(1, max_items)
+        self._lock = threading.Lock()
+        self._open: Dict[Tuple[str, Tuple[str, ...]], _Batch] = {}
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    def submit(
+        self,
+        loan_purpose: str,
+        risky_terms: List[str],
+        api_model: str,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Queue one loan purpose and block until its batch has been analyzed"""
+        key = (api_model, tuple(risky_terms))
+        future: Future = Future()
+        expires_at = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            batch = self._open.get(key)
+            is_leader = batch is None
+            if is_leader:
+                batch = _Batch()
+                self._open[key] = batch
+            batch.items.append((loan_purpose, future, expires_at))
+            if len(batch.items) >= self.max_items:
+                # Full: later callers start a new batch
+                del self._open[key]
+                batch.closed.set()
+
+        if is_leader:
+            batch.closed.wait(self.window_ms / 1000)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._dispatch(batch.items, list(risky_terms), api_model)
+
+        return future.result(timeout=timeout)
+
+    def _dispatch(self, items: List[_Item], risky_terms: List[str], api_model: str):
+        purposes = [purpose for purpose, _, _ in items]
+        deadlines = [expires_at for _, _, expires_at in items if expires_at is not None]
+        timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        try:
+            results = self.send_batch(purposes, risky_terms, api_model, timeout)
+            if len(results) != len(items):
+                raise ValueError(f"Expected {len(items)} results, got {len(results)}")
+        except Exception as e:
+            for _, future, _ in items:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches_sent += 1
+            self.items_sent += len(items)
+        for (_, future, _), result in zip(items, results):
+            future.set_result(result)
@@ -0,0 +1,281 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from app.config import settings
+
+
+class ProviderUnavailableError(Exception):
+    """Raised instead of calling the provider when it is known to be unhealthy or saturated"""
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to timeout seconds. Returns False if none came free."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit in-flight provider calls with AIMD
+
+    Each successful, fast call raises the limit by 1/limit (about +1 per round
+    trip); a throttled (429) or slow call halves it.
+    """
+
+    def __init__(self, initial: int, maximum: int, latency_target: float, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Claim an in-flight slot, waiting up to timeout seconds"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, throttled: bool):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled or latency > self.latency_target:
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing provider
+
+    CLOSED: calls go through; `failure_threshold` consecutive failures open it.
+    OPEN: calls are rejected until `reset_timeout` seconds have passed.
+    HALF_OPEN: a single probe call is allowed; success closes, failure re-opens.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def cancel_probe(self):
+        """Give back a half-open probe slot that was not used"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+def _is_throttled(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """429s, 5xx, timeouts and connection errors say the provider is unhealthy"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in (
+        "APITimeoutError", "APIConnectionError"
+    )
+
+
+class ProviderGuard:
+    """
+    Shared protection for calls to an external provider
+
+    Combines a token-bucket rate limit, an AIMD concurrency limit, retries with
+    exponential backoff and full jitter, and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        max_concurrency: int,
+        latency_target: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency, max_concurrency, latency_target)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "calls": 0, "successes": 0, "failures": 0, "throttled": 0,
+            "retries": 0, "short_circuited": 0, "rate_limited": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "ProviderGuard":
+        return cls(
+            rate_per_second=settings.openai_rate_limit_per_second,
+            burst=settings.openai_rate_limit_burst,
+            max_concurrency=settings.openai_max_concurrency,
+            latency_target=settings.openai_latency_target_ms / 1000,
+            max_retries=settings.openai_max_retries,
+            backoff_base=settings.openai_backoff_base_ms / 1000,
+            backoff_max=settings.openai_backoff_max_ms / 1000,
+            failure_threshold=settings.openai_breaker_failure_threshold,
+            reset_timeout=settings.openai_breaker_reset_seconds
+        )
+
+    def is_open(self) -> bool:
+        """True while the breaker rejects calls, so callers can skip straight to a fallback"""
+        return self.breaker.state == CircuitBreaker.OPEN
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Call the provider through the rate limit, concurrency limit and breaker
+
+        Raises:
+            ProviderUnavailableError: If the breaker is open or no capacity frees up in time
+            Exception: The provider's own error once retries are exhausted
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                self._count("short_circuited")
+                raise ProviderUnavailableError("Circuit breaker is open")
+            if not self.bucket.acquire(remaining()) or not self.limiter.acquire(remaining()):
+                self.breaker.cancel_probe()
+                self._count("rate_limited")
+                raise ProviderUnavailableError("No provider capacity before the deadline")
+
+            self._count("calls")
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = _is_throttled(e)
+                self.limiter.release(time.monotonic() - started, throttled)
+                if throttled:
+                    self._count("throttled")
+                if not _is_provider_failure(e):
+                    self.breaker.record_success()
+                    raise
+                self._count("failures")
+                self.breaker.record_failure()
+
+                delay = self.backoff(attempt)
+                left = remaining()
+                if attempt >= self.max_retries or (left is not None and delay >= left):
+                    raise
+                attempt += 1
+                self._count("retries")
+                time.sleep(delay)
+                continue
+
+            self.limiter.release(time.monotonic() - started, throttled=False)
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "rate_limit_per_second": self.bucket.rate,
+            "tokens_available": round(self.bucket.tokens, 2),
+            **stats,
+        }
+
+
+# One guard for every OpenAI call in the process
+openai_guard = ProviderGuard.from_settings()
@@ -0,0 +1,60 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key
+
+    The first caller for a key runs the function; callers arriving while it is
+    still in flight wait and receive the same result (or exception). Nothing is
+    cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run fn for key, or wait for the call already in flight
+
+        Raises:
+            TimeoutError: If a waiter gives up after `timeout` seconds
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_owner = call is None
+            if is_owner:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not is_owner:
+            if not call.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for in-flight call")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,3 @@
+def normalize_purpose(text: str) -> str:
+    """Lowercase and collapse whitespace so equivalent purposes compare equal"""
+    return " ".join(text.lower().split())
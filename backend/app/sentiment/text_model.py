@@ -0,0 +1,168 @@
+"""
+Local text-risk classifier for loan purposes
+
+A hashed n-gram linear model: each normalized purpose is turned into word
+unigrams, word bigrams and character trigrams, hashed into `n_features`
+buckets and scored with logistic regression. It is trained offline on the
+`risk_score`s the LLM assigned in stored runs (see `train_text_model.py`),
+so it needs no network and scores a purpose in microseconds.
+
+Predictions are a risk score 0-100 (the probability that the LLM would call
+the purpose risky) and a confidence 0-1 that grows with the distance of that
+probability from 0.5.
+"""
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.sentiment.text import normalize_purpose
+
+DEFAULT_FEATURES = 2 ** 16
+# LLM risk scores at or above this are the risky class
+RISKY_SCORE = 50
+
+
+@lru_cache(maxsize=16384)
+def _hashed_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket indices and L2-normalized values of a normalized purpose's n-grams"""
+    words = text.split()
+    grams = [f"w:{word}" for word in words]
+    grams += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    counts: Dict[int, int] = {}
+    for gram in grams:
+        bucket = zlib.crc32(gram.encode()) % n_features
+        counts[bucket] = counts.get(bucket, 0) + 1
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    norm = sum(count * count for count in counts.values()) ** -0.5
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=float, count=len(counts)) * norm
+    return indices, values
+
+
+class TextRiskModel:
+    """Hashed n-gram logistic regression over normalized loan purposes"""
+
+    def __init__(self, weights: np.ndarray, bias: float = 0.0, metadata: Optional[Dict[str, Any]] = None):
+        self.weights = weights
+        self.bias = bias
+        self.n_features = len(weights)
+        self.metadata = metadata or {}
+
+    def _encode(self, purposes: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Concatenated (indices, values) of every purpose, and the row each entry belongs to"""
+        encoded = [_hashed_features(normalize_purpose(purpose), self.n_features) for purpose in purposes]
+        rows = np.repeat(np.arange(len(encoded)), [len(indices) for indices, _ in encoded])
+        if not encoded:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), rows
+        return np.concatenate([e[0] for e in encoded]), np.concatenate([e[1] for e in encoded]), rows
+
+    @staticmethod
+    def _probabilities(weights, bias, indices, values, rows, count) -> np.ndarray:
+        logits = np.bincount(rows, weights=weights[indices] * values, minlength=count) + bias
+        return 1 / (1 + np.exp(-logits))
+
+    def predict_batch(self, purposes: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Risk scores (0-100 ints) and confidences (0-1) for many purposes at once"""
+        indices, values, rows = self._encode(purposes)
+        probabilities = self._probabilities(self.weights, self.bias, indices, values, rows, len(purposes))
+        return np.rint(probabilities * 100).astype(int), np.abs(probabilities - 0.5) * 2
+
+    def predict(self, purpose: str) -> Tuple[int, float]:
+        indices, values = _hashed_features(normalize_purpose(purpose), self.n_features)
+        logit = float(np.dot(self.weights[indices], values)) + self.bias
+        probability = 1 / (1 + np.exp(-logit))
+        return int(round(probability * 100)), abs(probability - 0.5) * 2
+
+    @classmethod
+    def train(
+        cls,
+        purposes: Sequence[str],
+        risk_scores: Sequence[float],
+        n_features: int = DEFAULT_FEATURES,
+        epochs: int = 200,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4
+    ) -> "TextRiskModel":
+        """
+        Fit on purposes and their LLM risk scores
+
+        Scores of RISKY_SCORE and up are the risky class; the classifier is
+        full-batch logistic regression with AdaGrad step sizes.
+        """
+        model = cls(np.zeros(n_features))
+        indices, values, rows = model._encode(purposes)
+        targets = (np.asarray(risk_scores, dtype=float) >= RISKY_SCORE).astype(float)
+        count = len(targets)
+        # Start from the base rate so words only learn how they shift it
+        base_rate = float(np.clip(targets.mean(), 1e-3, 1 - 1e-3))
+        weights, bias = model.weights, float(np.log(base_rate / (1 - base_rate)))
+        weight_history = np.full(n_features, 1e-8)
+        bias_history = 1e-8
+
+        for _ in range(epochs):
+            residuals = cls._probabilities(weights, bias, indices, values, rows, count) - targets
+            gradient = np.bincount(indices, weights=residuals[rows] * values, minlength=n_features) / count
+            gradient += l2 * weights
+            bias_gradient = residuals.mean()
+            weight_history += gradient ** 2
+            bias_history += bias_gradient ** 2
+            weights -= learning_rate * gradient / np.sqrt(weight_history)
+            bias -= learning_rate * bias_gradient / np.sqrt(bias_history)
+
+        model.bias = bias
+        model.metadata = {"samples": count}
+        return model
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=np.array(self.bias),
+            samples=np.array(self.metadata.get("samples", 0))
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TextRiskModel":
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]), {"samples": int(data["samples"])})
+
+
+class LocalTextModel:
+    """Holder for the process's loaded model, so steps can use it once it is available"""
+
+    def __init__(self):
+        self.model: Optional[TextRiskModel] = None
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> Optional[TextRiskModel]:
+        """Load the model saved at path; a missing file leaves the model unset"""
+        try:
+            model = TextRiskModel.load(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.model = model
+        return model
+
+    def set(self, model: Optional[TextRiskModel]):
+        with self._lock:
+            self.model = model
+
+
+# The model used by SentimentCheck's local_model analyzer, loaded at startup
+local_text_model = LocalTextModel()
+
+
+def training_example(step_logs: List[Dict[str, Any]]) -> Optional[Tuple[str, int]]:
+    """(loan_purpose, risk_score) from a run's sentiment_check log, when the LLM scored it"""
+    for log in step_logs:
+        values = log.get("computed_values") or {}
+        if log.get("step_type") == "sentiment_check" and values.get("analysis_method") == "openai_api":
+            return values["loan_purpose"], values["risk_score"]
+    return None
@@ -1,3 +1,4 @@
-from app.services.pipeline_executor import PipelineExecutor
+from app.services.pipeline_executor import PipelineExecutor, AsyncPipelineExecutor, CompiledPipeline
+from app.services.batch_executor import BatchExecutor, BatchRunSummary
 
-__all__ = ["PipelineExecutor"]
+__all__ = ["PipelineExecutor", "AsyncPipelineExecutor", "CompiledPipeline", "BatchExecutor", "BatchRunSummary"]
@@ -0,0 +1,203 @@
+"""
+Incremental decision analytics
+
+Runs are folded into two rollup tables as they are written, in the same
+transaction as the run and its summary:
+
+- `decision_rollups`: run count and DTI/risk sums per pipeline, UTC day,
+  country and final status
+- `score_histograms`: run counts per DTI and risk bucket under the same keys
+
+Each batch of runs is aggregated in memory first, then applied as one
+upsert per touched key (`runs = runs + excluded.runs`), so concurrent
+writers add to the counts instead of overwriting them. Reading analytics
+aggregates rollup rows, whose number grows with days x pipelines x
+countries, never with the number of runs.
+"""
+import math
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db_models import DecisionRollup, RunSummary, ScoreHistogram
+
+# Histogram bucket widths; the last bucket of each metric is open-ended
+BUCKETS = {
+    "dti": (0.05, 20),  # 0-0.05, 0.05-0.10, ..., 1.0 and up
+    "risk": (10.0, 10),  # 0-10, 10-20, ..., 100 and up
+}
+
+RollupKey = Tuple[int, date, str, str]
+
+
+def bucket_of(metric: str, value: float) -> int:
+    width, last = BUCKETS[metric]
+    return min(max(int(value // width), 0), last)
+
+
+def _upsert(db: Session, model, rows: List[Dict[str, Any]], counters: List[str]):
+    """INSERT ... ON CONFLICT DO UPDATE adding `counters` to the stored row"""
+    if not rows:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(model)
+    statement = statement.on_conflict_do_update(
+        index_elements=[column.name for column in model.__table__.primary_key],
+        set_={name: getattr(model, name) + getattr(statement.excluded, name) for name in counters}
+    )
+    db.execute(statement, rows)
+
+
+def _day(summary: Dict[str, Any]) -> date:
+    executed_at = summary.get("executed_at")
+    if isinstance(executed_at, datetime):
+        return executed_at.date()
+    return datetime.now(timezone.utc).date()
+
+
+def record(db: Session, summaries: Iterable[Dict[str, Any]]):
+    """
+    Fold run_summary rows into the rollups, without committing
+
+    Runs without an `executed_at` (being written now) count towards today (UTC).
+    """
+    totals: Dict[RollupKey, List[float]] = defaultdict(lambda: [0, 0, 0.0, 0, 0.0])
+    histogram: Counter = Counter()
+    for summary in summaries:
+        key = (summary["pipeline_id"], _day(summary), summary["country"], summary["final_status"])
+        total = totals[key]
+        total[0] += 1
+        for metric, offset in (("dti", 1), ("risk", 3)):
+            value = summary.get(metric)
+            if value is None or not math.isfinite(value):
+                continue
+            total[offset] += 1
+            total[offset + 1] += value
+            histogram[key + (metric, bucket_of(metric, value))] += 1
+
+    _upsert(db, DecisionRollup, [
+        {
+            "pipeline_id": pipeline_id, "day": day, "country": country, "final_status": final_status,
+            "runs": runs, "dti_count": dti_count, "dti_sum": dti_sum, "risk_count": risk_count, "risk_sum": risk_sum,
+        }
+        for (pipeline_id, day, country, final_status), (runs, dti_count, dti_sum, risk_count, risk_sum) in totals.items()
+    ], ["runs", "dti_count", "dti_sum", "risk_count", "risk_sum"])
+    _upsert(db, ScoreHistogram, [
+        {
+            "pipeline_id": pipeline_id, "day": day, "country": country, "final_status": final_status,
+            "metric": metric, "bucket": bucket, "runs": runs,
+        }
+        for (pipeline_id, day, country, final_status, metric, bucket), runs in histogram.items()
+    ], ["runs"])
+
+
+def rebuild(db: Session, batch_size: int = 5000) -> int:
+    """
+    Recompute the rollups from every run_summary row, in one transaction
+
+    Returns the number of runs folded in.
+    """
+    db.execute(delete(DecisionRollup))
+    db.execute(delete(ScoreHistogram))
+    columns = [
+        RunSummary.run_id, RunSummary.pipeline_id, RunSummary.country, RunSummary.final_status,
+        RunSummary.dti, RunSummary.risk, RunSummary.executed_at
+    ]
+    folded = 0
+    last_id = 0
+    while True:
+        summaries = [row._asdict() for row in db.execute(
+            select(*columns).where(RunSummary.run_id > last_id).order_by(RunSummary.run_id).limit(batch_size)
+        )]
+        if not summaries:
+            break
+        record(db, summaries)
+        folded += len(summaries)
+        last_id = summaries[-1]["run_id"]
+    db.commit()
+    return folded
+
+
+def _filters(model, pipeline_id: Optional[int], country: Optional[str], start: Optional[date], end: Optional[date]):
+    conditions = []
+    if pipeline_id is not None:
+        conditions.append(model.pipeline_id == pipeline_id)
+    if country is not None:
+        conditions.append(model.country == country)
+    if start is not None:
+        conditions.append(model.day >= start)
+    if end is not None:
+        conditions.append(model.day <= end)
+    return conditions
+
+
+def _breakdown(groups: Dict[Any, Dict[str, float]]) -> Dict[str, Any]:
+    return {
+        str(key): {
+            "runs": int(group["runs"]),
+            "status_counts": {status: int(count) for status, count in sorted(group["status_counts"].items())},
+            "approval_rate": round(group["status_counts"].get("APPROVED", 0) / group["runs"], 4) if group["runs"] else 0.0,
+        }
+        for key, group in sorted(groups.items())
+    }
+
+
+def summarize(
+    db: Session,
+    pipeline_id: Optional[int] = None,
+    country: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> Dict[str, Any]:
+    """Approval rates and score distributions over the rollups, by country, pipeline and day"""
+    rows = db.execute(
+        select(
+            DecisionRollup.pipeline_id, DecisionRollup.day, DecisionRollup.country, DecisionRollup.final_status,
+            DecisionRollup.runs, DecisionRollup.dti_count, DecisionRollup.dti_sum,
+            DecisionRollup.risk_count, DecisionRollup.risk_sum
+        ).where(*_filters(DecisionRollup, pipeline_id, country, start, end))
+    ).all()
+
+    def new_group():
+        return {"runs": 0, "status_counts": Counter()}
+
+    overall = new_group()
+    by_country: Dict[str, Dict] = defaultdict(new_group)
+    by_pipeline: Dict[int, Dict] = defaultdict(new_group)
+    by_day: Dict[str, Dict] = defaultdict(new_group)
+    dti_count = risk_count = 0
+    dti_sum = risk_sum = 0.0
+    for row in rows:
+        for group in (overall, by_country[row.country], by_pipeline[row.pipeline_id], by_day[row.day.isoformat()]):
+            group["runs"] += row.runs
+            group["status_counts"][row.final_status] += row.runs
+        dti_count += row.dti_count
+        dti_sum += row.dti_sum
+        risk_count += row.risk_count
+        risk_sum += row.risk_sum
+
+    histograms = {metric: [] for metric in BUCKETS}
+    for metric, bucket, runs in db.execute(
+        select(ScoreHistogram.metric, ScoreHistogram.bucket, func.sum(ScoreHistogram.runs))
+        .where(*_filters(ScoreHistogram, pipeline_id, country, start, end))
+        .group_by(ScoreHistogram.metric, ScoreHistogram.bucket)
+        .order_by(ScoreHistogram.metric, ScoreHistogram.bucket)
+    ):
+        width, last = BUCKETS[metric]
+        histograms[metric].append({
+            "min": round(bucket * width, 4),
+            "max": round((bucket + 1) * width, 4) if bucket < last else None,
+            "runs": int(runs),
+        })
+
+    return {
+        **_breakdown({"all": overall})["all"],
+        "mean_dti": round(dti_sum / dti_count, 4) if dti_count else None,
+        "mean_risk": round(risk_sum / risk_count, 2) if risk_count else None,
+        "by_country": _breakdown(by_country),
+        "by_pipeline": _breakdown(by_pipeline),
+        "by_day": _breakdown(by_day),
+        "histograms": histograms,
+    }
@@ -0,0 +1,274 @@
+"""
+Memory-mapped columnar snapshot of loan applications
+
+Batch rescoring and simulations read the same applications over and over;
+a snapshot materializes them once into a file that is memory-mapped and
+read through zero-copy NumPy views instead of SQLite rows and ORM objects.
+
+The file is a sequence of segments, each starting on a 64-byte boundary:
+`MAGIC`, a uint32 header length, a JSON header, then 64-byte aligned
+columns:
+
+- `id`, `amount`, `monthly_income`, `declared_debts`: int64
+- `country`: uint16 codes into the header's `countries` dictionary
+- `applicant_name`, `loan_purpose`: int64 offsets (rows + 1) into a UTF-8 blob
+
+`build_snapshot` writes a new file (atomically replacing the old one);
+`refresh_snapshot` appends one segment with the applications newer than the
+snapshot's highest id. Scored fields never change once an application is
+created, so those are the only rows a refresh needs. A segment whose bytes
+don't all reach the file (a crashed refresh) is ignored and overwritten by
+the next refresh. Readers that mapped the file earlier keep their view.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.db_models import LoanApplication
+
+MAGIC = b"APPSNAP1"
+ALIGNMENT = 64
+
+INT_COLUMNS = ["id", "amount", "monthly_income", "declared_debts"]
+TEXT_COLUMNS = ["applicant_name", "loan_purpose"]
+
+Selector = Union[slice, np.ndarray]
+
+
+def _aligned(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def _text_column(values: List[str]) -> Tuple[np.ndarray, bytes]:
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def encode_segment(rows: List[Dict[str, Any]]) -> bytes:
+    """Serialize application rows (id, amount, ..., loan_purpose), in id order, into one segment"""
+    countries = sorted({row["country"] for row in rows})
+    codes = {country: code for code, country in enumerate(countries)}
+    arrays: List[Tuple[str, Any]] = [
+        (name, np.array([row[name] for row in rows], dtype=np.int64)) for name in INT_COLUMNS
+    ]
+    arrays.append(("country", np.array([codes[row["country"]] for row in rows], dtype=np.uint16)))
+    for name in TEXT_COLUMNS:
+        offsets, blob = _text_column([row[name] for row in rows])
+        arrays += [(f"{name}.offsets", offsets), (f"{name}.data", np.frombuffer(blob, dtype=np.uint8))]
+
+    columns, blocks, position = [], [], 0
+    for name, array in arrays:
+        data = array.tobytes()
+        columns.append({"name": name, "dtype": array.dtype.str, "offset": position, "count": len(array)})
+        blocks.append(data + b"\0" * (_aligned(len(data)) - len(data)))
+        position += len(blocks[-1])
+    header = json.dumps({
+        "rows": len(rows),
+        "min_id": rows[0]["id"] if rows else 0,
+        "max_id": rows[-1]["id"] if rows else 0,
+        "countries": countries,
+        "data_length": position,
+        "columns": columns,
+    }).encode()
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    return prefix + b"\0" * (_aligned(len(prefix)) - len(prefix)) + b"".join(blocks)
+
+
+class SnapshotSegment:
+    """Zero-copy column views of one segment of a mapped snapshot"""
+
+    def __init__(self, buffer, start: int):
+        if bytes(buffer[start:start + len(MAGIC)]) != MAGIC:
+            raise ValueError("Not an application snapshot segment")
+        (header_length,) = struct.unpack_from("<I", buffer, start + len(MAGIC))
+        header_start = start + len(MAGIC) + 4
+        header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+        data_start = _aligned(header_start + header_length)
+        self.end = data_start + header["data_length"]
+        if self.end > len(buffer):
+            raise EOFError("Incomplete snapshot segment")
+        self.rows = header["rows"]
+        self.min_id = header["min_id"]
+        self.max_id = header["max_id"]
+        # Interned, so the strings match country policy keys by identity
+        self.countries = [sys.intern(country) for country in header["countries"]]
+        self.columns = {
+            column["name"]: np.frombuffer(
+                buffer, dtype=np.dtype(column["dtype"]), count=column["count"], offset=data_start + column["offset"]
+            )
+            for column in header["columns"]
+        }
+
+    def chunk(self, selector: Selector) -> "SnapshotChunk":
+        return SnapshotChunk(self, selector)
+
+
+class SnapshotChunk:
+    """
+    Applications of one segment, selected by a slice (zero-copy views) or positions
+
+    `applications()` builds the (id, app_data) pairs the executor runs on
+    straight from the columns: one `tolist()` per column and one decode per
+    text value, with no SQL rows or ORM objects in between.
+    """
+
+    def __init__(self, segment: SnapshotSegment, selector: Selector):
+        self.segment = segment
+        self.selector = selector
+        columns = segment.columns
+        self.ids = columns["id"][selector]
+        self.amount = columns["amount"][selector]
+        self.monthly_income = columns["monthly_income"][selector]
+        self.declared_debts = columns["declared_debts"][selector]
+        self.country = columns["country"][selector]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _texts(self, name: str) -> List[str]:
+        offsets = self.segment.columns[f"{name}.offsets"]
+        data = self.segment.columns[f"{name}.data"]
+        if isinstance(self.selector, slice):
+            start, stop, _ = self.selector.indices(self.segment.rows)
+            if start >= stop:
+                return []
+            base = int(offsets[start])
+            blob = data[base:int(offsets[stop])].tobytes()
+            bounds = (offsets[start:stop + 1] - base).tolist()
+            return [blob[bounds[i]:bounds[i + 1]].decode() for i in range(stop - start)]
+        return [data[offsets[i]:offsets[i + 1]].tobytes().decode() for i in self.selector.tolist()]
+
+    def applications(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """(application_id, app_data) pairs, app_data as application_to_dict builds it"""
+        countries = self.segment.countries
+        return [
+            (application_id, {
+                "applicant_name": name,
+                "amount": amount,
+                "monthly_income": monthly_income,
+                "declared_debts": declared_debts,
+                "country": countries[code],
+                "loan_purpose": purpose,
+            })
+            for application_id, name, amount, monthly_income, declared_debts, code, purpose in zip(
+                self.ids.tolist(), self._texts("applicant_name"), self.amount.tolist(),
+                self.monthly_income.tolist(), self.declared_debts.tolist(), self.country.tolist(),
+                self._texts("loan_purpose")
+            )
+        ]
+
+
+class ApplicationSnapshot:
+    """A snapshot file mapped read-only; segments cover increasing, disjoint id ranges"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.app_snapshot_path
+        self.segments: List[SnapshotSegment] = []
+        self.end = 0
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        position = 0
+        while position + len(MAGIC) + 4 <= len(self._map):
+            try:
+                segment = SnapshotSegment(self._map, position)
+            except (EOFError, ValueError, json.JSONDecodeError, struct.error):
+                break
+            self.segments.append(segment)
+            self.end = segment.end
+            position = _aligned(segment.end)
+
+    @property
+    def rows(self) -> int:
+        return sum(segment.rows for segment in self.segments)
+
+    @property
+    def max_id(self) -> int:
+        return max((segment.max_id for segment in self.segments if segment.rows), default=0)
+
+    def slices(self, chunk_size: int) -> Iterator[Tuple[int, slice]]:
+        """(segment index, slice) covering every application, at most chunk_size each"""
+        for index, segment in enumerate(self.segments):
+            for start in range(0, segment.rows, chunk_size):
+                yield index, slice(start, min(start + chunk_size, segment.rows))
+
+    def locate(self, application_ids: List[int], chunk_size: int) -> Tuple[List[Tuple[int, np.ndarray]], List[int]]:
+        """
+        (segment index, positions) chunks holding these applications, and the ids not in the snapshot
+        """
+        wanted = np.asarray(application_ids, dtype=np.int64)
+        found = np.zeros(len(wanted), dtype=bool)
+        chunks = []
+        for index, segment in enumerate(self.segments):
+            ids = segment.columns["id"]
+            positions = np.minimum(np.searchsorted(ids, wanted), max(segment.rows - 1, 0))
+            hits = (ids[positions] == wanted) if segment.rows else np.zeros(len(wanted), dtype=bool)
+            found |= hits
+            matched = positions[hits]
+            for start in range(0, len(matched), chunk_size):
+                chunks.append((index, matched[start:start + chunk_size]))
+        return chunks, wanted[~found].tolist()
+
+    def chunk(self, segment_index: int, selector: Selector) -> SnapshotChunk:
+        return self.segments[segment_index].chunk(selector)
+
+
+def _application_rows(db: Session, after_id: int, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    applications = LoanApplication.__table__
+    columns = [applications.c[name] for name in INT_COLUMNS + ["country"] + TEXT_COLUMNS]
+    while True:
+        rows = [dict(row) for row in db.execute(
+            select(*columns).where(applications.c.id > after_id).order_by(applications.c.id).limit(batch_size)
+        ).mappings()]
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+
+
+def _write_segments(f, db: Session, after_id: int, batch_size: int) -> int:
+    written = 0
+    for rows in _application_rows(db, after_id, batch_size):
+        f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+        f.write(encode_segment(rows))
+        written += len(rows)
+    f.flush()
+    os.fsync(f.fileno())
+    return written
+
+
+def build_snapshot(db: Session, path: Optional[str] = None, batch_size: int = 100000) -> int:
+    """Write a snapshot of every application, replacing the file atomically; returns the rows written"""
+    path = path or settings.app_snapshot_path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        written = _write_segments(f, db, 0, batch_size)
+    os.replace(temporary, path)
+    return written
+
+
+def refresh_snapshot(db: Session, path: Optional[str] = None, batch_size: int = 100000) -> int:
+    """
+    Append the applications created since the snapshot was written
+
+    Builds the snapshot when there is none. Returns the rows added.
+    """
+    path = path or settings.app_snapshot_path
+    if not os.path.exists(path):
+        return build_snapshot(db, path, batch_size)
+    snapshot = ApplicationSnapshot(path)
+    with open(path, "r+b") as f:
+        # Drop any incomplete segment a crashed refresh left behind
+        f.truncate(snapshot.end)
+        f.seek(snapshot.end)
+        return _write_segments(f, db, snapshot.max_id, batch_size)
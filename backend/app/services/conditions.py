@@ -0,0 +1,412 @@
+"""
+Terminal rule conditions
+
+Condition strings are parsed once into a small expression tree that can be
+evaluated two ways:
+
+- `evaluate(step_results)` for one application, returning a structured trace
+  that `render_reason` turns into a human-readable reason at read time
+- `mask(columns)` for a batch, returning a boolean NumPy array over columnar step outputs
+
+`partial(step_results, pending)` evaluates with three-valued logic while some
+steps have not run yet (None when the result depends on them), and
+`constant()` reports conditions whose result never depends on any step.
+
+Grammar (unchanged from the original string evaluator): `else`, `A OR B`,
+`A AND B` (OR binds loosest), `step.failed`, `step.passed`, and comparisons
+`left <op> right` with op in <=, >=, ==, <, >, where each side is a number or a
+step reference such as `risk_scoring.risk` or `risk_scoring.params.approve_threshold`.
+"""
+import operator
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+COMPARISON_OPERATORS = ["<=", ">=", "==", "<", ">"]
+
+_OPERATOR_FUNCS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+
+class StepColumns:
+    """
+    Columnar view of step results for a batch of applications
+
+    `present[step]` marks rows where the step ran, `passed[step]` its outcome and
+    `values[step][field]` the computed values (None where missing).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.present: Dict[str, np.ndarray] = {}
+        self.passed: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, List[Dict[str, Any]]] = {}
+        self._columns: Dict[Tuple[str, str], np.ndarray] = {}
+
+    @classmethod
+    def from_results(cls, rows: List[Dict[str, Any]]) -> "StepColumns":
+        """Build columns from per-application step results keyed by step_type"""
+        columns = cls(len(rows))
+        step_types = {step_type for row in rows for step_type in row}
+        for step_type in step_types:
+            results = [row.get(step_type) for row in rows]
+            columns.present[step_type] = np.fromiter((r is not None for r in results), bool, len(rows))
+            columns.passed[step_type] = np.fromiter(
+                (r is not None and r.passed for r in results), bool, len(rows)
+            )
+            columns.values[step_type] = [r.computed_values if r is not None else None for r in results]
+        return columns
+
+    def column(self, step_type: str, field: str) -> np.ndarray:
+        """
+        One computed value across the batch
+
+        Fully numeric columns become float64; anything else (strings, None,
+        rows where the step did not run) stays an object array.
+        """
+        key = (step_type, field)
+        if key not in self._columns:
+            raw = [values.get(field) if values is not None else None for values in self.values[step_type]]
+            if all(isinstance(v, (int, float)) for v in raw):
+                self._columns[key] = np.array(raw, dtype=np.float64)
+            else:
+                column = np.empty(len(raw), dtype=object)
+                column[:] = raw
+                self._columns[key] = column
+        return self._columns[key]
+
+
+class Node:
+    def evaluate(self, step_results: Dict[str, Any]) -> Tuple[bool, List[Any]]:
+        """Evaluate for one application, returning (result, trace)"""
+        raise NotImplementedError
+
+    def mask(self, columns: StepColumns) -> np.ndarray:
+        raise NotImplementedError
+
+    def partial(self, step_results: Dict[str, Any], pending: Set[str]) -> Optional[bool]:
+        """Result if it is already known while `pending` steps have not run, else None"""
+        if any(step_type in pending for step_type in self.step_refs()):
+            return None
+        return bool(self.evaluate(step_results)[0])
+
+    def constant(self) -> Optional[bool]:
+        """Result if it does not depend on any step, else None"""
+        return None
+
+    def step_refs(self) -> List[str]:
+        """Step types this condition reads"""
+        return []
+
+
+class Else(Node):
+    def evaluate(self, step_results):
+        return True, ["else"]
+
+    def mask(self, columns):
+        return np.ones(columns.size, dtype=bool)
+
+    def constant(self):
+        return True
+
+
+class Or(Node):
+    def __init__(self, parts: List[Node]):
+        self.parts = parts
+
+    def evaluate(self, step_results):
+        traces = []
+        for part in self.parts:
+            result, trace = part.evaluate(step_results)
+            if result:
+                return True, ["or", True, [trace]]
+            traces.append(trace)
+        return False, ["or", False, traces]
+
+    def mask(self, columns):
+        return np.logical_or.reduce([part.mask(columns) for part in self.parts])
+
+    def partial(self, step_results, pending):
+        results = [part.partial(step_results, pending) for part in self.parts]
+        if True in results:
+            return True
+        return False if all(result is False for result in results) else None
+
+    def constant(self):
+        results = [part.constant() for part in self.parts]
+        if True in results:
+            return True
+        return False if all(result is False for result in results) else None
+
+    def step_refs(self):
+        return [ref for part in self.parts for ref in part.step_refs()]
+
+
+class And(Node):
+    def __init__(self, parts: List[Node]):
+        self.parts = parts
+
+    def evaluate(self, step_results):
+        traces = []
+        for part in self.parts:
+            result, trace = part.evaluate(step_results)
+            if not result:
+                return False, ["and", False, [trace]]
+            traces.append(trace)
+        return True, ["and", True, traces]
+
+    def mask(self, columns):
+        return np.logical_and.reduce([part.mask(columns) for part in self.parts])
+
+    def partial(self, step_results, pending):
+        results = [part.partial(step_results, pending) for part in self.parts]
+        if False in results:
+            return False
+        return True if all(result is True for result in results) else None
+
+    def constant(self):
+        results = [part.constant() for part in self.parts]
+        if False in results:
+            return False
+        return True if all(result is True for result in results) else None
+
+    def step_refs(self):
+        return [ref for part in self.parts for ref in part.step_refs()]
+
+
+class StepOutcome(Node):
+    """`step.failed` or `step.passed`"""
+
+    def __init__(self, step_type: str, expect_passed: bool):
+        self.step_type = step_type
+        self.expect_passed = expect_passed
+
+    def evaluate(self, step_results):
+        if self.step_type not in step_results:
+            return False, ["missing", self.step_type]
+        passed = step_results[self.step_type].passed
+        return passed == self.expect_passed, ["step", self.step_type, passed]
+
+    def mask(self, columns):
+        if self.step_type not in columns.present:
+            return np.zeros(columns.size, dtype=bool)
+        passed = columns.passed[self.step_type]
+        return columns.present[self.step_type] & (passed if self.expect_passed else ~passed)
+
+    def step_refs(self):
+        return [self.step_type]
+
+
+class Operand:
+    """One side of a comparison: a literal or a step reference"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.literal: Any = text
+        self.is_literal = True
+        self.step_type: Optional[str] = None
+        self.field: Optional[str] = None
+
+        # Numbers
+        try:
+            if "." in text and text.replace(".", "").replace("-", "").isdigit():
+                self.literal = float(text)
+                return
+            elif text.replace("-", "").isdigit():
+                self.literal = int(text)
+                return
+        except ValueError:
+            pass
+
+        # Step references: "step.field" or "step.params.name" (read from computed values)
+        parts = text.split(".") if "." in text else []
+        if len(parts) == 2:
+            self.step_type, self.field = parts
+        elif len(parts) == 3 and parts[1] == "params":
+            self.step_type, self.field = parts[0], parts[2]
+        elif parts:
+            # Any other dotted text resolves to itself only if the step is absent
+            self.step_type = parts[0]
+        self.is_literal = self.step_type is None
+
+    def value(self, step_results: Dict[str, Any]) -> Any:
+        if self.is_literal or self.step_type not in step_results or self.field is None:
+            return self.literal
+        return step_results[self.step_type].computed_values.get(self.field)
+
+    def column(self, columns: StepColumns) -> Any:
+        """Scalar for literals, array for step references"""
+        if self.is_literal or self.step_type not in columns.present or self.field is None:
+            return self.literal
+        column = columns.column(self.step_type, self.field)
+        present = columns.present[self.step_type]
+        if present.all():
+            return column
+        # Where the step did not run the reference resolves to its own text
+        column = column.astype(object)
+        column[~present] = self.text
+        return column
+
+
+class Comparison(Node):
+    def __init__(self, left: str, op: str, right: str):
+        self.left = Operand(left)
+        self.op = op
+        self.right = Operand(right)
+
+    def evaluate(self, step_results):
+        try:
+            left_value = self.left.value(step_results)
+            right_value = self.right.value(step_results)
+            result = _OPERATOR_FUNCS[self.op](left_value, right_value)
+            return result, ["cmp", self.left.text, left_value, self.op, self.right.text, right_value]
+        except Exception as e:
+            return False, ["text", f"Error evaluating condition: {str(e)}"]
+
+    def mask(self, columns):
+        left = self.left.column(columns)
+        right = self.right.column(columns)
+        compare = _OPERATOR_FUNCS[self.op]
+
+        if _is_numeric(left) and _is_numeric(right):
+            return np.broadcast_to(compare(left, right), (columns.size,)).astype(bool)
+
+        # Mixed types: compare row by row, errors count as not matched
+        lefts = left if isinstance(left, np.ndarray) else [left] * columns.size
+        rights = right if isinstance(right, np.ndarray) else [right] * columns.size
+        return np.fromiter((_safe_compare(compare, l, r) for l, r in zip(lefts, rights)), bool, columns.size)
+
+    def step_refs(self):
+        return [op.step_type for op in (self.left, self.right) if not op.is_literal]
+
+    def constant(self):
+        if self.left.is_literal and self.right.is_literal:
+            return bool(self.evaluate({})[0])
+        return None
+
+
+class Invalid(Node):
+    """A condition that can never match, with a fixed reason"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def evaluate(self, step_results):
+        return False, ["text", self.reason]
+
+    def mask(self, columns):
+        return np.zeros(columns.size, dtype=bool)
+
+    def constant(self):
+        return False
+
+
+def _is_numeric(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in "fiub"
+    return isinstance(value, (int, float))
+
+
+def _safe_compare(compare, left, right) -> bool:
+    try:
+        return bool(compare(left, right))
+    except Exception:
+        return False
+
+
+def render_reason(trace: List[Any], step_messages: Dict[str, str]) -> str:
+    """
+    Render a condition trace as a human-readable reason
+
+    Args:
+        trace: Trace returned by Node.evaluate
+        step_messages: Rendered step messages keyed by step_type
+    """
+    code = trace[0]
+    if code == "else":
+        return "Catch-all condition (else)"
+    if code in ("or", "and"):
+        _, result, children = trace
+        reasons = " AND ".join(render_reason(child, step_messages) for child in children)
+        return f"{code.upper()} condition {'TRUE' if result else 'FALSE'}: {reasons}"
+    if code == "missing":
+        return f"{trace[1]} not found"
+    if code == "step":
+        _, step_type, passed = trace
+        return f"{step_type} {'passed' if passed else 'failed'} ({step_messages.get(step_type, '')})"
+    if code == "cmp":
+        _, left, left_value, op, right, right_value = trace
+        return f"{left} ({left_value}) {op} {right} ({right_value})"
+    return trace[1]
+
+
+def parse_condition(condition: str) -> Node:
+    """Parse a terminal rule condition string"""
+    # Handle "else" (catch-all)
+    if condition.strip().lower() == "else":
+        return Else()
+
+    if " OR " in condition:
+        return Or([parse_condition(part.strip()) for part in condition.split(" OR ")])
+
+    if " AND " in condition:
+        return And([parse_condition(part.strip()) for part in condition.split(" AND ")])
+
+    if ".failed" in condition:
+        return StepOutcome(condition.replace(".failed", "").strip(), expect_passed=False)
+
+    if ".passed" in condition:
+        return StepOutcome(condition.replace(".passed", "").strip(), expect_passed=True)
+
+    for op in COMPARISON_OPERATORS:
+        if op in condition:
+            try:
+                left, right = condition.split(op)
+            except ValueError as e:
+                return Invalid(f"Error evaluating condition: {str(e)}")
+            return Comparison(left.strip(), op, right.strip())
+
+    return Invalid("Unknown condition format")
+
+
+class CompiledRules:
+    """Ordered terminal rules, parsed once, evaluated first-match-wins"""
+
+    def __init__(self, terminal_rules: List[Dict[str, Any]]):
+        self.rules = sorted(terminal_rules, key=lambda x: x["order"])
+        self.conditions = [parse_condition(rule["condition"]) for rule in self.rules]
+
+    def match_batch(self, columns: StepColumns) -> np.ndarray:
+        """
+        Index of the first matching rule for every row, -1 where none matched
+
+        Each rule's mask is only consulted for rows no earlier rule decided.
+        """
+        matched = np.full(columns.size, -1, dtype=np.int64)
+        undecided = np.ones(columns.size, dtype=bool)
+        for index, condition in enumerate(self.conditions):
+            if not undecided.any():
+                break
+            hits = condition.mask(columns) & undecided
+            matched[hits] = index
+            undecided &= ~hits
+        return matched
+
+    def decided(self, step_results: Dict[str, Any], pending: Set[str]) -> bool:
+        """
+        Whether the outcome is already fixed while `pending` steps have not run
+
+        True once some rule is known to match and every earlier rule is known
+        not to match, or every rule is known not to match.
+        """
+        for condition in self.conditions:
+            result = condition.partial(step_results, pending)
+            if result is None:
+                return False
+            if result:
+                return True
+        return True
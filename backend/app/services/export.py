@@ -0,0 +1,265 @@
+"""
+Columnar export of applications joined with their latest run
+
+Each application is joined with its latest run (of one pipeline, or of any)
+and that run's step outputs are flattened into typed columns named
+`{step_type}_{value}` (e.g. `dti_rule_dti`, `risk_scoring_risk`,
+`sentiment_check_risk_score`), typed from each step's `outputs`, plus a
+`{step_type}_passed` column per step.
+
+Applications are read in chunks of `batch_size`; each chunk becomes one
+Arrow record batch, written as one Parquet row group or one Arrow IPC stream
+message, and streamed out before the next chunk is read. Latest runs are
+found through run_summary, and runs moved to the run archive are read from
+there.
+
+pyarrow is optional: without it, exports raise ExportUnavailableError.
+"""
+import json
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.db_models import LoanApplication, Pipeline, PipelineRun, RunSummary
+from app.services import run_archive
+from app.steps.registry import STEP_REGISTRY, get_step_class
+
+# pyarrow import with error handling
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+APPLICATION_COLUMNS = [
+    ("application_id", "int"),
+    ("applicant_name", "str"),
+    ("amount", "int"),
+    ("monthly_income", "int"),
+    ("declared_debts", "int"),
+    ("country", "str"),
+    ("loan_purpose", "str"),
+    ("status", "str"),
+]
+RUN_COLUMNS = [
+    ("run_id", "int"),
+    ("pipeline_id", "int"),
+    ("pipeline_version", "int"),
+    ("final_status", "str"),
+    ("executed_at", "datetime"),
+]
+
+
+class ExportUnavailableError(Exception):
+    """pyarrow is not installed"""
+
+
+def _arrow_type(kind: str):
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+        "bool": pa.bool_(),
+        "datetime": pa.timestamp("us"),
+        "list[str]": pa.list_(pa.string()),
+    }[kind]
+
+
+def _coerce(kind: str, value: Any) -> Any:
+    """A computed value as its declared type, or None when it doesn't convert"""
+    if value is None:
+        return None
+    try:
+        if kind == "int":
+            return int(value) if not isinstance(value, float) or math.isfinite(value) else None
+        if kind == "float":
+            return float(value)
+        if kind == "str":
+            return str(value)
+        if kind == "bool":
+            return bool(value)
+        if kind == "list[str]":
+            return [str(item) for item in value]
+    except (TypeError, ValueError):
+        return None
+    return value
+
+
+def step_columns(step_types: List[str]) -> List[tuple]:
+    """(name, kind) of the `{step_type}_passed` and `{step_type}_{value}` columns of these step types"""
+    columns = []
+    for step_type in step_types:
+        columns.append((f"{step_type}_passed", "bool"))
+        columns += [(f"{step_type}_{name}", kind) for name, kind in get_step_class(step_type).outputs.items()]
+    return columns
+
+
+def export_columns(step_types: List[str]) -> List[tuple]:
+    """(name, kind) of every export column for these step types"""
+    return APPLICATION_COLUMNS + RUN_COLUMNS + step_columns(step_types)
+
+
+def export_schema(step_types: List[str]):
+    if not PYARROW_AVAILABLE:
+        raise ExportUnavailableError("Exports need pyarrow: pip install pyarrow")
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in export_columns(step_types)])
+
+
+def step_types_for(db: Session, pipeline_id: Optional[int] = None) -> List[str]:
+    """Steps of the pipeline, or every registered step"""
+    if pipeline_id is None:
+        return list(STEP_REGISTRY)
+    pipeline = db.get(Pipeline, pipeline_id)
+    if pipeline is None:
+        raise ValueError(f"Pipeline {pipeline_id} not found")
+    return [step["step_type"] for step in sorted(json.loads(pipeline.steps_config), key=lambda step: step["order"])]
+
+
+def _latest_runs(db: Session, application_ids: List[int], pipeline_id: Optional[int]) -> Dict[int, PipelineRun]:
+    """Latest run of each application, hot or archived, keyed by application id"""
+    latest = select(RunSummary.application_id, func.max(RunSummary.run_id)).where(
+        RunSummary.application_id.in_(application_ids)
+    ).group_by(RunSummary.application_id)
+    if pipeline_id is not None:
+        latest = latest.where(RunSummary.pipeline_id == pipeline_id)
+    run_ids = dict(db.execute(latest).all())
+    if not run_ids:
+        return {}
+
+    runs = {run.id: run for run in db.scalars(select(PipelineRun).where(PipelineRun.id.in_(run_ids.values())))}
+    missing = [run_id for run_id in run_ids.values() if run_id not in runs]
+    if missing:
+        runs.update(run_archive.find_runs(db, missing))
+    return {application_id: runs[run_id] for application_id, run_id in run_ids.items() if run_id in runs}
+
+
+def _rows(db: Session, applications: List[Dict[str, Any]], pipeline_id: Optional[int]) -> List[Dict[str, Any]]:
+    runs = _latest_runs(db, [app["application_id"] for app in applications], pipeline_id)
+    rows = []
+    for app in applications:
+        row = dict(app)
+        run = runs.get(app["application_id"])
+        if run is not None:
+            row.update(
+                run_id=run.id, pipeline_id=run.pipeline_id, pipeline_version=run.pipeline_version,
+                final_status=run.final_status, executed_at=run.executed_at
+            )
+            for log in json.loads(run.step_logs):
+                row[f"{log['step_type']}_passed"] = None if log.get("skipped") or log.get("timed_out") else log["passed"]
+                for name, value in (log.get("computed_values") or {}).items():
+                    row[f"{log['step_type']}_{name}"] = value
+        rows.append(row)
+    return rows
+
+
+def record_batches(
+    db: Session,
+    step_types: List[str],
+    pipeline_id: Optional[int] = None,
+    batch_size: int = 10000
+) -> Iterator[Any]:
+    """Arrow record batches of applications joined with their latest run, `batch_size` applications each"""
+    schema = export_schema(step_types)
+    columns = export_columns(step_types)
+    applications = LoanApplication.__table__
+    selected = [applications.c.id.label("application_id")] + [
+        applications.c[name] for name, _ in APPLICATION_COLUMNS[1:]
+    ]
+    last_id = 0
+    while True:
+        chunk = db.execute(
+            select(*selected).where(applications.c.id > last_id).order_by(applications.c.id).limit(batch_size)
+        ).mappings().all()
+        if not chunk:
+            return
+        last_id = chunk[-1]["application_id"]
+        rows = _rows(db, chunk, pipeline_id)
+        yield pa.record_batch(
+            [pa.array([_coerce(kind, row.get(name)) for row in rows], type=_arrow_type(kind)) for name, kind in columns],
+            schema=schema
+        )
+
+
+class _DrainableSink:
+    """Write-only file object whose written bytes are taken out between batches"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _writer(export_format: str, sink, schema):
+    if export_format == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+
+def _encode(schema, batches: Iterator[Any], export_format: str) -> Iterator[bytes]:
+    sink = _DrainableSink()
+    writer = _writer(export_format, sink, schema)
+    for batch in batches:
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export_stream(
+    db: Session,
+    export_format: str = "parquet",
+    pipeline_id: Optional[int] = None,
+    batch_size: int = 10000
+) -> Iterator[bytes]:
+    """
+    Bytes of a Parquet file (one row group per batch) or an Arrow IPC stream, produced as they are written
+
+    Raises (before anything is read):
+        ExportUnavailableError: If pyarrow is not installed
+        ValueError: If the format is unknown or the pipeline is not found
+    """
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    step_types = step_types_for(db, pipeline_id)
+    schema = export_schema(step_types)
+    return _encode(schema, record_batches(db, step_types, pipeline_id, batch_size), export_format)
+
+
+def write_export(
+    db: Session,
+    write: Callable[[bytes], Any],
+    export_format: str = "parquet",
+    pipeline_id: Optional[int] = None,
+    batch_size: int = 10000
+) -> int:
+    """Write an export through `write` (e.g. a file's write method) and return its size in bytes"""
+    size = 0
+    for data in export_stream(db, export_format, pipeline_id, batch_size):
+        write(data)
+        size += len(data)
+    return size
@@ -0,0 +1,150 @@
+"""
+Idempotency keys for create endpoints
+
+A client that retries a request after a timeout sends the same
+`Idempotency-Key` header. The first request claims the key, and once it
+succeeds the key records the id of the resource it created. Retries with the
+same key and body get that resource back instead of creating another one.
+
+Keys are scoped per endpoint and expire after `idempotency_key_ttl_hours`.
+A claim on a key is a lease of `idempotency_lease_seconds`: if the first
+request dies without completing or abandoning the key, a retry after the lease
+takes the key over instead of getting 409 until the key expires. Runs sent
+with a key are capped at `idempotency_run_timeout_ms` and lease their key for
+that long plus `idempotency_lease_seconds`, so a slow run cannot outlive its
+lease and be executed a second time by a retry.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.db_models import IdempotencyKey
+
+
+class IdempotencyError(Exception):
+    """An Idempotency-Key that cannot be honoured for this request"""
+
+
+class IdempotencyKeyMismatch(IdempotencyError):
+    """The key was first used with a different request body"""
+
+
+class IdempotencyKeyInProgress(IdempotencyError):
+    """The first request with this key has not finished"""
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _lease_expiry(lease_seconds: Optional[float] = None) -> datetime:
+    return _utcnow() + timedelta(seconds=lease_seconds or settings.idempotency_lease_seconds)
+
+
+def run_lease_seconds() -> float:
+    """Lease for a run's key: the longest a run with a key may take, plus the usual lease as a margin"""
+    return settings.idempotency_run_timeout_ms / 1000 + settings.idempotency_lease_seconds
+
+
+def _take_over(db: Session, record: IdempotencyKey, lease_seconds: Optional[float] = None) -> bool:
+    """Claim an unfinished key whose lease ran out; False if it finished or another retry got it first"""
+    taken = db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.id == record.id,
+            IdempotencyKey.resource_id.is_(None),
+            or_(IdempotencyKey.lease_expires_at.is_(None), IdempotencyKey.lease_expires_at <= _utcnow())
+        )
+        .values(lease_expires_at=_lease_expiry(lease_seconds))
+    ).rowcount
+    db.commit()
+    return taken == 1
+
+
+def _find(db: Session, scope: str, key: str) -> Optional[IdempotencyKey]:
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key
+    ).first()
+
+
+def begin(
+    db: Session,
+    scope: str,
+    key: str,
+    payload: Dict[str, Any],
+    lease_seconds: Optional[float] = None
+) -> Optional[int]:
+    """
+    Claim a key for a request
+
+    The claim lasts `lease_seconds` (default `idempotency_lease_seconds`),
+    which must outlast the request.
+
+    Returns:
+        None when the caller should process the request (then `complete` or
+        `abandon` the key), or the id of the resource an earlier request with
+        this key created
+
+    Raises:
+        IdempotencyKeyMismatch: If the key was used with a different payload
+        IdempotencyKeyInProgress: If the first request with the key is still
+            running (within its lease)
+    """
+    fingerprint = request_fingerprint(payload)
+    record = _find(db, scope, key)
+    if record is not None and record.expires_at <= _utcnow():
+        db.delete(record)
+        db.commit()
+        record = None
+
+    if record is None:
+        db.add(IdempotencyKey(
+            scope=scope,
+            key=key,
+            request_hash=fingerprint,
+            expires_at=_utcnow() + timedelta(hours=settings.idempotency_key_ttl_hours),
+            lease_expires_at=_lease_expiry(lease_seconds)
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            # A concurrent request claimed the key first
+            db.rollback()
+            record = _find(db, scope, key)
+
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyMismatch("Idempotency-Key was already used with a different request")
+    if record.resource_id is None:
+        if _take_over(db, record, lease_seconds):
+            return None
+        db.refresh(record)
+    if record.resource_id is None:
+        raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still in progress")
+    return record.resource_id
+
+
+def complete(db: Session, scope: str, key: str, resource_id: int):
+    """Record the resource the request created under its key"""
+    record = _find(db, scope, key)
+    if record is not None:
+        record.resource_id = resource_id
+        db.commit()
+
+
+def abandon(db: Session, scope: str, key: str):
+    """Release the key of a failed request so a retry can run it again"""
+    db.rollback()
+    record = _find(db, scope, key)
+    if record is not None and record.resource_id is None:
+        db.delete(record)
+        db.commit()
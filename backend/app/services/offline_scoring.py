@@ -0,0 +1,259 @@
+"""
+Offline scoring of application files, without the API
+
+Applications are read from CSV or NDJSON, validated like POST
+/api/applications, scored in chunks with the same step registry and
+terminal rules as API runs, and written back as one decision per input row
+(in input order), to NDJSON or CSV. Nothing is stored.
+
+Output rows carry the application id (the input's `application_id` or `id`
+field, else the input line number), `final_status`, and the flattened step
+outputs under the export column names (`dti_rule_dti`, `risk_scoring_risk`,
+...). Rows that fail validation get an `error` instead.
+
+With workers > 1, chunks are validated and scored by a process pool while
+the parent reads ahead at most two chunks per worker, so memory stays
+bounded for inputs of any size.
+"""
+import csv
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from app.db_models import Pipeline
+from app.models import LoanApplicationCreate, PipelineCreate
+from app.reference_data import CountryPolicySnapshot, reference_data
+from app.services.batch_executor import BatchRunSummary
+from app.services.export import step_columns
+from app.services.pipeline_executor import CompiledPipeline
+
+FORMATS = ("ndjson", "csv")
+ID_FIELDS = ("application_id", "id")
+
+# (line number, CSV row dict or NDJSON line)
+InputRecord = Tuple[int, Any]
+
+
+class OfflineScoringSummary(BatchRunSummary):
+    """Outcome of scoring a file; `processed` counts scored rows, `invalid` rejected ones"""
+
+    def __init__(self):
+        super().__init__()
+        self.invalid = 0
+
+    def record(self, rows: List[Dict[str, Any]]):
+        scored = [row for row in rows if row.get("final_status")]
+        self.invalid += len(rows) - len(scored)
+        super().record(scored)
+
+    def to_dict(self) -> Dict[str, Any]:
+        summary = super().to_dict()
+        del summary["missing"]
+        return {**summary, "invalid": self.invalid}
+
+
+def pipeline_spec(pipeline: Pipeline) -> Dict[str, Any]:
+    """CompiledPipeline arguments for a stored pipeline, following a stored execution order"""
+    plan = json.loads(pipeline.execution_plan) if pipeline.execution_plan else {}
+    return {
+        "pipeline_id": pipeline.id,
+        "steps_config": json.loads(pipeline.steps_config),
+        "terminal_rules": json.loads(pipeline.terminal_rules),
+        "step_order": plan.get("step_order"),
+        "short_circuit": bool(pipeline.short_circuit),
+        "version": pipeline.version,
+    }
+
+
+def definition_spec(definition: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    CompiledPipeline arguments for a definition in the POST /api/pipelines format
+
+    Raises:
+        pydantic.ValidationError: If the definition is invalid
+    """
+    pipeline = PipelineCreate.model_validate(definition)
+    return {
+        "pipeline_id": 0,
+        "steps_config": [step.model_dump(mode="json") for step in pipeline.steps],
+        "terminal_rules": [rule.model_dump(mode="json") for rule in pipeline.terminal_rules],
+        "short_circuit": pipeline.short_circuit,
+    }
+
+
+def output_columns(spec: Dict[str, Any]) -> List[str]:
+    step_types = [step["step_type"] for step in sorted(spec["steps_config"], key=lambda step: step["order"])]
+    return ["application_id", "final_status", "error"] + [name for name, _ in step_columns(step_types)]
+
+
+def read_records(stream: TextIO, input_format: str) -> Iterator[InputRecord]:
+    """(line number, raw record) of every input row; parsing is left to the scorers"""
+    if input_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if line.strip():
+            yield line_number, line
+
+
+def _parse(line_number: int, raw: Any, input_format: str) -> Tuple[Any, Optional[Dict[str, Any]], Optional[str]]:
+    """(application id, app_data or None, error or None)"""
+    try:
+        record = json.loads(raw) if input_format == "ndjson" else raw
+        if not isinstance(record, dict):
+            return line_number, None, "expected a JSON object"
+    except json.JSONDecodeError as e:
+        return line_number, None, f"invalid JSON: {e}"
+    application_id = next((record[field] for field in ID_FIELDS if record.get(field) not in (None, "")), line_number)
+    try:
+        return application_id, LoanApplicationCreate.model_validate(record).model_dump(), None
+    except ValidationError as e:
+        error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        return application_id, None, error
+
+
+def _flatten(step_logs) -> Dict[str, Any]:
+    values = {}
+    for log in step_logs:
+        values[f"{log.step_type}_passed"] = None if log.skipped or log.timed_out else log.passed
+        for name, value in log.computed_values.items():
+            values[f"{log.step_type}_{name}"] = value
+    return values
+
+
+def score_records(
+    compiled: CompiledPipeline,
+    records: List[InputRecord],
+    input_format: str,
+    reference: Optional[CountryPolicySnapshot] = None
+) -> List[Dict[str, Any]]:
+    """Validate and score a chunk of input records, returning one output row per record in order"""
+    parsed = [_parse(line_number, raw, input_format) for line_number, raw in records]
+    valid = [app_data for _, app_data, _ in parsed if app_data is not None]
+    results = iter(compiled.run_batch(valid, include_rule_logs=False, reference=reference))
+
+    rows = []
+    for application_id, app_data, error in parsed:
+        if app_data is None:
+            rows.append({"application_id": application_id, "final_status": None, "error": error})
+            continue
+        final_status, step_logs, _ = next(results)
+        rows.append({"application_id": application_id, "final_status": final_status.value, **_flatten(step_logs)})
+    return rows
+
+
+# Per-process state for pool workers, set up once by _init_worker
+_worker_pipeline: Optional[CompiledPipeline] = None
+_worker_input_format = "ndjson"
+
+
+def _init_worker(spec: Dict[str, Any], input_format: str, reference_version: int, reference_caps: Dict[str, int]):
+    global _worker_pipeline, _worker_input_format
+    reference_data.swap(CountryPolicySnapshot(reference_version, reference_caps))
+    _worker_pipeline = CompiledPipeline(**spec)
+    _worker_input_format = input_format
+
+
+def _score_chunk(records: List[InputRecord]) -> List[Dict[str, Any]]:
+    return score_records(_worker_pipeline, records, _worker_input_format)
+
+
+def _chunks(records: Iterator[InputRecord], size: int) -> Iterator[List[InputRecord]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _scored_chunks(
+    chunks: Iterator[List[InputRecord]],
+    spec: Dict[str, Any],
+    input_format: str,
+    workers: int,
+    reference: CountryPolicySnapshot
+) -> Iterator[List[Dict[str, Any]]]:
+    if workers == 1:
+        compiled = CompiledPipeline(**spec)
+        for chunk in chunks:
+            yield score_records(compiled, chunk, input_format, reference)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(spec, input_format, reference.version, dict(reference.caps))
+    ) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class _NdjsonWriter:
+    def __init__(self, stream: TextIO, columns: List[str]):
+        self.stream = stream
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self.stream.write("".join(json.dumps(row) + "\n" for row in rows))
+
+
+class _CsvWriter:
+    def __init__(self, stream: TextIO, columns: List[str]):
+        self.writer = csv.DictWriter(stream, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self.writer.writerows(
+            {name: json.dumps(value) if isinstance(value, list) else value for name, value in row.items()}
+            for row in rows
+        )
+
+
+def score_stream(
+    input_stream: TextIO,
+    output_stream: TextIO,
+    spec: Dict[str, Any],
+    input_format: str = "ndjson",
+    output_format: str = "ndjson",
+    chunk_size: int = 1000,
+    workers: int = 1,
+    progress: Optional[Callable[[OfflineScoringSummary], None]] = None
+) -> OfflineScoringSummary:
+    """
+    Score every application read from input_stream and write the decisions to output_stream
+
+    Args:
+        spec: CompiledPipeline arguments, from pipeline_spec or definition_spec
+        progress: Called with the running summary after each chunk is written
+
+    Returns:
+        OfflineScoringSummary with counts and throughput
+    """
+    if input_format not in FORMATS or output_format not in FORMATS:
+        raise ValueError(f"Formats must be one of {', '.join(FORMATS)}")
+    writer = (_CsvWriter if output_format == "csv" else _NdjsonWriter)(output_stream, output_columns(spec))
+    summary = OfflineScoringSummary()
+    started = time.perf_counter()
+
+    chunks = _chunks(read_records(input_stream, input_format), max(1, chunk_size))
+    for rows in _scored_chunks(chunks, spec, input_format, max(1, workers), reference_data.snapshot):
+        writer.write(rows)
+        summary.record(rows)
+        summary.elapsed_seconds = time.perf_counter() - started
+        if progress is not None:
+            progress(summary)
+
+    output_stream.flush()
+    summary.elapsed_seconds = time.perf_counter() - started
+    return summary
@@ -1,310 +1,558 @@
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any, List, Tuple
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.db_models import LoanApplication, Pipeline, PipelineRun
-from app.models import StepLog, TerminalRuleLog, FinalStatus, PipelineStepConfig, TerminalRule
+from app.metrics import metrics
+from app.reference_data import CountryPolicySnapshot, reference_data
+from app.models import FinalStatus, PipelineStepConfig, TerminalRule
+from app.services.conditions import CompiledRules, StepColumns, render_reason
+from app.services.run_log import RuleLogRecord, StepLogRecord, dump_logs
+from app.services.run_summary import write_summary
+from app.services.step_statistics import step_statistics
+from app.steps.context import Deadline, RunContext
+from app.steps.features import Features
+from app.steps.messages import render_message
 from app.steps.registry import get_step_class
 
 
-class PipelineExecutor:
+def application_to_dict(application: LoanApplication) -> Dict[str, Any]:
+    """Convert a LoanApplication DB model to the dict passed to steps"""
+    return {
+        "applicant_name": application.applicant_name,
+        "amount": application.amount,
+        "monthly_income": application.monthly_income,
+        "declared_debts": application.declared_debts,
+        "country": application.country,
+        "loan_purpose": application.loan_purpose,
+    }
+
+
+def application_fingerprint(app_data: Dict[str, Any]) -> str:
+    """Hash of the application data a run scores, to tell whether it changed since"""
+    return hashlib.sha256(json.dumps(app_data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def run_budget_ms(pipeline: Pipeline, timeout_ms: Optional[int] = None, max_timeout_ms: Optional[int] = None) -> Optional[int]:
+    """Time budget of a run: the request's, else the pipeline's, else the global default, capped by max_timeout_ms"""
+    budget = timeout_ms or pipeline.timeout_ms or settings.run_timeout_ms
+    if max_timeout_ms:
+        budget = min(budget, max_timeout_ms) if budget else max_timeout_ms
+    return budget
+
+
+def render_run_logs(
+    step_logs: List[Dict[str, Any]],
+    terminal_rule_logs: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Core orchestration logic for executing pipelines on loan applications
+    Fill in step messages and rule reasons from stored traces
+
+    Runs store compact traces instead of formatted text; this renders them when
+    a run is read. Logs that already carry text (runs stored before traces)
+    are returned unchanged.
     """
+    step_messages = {}
+    for log in step_logs:
+        if log.get("message") is None and log.get("trace") is not None:
+            log["message"] = render_message(log["passed"], log["computed_values"], log["trace"])
+        step_messages[log["step_type"]] = log.get("message")
 
-    def __init__(self, db: Session):
-        self.db = db
+    for log in terminal_rule_logs:
+        if log.get("reason") is not None:
+            continue
+        if not log["evaluated"]:
+            log["reason"] = "Not evaluated (previous rule matched)"
+        elif log.get("trace") is not None:
+            prefix = "Rule matched" if log["matched"] else "Rule not matched"
+            log["reason"] = f"{prefix}: {render_reason(log['trace'], step_messages)}"
 
-    def execute(self, application_id: int, pipeline_id: int) -> PipelineRun:
+    return step_logs, terminal_rule_logs
+
+
+class CompiledPipeline:
+    """
+    A pipeline parsed once and ready to run against many applications
+
+    Step configuration is sorted, step instances are created and terminal rule
+    conditions are parsed up front, so batch jobs don't pay JSON parsing, class
+    lookup and condition parsing for every application.
+    """
+
+    def __init__(
+        self,
+        pipeline_id: int,
+        steps_config: List[Dict[str, Any]],
+        terminal_rules: List[Dict[str, Any]],
+        step_order: Optional[List[str]] = None,
+        short_circuit: bool = False,
+        adaptive: bool = False,
+        version: Optional[int] = None
+    ):
+        self.pipeline_id = pipeline_id
+        self.version = version
+        self.steps = [
+            (step_config["step_type"], step_config["order"], step_config.get("params", {}),
+             get_step_class(step_config["step_type"])())
+            for step_config in sorted(steps_config, key=lambda x: x["order"])
+        ]
+        if step_order:
+            self._apply_order(step_order)
+        self.short_circuit = short_circuit
+        self.rules = CompiledRules(terminal_rules)
+        self.rule_refs = [set(condition.step_refs()) for condition in self.rules.conditions]
+
+        # Runtime statistics; adaptive pipelines also reorder independent steps from them
+        self.stats = step_statistics.for_pipeline(pipeline_id)
+        self.adaptive = adaptive
+        self.base_order = [step[0] for step in self.steps]
+        self.independent = {step[0] for step in self.steps if step[3].order_independent}
+        if adaptive and self.stats.order and sorted(self.stats.order) == sorted(self.base_order):
+            self._apply_order(self.stats.order)
+        self.outcomes = [FinalStatus(rule["outcome"]) for rule in self.rules.rules]
+        self.blocking = any(step[3].blocking for step in self.steps)
+
+    @classmethod
+    def from_db(cls, pipeline: Pipeline) -> "CompiledPipeline":
         """
-        Execute a pipeline on a loan application
+        Compile a Pipeline DB model, following its execution plan if it has one
 
-        Args:
-            application_id: ID of the loan application
-            pipeline_id: ID of the pipeline to execute
+        A pinned plan order is used as is; otherwise the adaptive order from
+        runtime statistics takes over once it has been computed.
+        """
+        plan = json.loads(pipeline.execution_plan) if pipeline.execution_plan else {}
+        return cls(
+            pipeline.id,
+            json.loads(pipeline.steps_config),
+            json.loads(pipeline.terminal_rules),
+            step_order=plan.get("step_order"),
+            short_circuit=bool(pipeline.short_circuit),
+            adaptive=not plan.get("pinned", False),
+            version=pipeline.version
+        )
 
-        Returns:
-            PipelineRun with execution results
+    def _apply_order(self, step_order: List[str]):
+        """Run steps in this order; steps it doesn't list keep their place at the end"""
+        position = {step_type: index for index, step_type in enumerate(step_order)}
+        self.steps.sort(key=lambda step: position.get(step[0], len(position)))
 
-        Raises:
-            ValueError: If application or pipeline not found
+    def _record_decisions(self, runs: List[Tuple[int, Dict[str, Any]]]):
         """
-        # 1. Load application and pipeline
-        application = self.db.query(LoanApplication).filter(
-            LoanApplication.id == application_id
-        ).first()
-        if not application:
-            raise ValueError(f"Application {application_id} not found")
+        Record which executed steps the matching rule referenced, for each
+        (matched rule index, step results) run, and reorder when due
+        """
+        self.stats.record_decisions(
+            self.rule_refs[index] & results.keys() if index >= 0 else set()
+            for index, results in runs
+        )
+        if self.adaptive and self.stats.reorder_due():
+            self._apply_order(self.stats.reorder(self.base_order, self.independent))
 
-        pipeline = self.db.query(Pipeline).filter(
-            Pipeline.id == pipeline_id
-        ).first()
-        if not pipeline:
-            raise ValueError(f"Pipeline {pipeline_id} not found")
+    def run(
+        self,
+        app_data: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> Tuple[FinalStatus, List[StepLogRecord], List[RuleLogRecord]]:
+        """
+        Execute all steps and terminal rules for one application
 
-        # Convert application to dict for step execution
-        app_data = {
-            "applicant_name": application.applicant_name,
-            "amount": application.amount,
-            "monthly_income": application.monthly_income,
-            "declared_debts": application.declared_debts,
-            "country": application.country,
-            "loan_purpose": application.loan_purpose,
-        }
+        Returns:
+            Tuple of (Final status, Step logs, Terminal rule logs)
+        """
+        step_logs, step_results = self.run_steps(app_data, context)
+        final_status, terminal_rule_logs = self._evaluate_terminal_rules(step_results)
+        matched = next((index for index, log in enumerate(terminal_rule_logs) if log.matched), -1)
+        self._record_decisions([(matched, step_results)])
+        return final_status, step_logs, terminal_rule_logs
 
-        # Parse pipeline configuration
-        steps_config = json.loads(pipeline.steps_config)
-        terminal_rules = json.loads(pipeline.terminal_rules)
+    def run_steps(
+        self,
+        app_data: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> Tuple[List[StepLogRecord], Dict[str, Any]]:
+        """
+        Execute all steps for one application
+
+        Steps still pending when the run deadline passes are not executed and
+        are logged as timed out; terminal rules then treat them as missing.
+        With short-circuiting, steps still pending once the terminal rules'
+        outcome can no longer change are logged as skipped.
 
-        # Sort steps by order
-        steps_config = sorted(steps_config, key=lambda x: x["order"])
+        Steps run in execution-plan order; logs are returned in pipeline order.
 
-        # 2. Execute steps in order
+        Returns:
+            Tuple of (Step logs, Step results keyed by step_type)
+        """
+        context = context or RunContext()
+        context.features = Features(app_data)
         step_logs = []
         step_results = {}  # Store results for terminal rule evaluation
+        pending = {step[0] for step in self.steps}
+        decided = False
+        observations = []  # (step_type, latency, passed) for runtime statistics
+
+        for step_type, order, params, step_instance in self.steps:
+            if self.short_circuit and not decided:
+                decided = self.rules.decided(step_results, pending)
+            if decided:
+                step_logs.append(StepLogRecord(
+                    step_type=step_type,
+                    order=order,
+                    passed=False,
+                    computed_values={},
+                    trace=["skipped"],
+                    skipped=True
+                ))
+                metrics.increment(f"{context.metrics_prefix}.steps_skipped.{step_type}")
+                continue
+            pending.discard(step_type)
 
-        for step_config in steps_config:
-            step_type = step_config["step_type"]
-            params = step_config.get("params", {})
-            order = step_config["order"]
+            if context.deadline.expired():
+                step_logs.append(StepLogRecord(
+                    step_type=step_type,
+                    order=order,
+                    passed=False,
+                    computed_values={},
+                    trace=["timed_out"],
+                    timed_out=True
+                ))
+                metrics.increment(f"{context.metrics_prefix}.steps_timed_out.{step_type}")
+                continue
 
-            # Get step class and execute
-            step_class = get_step_class(step_type)
-            step_instance = step_class()
-            result = step_instance.execute(app_data, params)
+            started = time.perf_counter()
+            result = step_instance.execute(app_data, params, context)
+            observations.append((step_type, time.perf_counter() - started, result.passed))
 
             # Create log entry
-            log = StepLog(
+            log = StepLogRecord(
                 step_type=step_type,
                 order=order,
                 passed=result.passed,
                 computed_values=result.computed_values,
-                message=result.message
+                trace=result.trace,
+                degraded=step_type in context.degraded
             )
+            if log.degraded:
+                metrics.increment(f"{context.metrics_prefix}.steps_degraded.{step_type}")
             step_logs.append(log)
 
             # Store result for terminal rule evaluation
             step_results[step_type] = result
 
-        # 3. Evaluate terminal rules to determine final status
-        final_status, terminal_rule_logs = self._evaluate_terminal_rules(terminal_rules, step_results)
+        self.stats.record_steps(observations)
+        metrics.increment(f"{context.metrics_prefix}.total")
+        if any(log.timed_out or log.degraded for log in step_logs):
+            metrics.increment(f"{context.metrics_prefix}.degraded")
 
-        # 4. Update application status
-        application.status = final_status.value
-        self.db.commit()
+        step_logs.sort(key=lambda log: log.order)
+        return step_logs, step_results
 
-        # 5. Persist run to database
-        run = PipelineRun(
-            application_id=application_id,
-            pipeline_id=pipeline_id,
-            step_logs=json.dumps([log.model_dump() for log in step_logs]),
-            terminal_rule_logs=json.dumps([log.model_dump() for log in terminal_rule_logs]),
-            final_status=final_status.value
-        )
-        self.db.add(run)
-        self.db.commit()
-        self.db.refresh(run)
+    def run_batch(
+        self,
+        apps_data: List[Dict[str, Any]],
+        include_rule_logs: bool = True,
+        reference: Optional[CountryPolicySnapshot] = None
+    ) -> List[Tuple[FinalStatus, List[StepLogRecord], List[RuleLogRecord]]]:
+        """
+        Execute the pipeline for a batch of applications
 
-        return run
+        Steps run per application, then terminal rules are resolved for the
+        whole batch at once with boolean masks over the columnar step outputs.
+        Per-row terminal rule logs (and their condition traces) are only built
+        when `include_rule_logs` is set; otherwise they are empty lists.
+        Every run in the batch uses the same country policy snapshot.
+
+        Returns:
+            One (Final status, Step logs, Terminal rule logs) tuple per application
+        """
+        reference = reference or reference_data.snapshot
+        step_runs = [self.run_steps(app_data, RunContext(reference=reference)) for app_data in apps_data]
+        step_results = [results for _, results in step_runs]
+        matched = self.rules.match_batch(StepColumns.from_results(step_results))
+        self._record_decisions(list(zip(matched.tolist(), step_results)))
+
+        batch = []
+        for (step_logs, results), index in zip(step_runs, matched.tolist()):
+            final_status = self.outcomes[index] if index >= 0 else FinalStatus.NEEDS_REVIEW
+            rule_logs = self._terminal_rule_logs(results, index) if include_rule_logs else []
+            batch.append((final_status, step_logs, rule_logs))
+        return batch
+
+    def run_to_row(
+        self,
+        application_id: int,
+        app_data: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute the pipeline and return a serialized pipeline_runs row
+
+        Used by batch paths that bulk-insert runs instead of going through the ORM.
+        """
+        context = context or RunContext()
+        return self._to_row(application_id, app_data, context.reference.version, *self.run(app_data, context))
+
+    def run_batch_to_rows(
+        self,
+        applications: List[Tuple[int, Dict[str, Any]]],
+        include_rule_logs: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Batch counterpart of run_to_row for (application_id, app_data) pairs"""
+        reference = reference_data.snapshot
+        results = self.run_batch([app_data for _, app_data in applications], include_rule_logs, reference)
+        return [
+            self._to_row(application_id, app_data, reference.version, *result)
+            for (application_id, app_data), result in zip(applications, results)
+        ]
+
+    def _to_row(
+        self,
+        application_id: int,
+        app_data: Dict[str, Any],
+        reference_version: int,
+        final_status: FinalStatus,
+        step_logs: List[StepLogRecord],
+        terminal_rule_logs: List[RuleLogRecord]
+    ) -> Dict[str, Any]:
+        return {
+            "application_id": application_id,
+            "pipeline_id": self.pipeline_id,
+            "step_logs": dump_logs(step_logs),
+            "terminal_rule_logs": dump_logs(terminal_rule_logs),
+            "final_status": final_status.value,
+            "reference_version": reference_version,
+            "pipeline_version": self.version,
+            "input_hash": application_fingerprint(app_data),
+        }
 
     def _evaluate_terminal_rules(
         self,
-        terminal_rules: List[Dict[str, Any]],
         step_results: Dict[str, Any]
-    ) -> Tuple[FinalStatus, List[TerminalRuleLog]]:
+    ) -> Tuple[FinalStatus, List[RuleLogRecord]]:
         """
         Evaluate terminal rules based on step results
 
         Args:
-            terminal_rules: List of terminal rule configurations
             step_results: Dictionary of step results keyed by step_type
 
         Returns:
             Tuple of (Final status, Terminal rule logs)
         """
-        # Sort rules by order
-        sorted_rules = sorted(terminal_rules, key=lambda x: x["order"])
+        terminal_rule_logs = self._terminal_rule_logs(step_results)
+        for log in terminal_rule_logs:
+            if log.matched:
+                return log.outcome, terminal_rule_logs
+        return FinalStatus.NEEDS_REVIEW, terminal_rule_logs
+
+    def _terminal_rule_logs(
+        self,
+        step_results: Dict[str, Any],
+        matched_index: Optional[int] = None
+    ) -> List[RuleLogRecord]:
+        """
+        Build terminal rule logs for one application
 
+        Rules are evaluated in order until one matches; later rules are logged
+        as not evaluated. When the matching rule is already known from a batch
+        evaluation, `matched_index` skips re-checking which rule won.
+        """
         terminal_rule_logs = []
-        final_status = FinalStatus.NEEDS_REVIEW
         matched_rule_found = False
 
         # Evaluate each rule in order
-        for rule in sorted_rules:
-            condition = rule["condition"]
-            outcome = rule["outcome"]
-            order = rule["order"]
+        for index, (rule, condition, outcome) in enumerate(
+            zip(self.rules.rules, self.rules.conditions, self.outcomes)
+        ):
 
             # If a rule already matched, skip evaluation but log it
             if matched_rule_found:
-                log = TerminalRuleLog(
-                    condition=condition,
-                    outcome=FinalStatus(outcome),
-                    order=order,
+                terminal_rule_logs.append(RuleLogRecord(
+                    condition=rule["condition"],
+                    outcome=outcome,
+                    order=rule["order"],
                     evaluated=False,
-                    matched=False,
-                    reason="Not evaluated (previous rule matched)"
-                )
-                terminal_rule_logs.append(log)
+                    matched=False
+                ))
                 continue
 
             # Evaluate the condition
-            evaluation_result, reason = self._evaluate_condition_with_reason(condition, step_results)
+            evaluation_result, trace = condition.evaluate(step_results)
+            if matched_index is not None:
+                evaluation_result = index == matched_index
 
-            # Create log entry
             if evaluation_result:
                 # This rule matched!
-                final_status = FinalStatus(outcome)
                 matched_rule_found = True
-                log = TerminalRuleLog(
-                    condition=condition,
-                    outcome=FinalStatus(outcome),
-                    order=order,
-                    evaluated=True,
-                    matched=True,
-                    reason=f"Rule matched: {reason}"
-                )
-            else:
-                # Rule did not match
-                log = TerminalRuleLog(
-                    condition=condition,
-                    outcome=FinalStatus(outcome),
-                    order=order,
-                    evaluated=True,
-                    matched=False,
-                    reason=f"Rule not matched: {reason}"
-                )
 
-            terminal_rule_logs.append(log)
+            terminal_rule_logs.append(RuleLogRecord(
+                condition=rule["condition"],
+                outcome=outcome,
+                order=rule["order"],
+                evaluated=True,
+                matched=evaluation_result,
+                trace=trace
+            ))
+
+        return terminal_rule_logs
 
-        return final_status, terminal_rule_logs
 
-    def _evaluate_condition_with_reason(
+class PipelineExecutor:
+    """
+    Core orchestration logic for executing pipelines on loan applications
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def execute(
         self,
-        condition: str,
-        step_results: Dict[str, Any]
-    ) -> Tuple[bool, str]:
+        application_id: int,
+        pipeline_id: int,
+        timeout_ms: Optional[int] = None,
+        max_timeout_ms: Optional[int] = None
+    ) -> PipelineRun:
         """
-        Evaluate a terminal rule condition and provide a reason
+        Execute a pipeline on a loan application
+
+        Args:
+            application_id: ID of the loan application
+            pipeline_id: ID of the pipeline to execute
+            timeout_ms: Run time budget, overriding the pipeline and global defaults
+            max_timeout_ms: Upper bound on the budget, which also applies when none is configured
 
         Returns:
-            Tuple of (evaluation result, human-readable reason)
+            PipelineRun with execution results
+
+        Raises:
+            ValueError: If application or pipeline not found
         """
-        # Handle "else" (catch-all)
-        if condition.strip().lower() == "else":
-            return True, "Catch-all condition (else)"
-
-        # Handle OR conditions
-        if " OR " in condition:
-            parts = condition.split(" OR ")
-            results = []
-            for part in parts:
-                result, reason = self._evaluate_condition_with_reason(part.strip(), step_results)
-                results.append((result, reason))
-                if result:
-                    return True, f"OR condition TRUE: {reason}"
-            # All were false
-            failed_reasons = [reason for _, reason in results]
-            return False, f"OR condition FALSE: {' AND '.join(failed_reasons)}"
-
-        # Handle AND conditions
-        if " AND " in condition:
-            parts = condition.split(" AND ")
-            results = []
-            for part in parts:
-                result, reason = self._evaluate_condition_with_reason(part.strip(), step_results)
-                results.append((result, reason))
-                if not result:
-                    return False, f"AND condition FALSE: {reason}"
-            # All were true
-            passed_reasons = [reason for _, reason in results]
-            return True, f"AND condition TRUE: {' AND '.join(passed_reasons)}"
-
-        # Handle simple conditions
-        if ".failed" in condition:
-            step_name = condition.replace(".failed", "").strip()
-            if step_name in step_results:
-                result = step_results[step_name]
-                if not result.passed:
-                    return True, f"{step_name} failed ({result.message})"
-                else:
-                    return False, f"{step_name} passed ({result.message})"
-            return False, f"{step_name} not found"
-
-        if ".passed" in condition:
-            step_name = condition.replace(".passed", "").strip()
-            if step_name in step_results:
-                result = step_results[step_name]
-                if result.passed:
-                    return True, f"{step_name} passed ({result.message})"
-                else:
-                    return False, f"{step_name} failed ({result.message})"
-            return False, f"{step_name} not found"
-
-        # Handle value comparisons (e.g., "risk_scoring.risk <= 45")
-        if "<=" in condition or ">=" in condition or "<" in condition or ">" in condition or "==" in condition:
-            try:
-                for op in ["<=", ">=", "==", "<", ">"]:
-                    if op in condition:
-                        left, right = condition.split(op)
-                        left = left.strip()
-                        right = right.strip()
-
-                        left_value = self._evaluate_value(left, step_results)
-                        right_value = self._evaluate_value(right, step_results)
-
-                        if op == "<=":
-                            result = left_value <= right_value
-                        elif op == ">=":
-                            result = left_value >= right_value
-                        elif op == "<":
-                            result = left_value < right_value
-                        elif op == ">":
-                            result = left_value > right_value
-                        elif op == "==":
-                            result = left_value == right_value
-
-                        reason = f"{left} ({left_value}) {op} {right} ({right_value})"
-                        return result, reason
-            except Exception as e:
-                return False, f"Error evaluating condition: {str(e)}"
-
-        return False, "Unknown condition format"
-
-    def _evaluate_value(self, value_str: str, step_results: Dict[str, Any]) -> Any:
+        # 1. Load application and pipeline
+        application = self.db.query(LoanApplication).filter(
+            LoanApplication.id == application_id
+        ).first()
+        if not application:
+            raise ValueError(f"Application {application_id} not found")
+
+        pipeline = self.db.query(Pipeline).filter(
+            Pipeline.id == pipeline_id
+        ).first()
+        if not pipeline:
+            raise ValueError(f"Pipeline {pipeline_id} not found")
+
+        # 2. Execute steps in order and evaluate terminal rules, on the latest country policy
+        reference_data.refresh_if_due(self.db)
+        context = RunContext(Deadline(run_budget_ms(pipeline, timeout_ms, max_timeout_ms)))
+        compiled = CompiledPipeline.from_db(pipeline)
+        app_data = application_to_dict(application)
+        row = compiled.run_to_row(application_id, app_data, context)
+
+        # 3. Update application status and persist the run, its summary and analytics together
+        application.status = row["final_status"]
+        run = PipelineRun(**row)
+        self.db.add(run)
+        self.db.flush()
+        write_summary(self.db, run.id, row, app_data, pipeline.name)
+        self.db.commit()
+        self.db.refresh(run)
+
+        return run
+
+    def find_reusable_run(self, application_id: int, pipeline_id: int) -> Optional[PipelineRun]:
         """
-        Evaluate a value string
+        Find the latest run of a pipeline on an application that executing again would reproduce
 
-        Supports:
-        - Numbers: "45" -> 45
-        - Step computed values: "risk_scoring.risk" -> step_results["risk_scoring"].computed_values["risk"]
-        - Step params: "risk_scoring.params.approve_threshold" -> params value from step result
+        A run is reusable when the application data, the pipeline version and
+        the country policy version are the ones it ran with, and no step timed
+        out or degraded. The application's status is set back to its outcome.
+
+        Raises:
+            ValueError: If application or pipeline not found
+        """
+        application = self.db.query(LoanApplication).filter(
+            LoanApplication.id == application_id
+        ).first()
+        if not application:
+            raise ValueError(f"Application {application_id} not found")
+
+        pipeline = self.db.query(Pipeline).filter(
+            Pipeline.id == pipeline_id
+        ).first()
+        if not pipeline:
+            raise ValueError(f"Pipeline {pipeline_id} not found")
+
+        run = self.db.query(PipelineRun).filter(
+            PipelineRun.application_id == application_id,
+            PipelineRun.pipeline_id == pipeline_id
+        ).order_by(PipelineRun.id.desc()).first()
+        if (
+            run is None
+            or run.pipeline_version != pipeline.version
+            or run.reference_version != reference_data.snapshot.version
+            or run.input_hash != application_fingerprint(application_to_dict(application))
+            or any(log.get("timed_out") or log.get("degraded") for log in json.loads(run.step_logs))
+        ):
+            return None
+
+        metrics.increment("runs.reused")
+        if application.status != run.final_status:
+            application.status = run.final_status
+            self.db.commit()
+        return run
+
+
+class AsyncPipelineExecutor:
+    """
+    PipelineExecutor for async routes
+
+    Loads and persists through an AsyncSession. Pipelines made only of
+    CPU-bound steps run on the event loop (they take microseconds); pipelines
+    with blocking steps, such as LLM calls, run in a worker thread.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def execute(
+        self,
+        application_id: int,
+        pipeline_id: int,
+        timeout_ms: Optional[int] = None,
+        max_timeout_ms: Optional[int] = None
+    ) -> PipelineRun:
+        """
+        Execute a pipeline on a loan application
+
+        Raises:
+            ValueError: If application or pipeline not found
         """
-        value_str = value_str.strip()
-
-        # Try to parse as number
-        try:
-            if "." in value_str and value_str.replace(".", "").replace("-", "").isdigit():
-                return float(value_str)
-            elif value_str.replace("-", "").isdigit():
-                return int(value_str)
-        except ValueError:
-            pass
-
-        # Parse step reference (e.g., "risk_scoring.risk" or "risk_scoring.params.approve_threshold")
-        if "." in value_str:
-            parts = value_str.split(".")
-            step_name = parts[0]
-
-            if step_name in step_results:
-                result = step_results[step_name]
-
-                if len(parts) == 2:
-                    # e.g., "risk_scoring.risk"
-                    field_name = parts[1]
-                    return result.computed_values.get(field_name)
-                elif len(parts) == 3 and parts[1] == "params":
-                    # e.g., "risk_scoring.params.approve_threshold"
-                    param_name = parts[2]
-                    return result.computed_values.get(param_name)
-
-        return value_str
+        application = await self.db.get(LoanApplication, application_id)
+        if not application:
+            raise ValueError(f"Application {application_id} not found")
+
+        pipeline = await self.db.get(Pipeline, pipeline_id)
+        if not pipeline:
+            raise ValueError(f"Pipeline {pipeline_id} not found")
+
+        await self.db.run_sync(reference_data.refresh_if_due)
+        context = RunContext(Deadline(run_budget_ms(pipeline, timeout_ms, max_timeout_ms)))
+        compiled = CompiledPipeline.from_db(pipeline)
+        app_data = application_to_dict(application)
+        if compiled.blocking:
+            row = await asyncio.to_thread(compiled.run_to_row, application_id, app_data, context)
+        else:
+            row = compiled.run_to_row(application_id, app_data, context)
+
+        # Status, run, summary and analytics are written in one transaction
+        application.status = row["final_status"]
+        run = PipelineRun(**row)
+        self.db.add(run)
+        await self.db.flush()
+        await self.db.run_sync(write_summary, run.id, row, app_data, pipeline.name)
+        await self.db.commit()
+        await self.db.refresh(run)
+
+        return run
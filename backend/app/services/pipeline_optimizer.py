@@ -0,0 +1,101 @@
+"""
+Save-time analysis of pipelines
+
+`optimize_pipeline` checks a pipeline's steps and terminal rules when it is
+saved and returns an execution plan plus human-readable warnings:
+
+- steps no reachable terminal rule references (they can never change the outcome)
+- rules placed after an always-true rule such as `else` (never reached)
+- conditions whose result does not depend on any step
+- conditions referencing steps the pipeline doesn't have
+
+The plan's `step_order` runs referenced steps before unreferenced ones, cheap
+steps (by `BaseStep.cost`) before expensive ones, and among equally cheap steps
+those that can lead to a REJECTED outcome first, so short-circuiting pipelines
+reach a decision with the least work. Only steps declared `order_independent`
+move; the others keep their authored positions.
+"""
+from typing import Any, Dict, List
+from app.services.conditions import parse_condition
+from app.steps.registry import get_step_class
+
+
+def optimize_pipeline(
+    steps_config: List[Dict[str, Any]],
+    terminal_rules: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Analyze a pipeline and propose its execution plan
+
+    Args:
+        steps_config: Step configs as stored (step_type, order, params)
+        terminal_rules: Terminal rules as stored (condition, outcome, order)
+
+    Returns:
+        Dict with step_order, unreferenced_steps, unreachable_rules and warnings
+    """
+    steps = sorted(steps_config, key=lambda x: x["order"])
+    rules = sorted(terminal_rules, key=lambda x: x["order"])
+    step_types = [step["step_type"] for step in steps]
+    warnings = []
+
+    referenced = set()
+    rejecting = set()
+    unreachable_rules = []
+    always_true_rule = None
+    for rule in rules:
+        if always_true_rule is not None:
+            unreachable_rules.append(rule["order"])
+            warnings.append(
+                f"Rule {rule['order']} ({rule['condition']}) is unreachable: "
+                f"rule {always_true_rule} always matches"
+            )
+            continue
+
+        condition = parse_condition(rule["condition"])
+        refs = set(condition.step_refs())
+        referenced |= refs
+        if _outcome(rule) == "REJECTED":
+            rejecting |= refs
+
+        for missing in sorted(refs - set(step_types)):
+            warnings.append(f"Rule {rule['order']} ({rule['condition']}) references {missing}, which is not in the pipeline")
+
+        constant = condition.constant()
+        if constant is True:
+            always_true_rule = rule["order"]
+            if rule["condition"].strip().lower() != "else":
+                warnings.append(f"Rule {rule['order']} ({rule['condition']}) is always true")
+        elif constant is False:
+            warnings.append(f"Rule {rule['order']} ({rule['condition']}) never matches")
+
+    unreferenced_steps = [step_type for step_type in step_types if step_type not in referenced]
+    for step_type in unreferenced_steps:
+        warnings.append(f"Step {step_type} is not referenced by any terminal rule and cannot affect the outcome")
+
+    independent = {step_type for step_type in step_types if get_step_class(step_type).order_independent}
+    ranked = iter(sorted(
+        (step for step in steps if step["step_type"] in independent),
+        key=lambda step: (
+            step["step_type"] not in referenced,
+            get_step_class(step["step_type"]).cost,
+            step["step_type"] not in rejecting,
+            step["order"],
+        )
+    ))
+    step_order = [
+        next(ranked)["step_type"] if step_type in independent else step_type
+        for step_type in step_types
+    ]
+
+    return {
+        "step_order": step_order,
+        "unreferenced_steps": unreferenced_steps,
+        "unreachable_rules": unreachable_rules,
+        "warnings": warnings,
+    }
+
+
+def _outcome(rule: Dict[str, Any]) -> str:
+    outcome = rule["outcome"]
+    return getattr(outcome, "value", outcome)
@@ -0,0 +1,256 @@
+"""
+Tiered archival of old pipeline runs
+
+`archive_runs` moves runs older than the retention window out of
+`pipeline_runs` into append-only archive files under ARCHIVE_DIR, one per
+month of `executed_at` (`runs-YYYY-MM.seg`). Each archival batch appends a
+segment: a small JSON header followed by one zlib-compressed block per
+column (integers as int64 arrays, text as offsets plus one UTF-8 blob), so
+the repetitive JSON logs of neighbouring runs compress together.
+
+`run_archive_segments` is the index: file, byte range and run id range of
+every segment. A segment's index row is committed in the same transaction
+that deletes its runs from the hot table, so a crash after the file write
+leaves only an unreferenced tail in the file, and the runs stay hot. The
+same transaction flags the runs' `run_summary` rows as archived; those rows
+and `shadow_runs` refer to run ids without foreign keys, so they stay valid
+once the runs leave the hot table.
+
+Reads (`load_run`, `find_runs`, `iter_runs`) return transient PipelineRun
+objects, so API responses look the same whether a run is hot or archived.
+"""
+import json
+import os
+import struct
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.db_models import PipelineRun, RunArchiveSegment, RunSummary
+
+MAGIC = b"RUNSEG1\n"
+EPOCH = datetime(1970, 1, 1)
+
+# Column name -> kind; the order is the order of blocks in a segment
+COLUMNS = {
+    "id": "int",
+    "application_id": "int",
+    "pipeline_id": "int",
+    "final_status": "str",
+    "reference_version": "int",
+    "pipeline_version": "int",
+    "input_hash": "str",
+    "executed_at": "datetime",
+    "step_logs": "str",
+    "terminal_rule_logs": "str",
+}
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _encode_column(kind: str, values: List[Any]) -> Dict[str, Any]:
+    nulls = np.array([value is None for value in values])
+    if kind == "str":
+        encoded = [(value or "").encode() for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        data = offsets.tobytes() + b"".join(encoded)
+    else:
+        if kind == "datetime":
+            values = [None if value is None else _to_micros(value) for value in values]
+        data = np.array([0 if value is None else value for value in values], dtype=np.int64).tobytes()
+    mask = np.packbits(nulls).tobytes() if nulls.any() else b""
+    return {"block": zlib.compress(mask + data, 6), "mask_length": len(mask)}
+
+
+def encode_segment(rows: List[Dict[str, Any]]) -> bytes:
+    """Serialize run rows (pipeline_runs columns) into one segment"""
+    columns, blocks = [], []
+    for name, kind in COLUMNS.items():
+        encoded = _encode_column(kind, [row[name] for row in rows])
+        columns.append({"name": name, "length": len(encoded["block"]), "mask_length": encoded["mask_length"]})
+        blocks.append(encoded["block"])
+    header = json.dumps({"rows": len(rows), "columns": columns}).encode()
+    return MAGIC + struct.pack("<I", len(header)) + header + b"".join(blocks)
+
+
+class Segment:
+    """A segment read from an archive file; column blocks are decompressed on first use"""
+
+    def __init__(self, data: bytes):
+        if not data.startswith(MAGIC):
+            raise ValueError("Not a run archive segment")
+        (header_length,) = struct.unpack_from("<I", data, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(data[start:start + header_length])
+        self.rows = header["rows"]
+        self._blocks = {}
+        position = start + header_length
+        for column in header["columns"]:
+            self._blocks[column["name"]] = (data[position:position + column["length"]], column["mask_length"])
+            position += column["length"]
+        self._decoded: Dict[str, Any] = {}
+
+    def _decode(self, name: str):
+        """(null mask, int64 values or string offsets, string blob) of a column"""
+        # Segments are shared through the read cache; concurrent first reads just decode twice
+        if name not in self._decoded:
+            block, mask_length = self._blocks[name]
+            raw = zlib.decompress(block)
+            nulls = (
+                np.unpackbits(np.frombuffer(raw, dtype=np.uint8, count=mask_length), count=self.rows).astype(bool)
+                if mask_length else None
+            )
+            if COLUMNS[name] == "str":
+                offsets = np.frombuffer(raw, dtype=np.int64, count=self.rows + 1, offset=mask_length)
+                self._decoded[name] = (nulls, offsets, raw[mask_length + offsets.nbytes:])
+            else:
+                self._decoded[name] = (nulls, np.frombuffer(raw, dtype=np.int64, offset=mask_length), None)
+        return self._decoded[name]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._decode("id")[1]
+
+    def value(self, name: str, index: int) -> Any:
+        nulls, values, blob = self._decode(name)
+        if nulls is not None and nulls[index]:
+            return None
+        kind = COLUMNS[name]
+        if kind == "str":
+            return blob[values[index]:values[index + 1]].decode()
+        if kind == "datetime":
+            return EPOCH + timedelta(microseconds=int(values[index]))
+        return int(values[index])
+
+    def run(self, index: int) -> PipelineRun:
+        return PipelineRun(**{name: self.value(name, index) for name in COLUMNS})
+
+    def position(self, run_id: int) -> Optional[int]:
+        index = int(np.searchsorted(self.ids, run_id))
+        if index < self.rows and self.ids[index] == run_id:
+            return index
+        return None
+
+
+@lru_cache(maxsize=32)
+def _read_segment(path: str, offset: int, length: int) -> Segment:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return Segment(f.read(length))
+
+
+def _segment(entry: RunArchiveSegment, archive_dir: Optional[str] = None) -> Segment:
+    return _read_segment(os.path.join(archive_dir or settings.archive_dir, entry.path), entry.offset, entry.length)
+
+
+def _append(archive_dir: str, month: str, rows: List[Dict[str, Any]]) -> RunArchiveSegment:
+    """Append a segment to the month's file, durably, and return its (uncommitted) index row"""
+    os.makedirs(archive_dir, exist_ok=True)
+    name = f"runs-{month}.seg"
+    data = encode_segment(rows)
+    with open(os.path.join(archive_dir, name), "ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return RunArchiveSegment(
+        month=month,
+        path=name,
+        offset=offset,
+        length=len(data),
+        runs=len(rows),
+        min_run_id=rows[0]["id"],
+        max_run_id=rows[-1]["id"]
+    )
+
+
+def archive_runs(
+    db: Session,
+    older_than: datetime,
+    archive_dir: Optional[str] = None,
+    batch_size: int = 5000
+) -> Dict[str, int]:
+    """
+    Move runs executed before `older_than` into the archive
+
+    Returns:
+        Runs archived per month (YYYY-MM)
+    """
+    archive_dir = archive_dir or settings.archive_dir
+    archived: Dict[str, int] = defaultdict(int)
+    runs = PipelineRun.__table__
+    while True:
+        rows = [dict(row) for row in db.execute(
+            select(runs).where(runs.c.executed_at < older_than).order_by(runs.c.id).limit(batch_size)
+        ).mappings()]
+        if not rows:
+            return dict(archived)
+
+        by_month: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_month[row["executed_at"].strftime("%Y-%m")].append(row)
+        for month, month_rows in sorted(by_month.items()):
+            run_ids = [row["id"] for row in month_rows]
+            db.add(_append(archive_dir, month, month_rows))
+            db.execute(update(RunSummary).where(RunSummary.run_id.in_(run_ids)).values(archived=True))
+            db.execute(delete(PipelineRun).where(PipelineRun.id.in_(run_ids)))
+            db.commit()
+            archived[month] += len(month_rows)
+
+
+def retention_cutoff(retention_days: Optional[int] = None) -> datetime:
+    """Naive UTC cutoff for the retention window, comparable with stored executed_at"""
+    days = settings.archive_retention_days if retention_days is None else retention_days
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+
+
+def _segments_for(db: Session, min_run_id: int, max_run_id: int) -> List[RunArchiveSegment]:
+    return db.query(RunArchiveSegment).filter(
+        RunArchiveSegment.min_run_id <= max_run_id,
+        RunArchiveSegment.max_run_id >= min_run_id
+    ).order_by(RunArchiveSegment.id).all()
+
+
+def load_run(db: Session, run_id: int, archive_dir: Optional[str] = None) -> Optional[PipelineRun]:
+    """An archived run by id, or None if it isn't archived"""
+    for entry in _segments_for(db, run_id, run_id):
+        segment = _segment(entry, archive_dir)
+        index = segment.position(run_id)
+        if index is not None:
+            return segment.run(index)
+    return None
+
+
+def find_runs(db: Session, run_ids: Iterable[int], archive_dir: Optional[str] = None) -> Dict[int, PipelineRun]:
+    """Archived runs among `run_ids`, keyed by id"""
+    wanted = np.unique(np.fromiter(run_ids, dtype=np.int64))
+    found: Dict[int, PipelineRun] = {}
+    if not len(wanted):
+        return found
+    for entry in _segments_for(db, int(wanted[0]), int(wanted[-1])):
+        segment = _segment(entry, archive_dir)
+        for index in np.nonzero(np.isin(segment.ids, wanted))[0].tolist():
+            run = segment.run(index)
+            found[run.id] = run
+    return found
+
+
+def iter_runs(db: Session, month: Optional[str] = None, archive_dir: Optional[str] = None) -> Iterator[PipelineRun]:
+    """Every archived run, optionally of one month (YYYY-MM), segment by segment"""
+    query = db.query(RunArchiveSegment)
+    if month is not None:
+        query = query.filter(RunArchiveSegment.month == month)
+    for entry in query.order_by(RunArchiveSegment.month, RunArchiveSegment.id).all():
+        segment = _segment(entry, archive_dir)
+        for index in range(segment.rows):
+            yield segment.run(index)
@@ -0,0 +1,61 @@
+"""
+Indexed run history lookups
+
+Run history for one application or one pipeline is read through the
+(application_id, executed_at) and (pipeline_id, executed_at) indexes, newest
+first, so neither scans the runs table. Ties on executed_at (SQLite stores
+whole seconds) are broken by id, which the index carries as the rowid.
+"""
+from typing import List, Optional, Sequence
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.db_models import PipelineRun
+
+
+def _newest_first(statement):
+    return statement.order_by(PipelineRun.executed_at.desc(), PipelineRun.id.desc())
+
+
+def application_runs(db: Session, application_id: int, skip: int = 0, limit: int = 100) -> List[PipelineRun]:
+    return db.scalars(_newest_first(
+        select(PipelineRun).where(PipelineRun.application_id == application_id)
+    ).offset(skip).limit(limit)).all()
+
+
+def pipeline_runs(db: Session, pipeline_id: int, skip: int = 0, limit: int = 100) -> List[PipelineRun]:
+    return db.scalars(_newest_first(
+        select(PipelineRun).where(PipelineRun.pipeline_id == pipeline_id)
+    ).offset(skip).limit(limit)).all()
+
+
+def latest_runs(
+    db: Session,
+    pipeline_id: Optional[int] = None,
+    application_ids: Optional[Sequence[int]] = None,
+    limit: int = 100,
+    after_application_id: Optional[int] = None
+) -> List[PipelineRun]:
+    """
+    The latest run of each application, optionally of one pipeline or for some applications
+
+    Runs get increasing ids as they are written, so the latest run of an
+    application is its highest id: a group-wise MAX(id) that SQLite answers
+    from the application_id indexes alone, then one primary-key lookup per
+    application.
+
+    Results come in application id order, at most `limit` applications
+    after `after_application_id`; pass the last application id of a page to
+    get the next one. The group-wise scan starts at that id and stops after
+    `limit` groups, so every page costs the same.
+    """
+    latest = select(func.max(PipelineRun.id)).group_by(PipelineRun.application_id)
+    if pipeline_id is not None:
+        latest = latest.where(PipelineRun.pipeline_id == pipeline_id)
+    if application_ids is not None:
+        latest = latest.where(PipelineRun.application_id.in_(application_ids))
+    if after_application_id is not None:
+        latest = latest.where(PipelineRun.application_id > after_application_id)
+    latest = latest.order_by(PipelineRun.application_id).limit(limit)
+    return db.scalars(
+        select(PipelineRun).where(PipelineRun.id.in_(latest)).order_by(PipelineRun.application_id)
+    ).all()
@@ -0,0 +1,108 @@
+"""
+Run log records used on the execution path
+
+The executor builds these slotted records for every step and terminal rule of
+every run and serializes them straight to the JSON stored on PipelineRun. The
+Pydantic `StepLog` and `TerminalRuleLog` models are only built at the API
+boundary, from the stored JSON.
+"""
+import json
+from typing import Any, Dict, List, Optional
+from app.models import FinalStatus, StepLog, TerminalRuleLog
+
+
+class StepLogRecord:
+    __slots__ = ("step_type", "order", "passed", "computed_values", "trace", "timed_out", "degraded", "skipped")
+
+    def __init__(
+        self,
+        step_type: str,
+        order: int,
+        passed: bool,
+        computed_values: Dict[str, Any],
+        trace: List[Any],
+        timed_out: bool = False,
+        degraded: bool = False,
+        skipped: bool = False
+    ):
+        self.step_type = step_type
+        self.order = order
+        self.passed = passed
+        self.computed_values = computed_values
+        self.trace = trace
+        self.timed_out = timed_out
+        self.degraded = degraded
+        self.skipped = skipped
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stored form, with the same keys as StepLog"""
+        return {
+            "step_type": self.step_type,
+            "order": self.order,
+            "passed": self.passed,
+            "computed_values": self.computed_values,
+            "trace": self.trace,
+            "timed_out": self.timed_out,
+            "degraded": self.degraded,
+            "skipped": self.skipped,
+        }
+
+    def to_model(self) -> StepLog:
+        return StepLog(**self.to_dict())
+
+    def __eq__(self, other):
+        if not isinstance(other, StepLogRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"StepLogRecord({self.to_dict()!r})"
+
+
+class RuleLogRecord:
+    __slots__ = ("condition", "outcome", "order", "evaluated", "matched", "trace")
+
+    def __init__(
+        self,
+        condition: str,
+        outcome: FinalStatus,
+        order: int,
+        evaluated: bool,
+        matched: bool,
+        trace: Optional[List[Any]] = None
+    ):
+        self.condition = condition
+        self.outcome = outcome
+        self.order = order
+        self.evaluated = evaluated
+        self.matched = matched
+        self.trace = trace
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stored form, with the same keys as TerminalRuleLog"""
+        data = {
+            "condition": self.condition,
+            "outcome": self.outcome.value,
+            "order": self.order,
+            "evaluated": self.evaluated,
+            "matched": self.matched,
+        }
+        if self.trace is not None:
+            data["trace"] = self.trace
+        return data
+
+    def to_model(self) -> TerminalRuleLog:
+        return TerminalRuleLog(**self.to_dict())
+
+    def __eq__(self, other):
+        if not isinstance(other, RuleLogRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"RuleLogRecord({self.to_dict()!r})"
+
+
+def dump_logs(records: List[Any]) -> str:
+    """Serialize step or rule log records to the JSON stored on PipelineRun"""
+    return json.dumps([record.to_dict() for record in records])
@@ -0,0 +1,104 @@
+"""
+Denormalized run summaries for the run history dashboard
+
+Every write path that persists a pipeline run also inserts its `run_summary`
+row in the same transaction: applicant name, country and amount, pipeline
+name, outcome and the key scores pulled out of the step logs once at write
+time. Dashboard pages then read one indexed table instead of joining
+applications and pipelines and parsing both JSON log columns per row.
+"""
+import json
+import math
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app.db_models import LoanApplication, Pipeline, PipelineRun, RunSummary
+from app.services import analytics
+
+
+def key_scores(step_logs: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """DTI, risk and sentiment risk of a run's stored step logs (None when a step didn't produce it)"""
+    values = {log["step_type"]: log.get("computed_values") or {} for log in step_logs}
+    dti = values.get("dti_rule", {}).get("dti", values.get("risk_scoring", {}).get("dti"))
+    return {
+        "dti": dti if dti is not None and math.isfinite(dti) else None,
+        "risk": values.get("risk_scoring", {}).get("risk"),
+        "sentiment_risk": values.get("sentiment_check", {}).get("risk_score"),
+    }
+
+
+def summary_row(run_id: int, row: Dict[str, Any], app_data: Dict[str, Any], pipeline_name: str) -> Dict[str, Any]:
+    """run_summary row for a serialized pipeline_runs row and the application data it scored"""
+    summary = {
+        "run_id": run_id,
+        "application_id": row["application_id"],
+        "pipeline_id": row["pipeline_id"],
+        "applicant_name": app_data["applicant_name"],
+        "country": app_data["country"],
+        "amount": app_data["amount"],
+        "pipeline_name": pipeline_name,
+        "final_status": row["final_status"],
+        **key_scores(json.loads(row["step_logs"])),
+    }
+    if "executed_at" in row:
+        # Stored runs keep their own timestamp; new ones get the insert time
+        summary["executed_at"] = row["executed_at"]
+    return summary
+
+
+def write_summaries(db: Session, run_ids: List[int], rows: List[Dict[str, Any]]):
+    """
+    Insert summaries for bulk-inserted runs and fold them into the
+    analytics rollups, without committing
+
+    Applicant fields and pipeline names are loaded with one query each.
+    """
+    if not rows:
+        return
+    applications = {
+        app.id: app for app in db.execute(
+            select(LoanApplication.id, LoanApplication.applicant_name, LoanApplication.country, LoanApplication.amount)
+            .where(LoanApplication.id.in_({row["application_id"] for row in rows}))
+        )
+    }
+    pipeline_names = dict(db.execute(
+        select(Pipeline.id, Pipeline.name).where(Pipeline.id.in_({row["pipeline_id"] for row in rows}))
+    ).all())
+    summaries = [
+        summary_row(run_id, row, applications[row["application_id"]]._asdict(), pipeline_names[row["pipeline_id"]])
+        for run_id, row in zip(run_ids, rows)
+    ]
+    db.execute(insert(RunSummary), summaries)
+    analytics.record(db, summaries)
+
+
+def write_summary(db: Session, run_id: int, row: Dict[str, Any], app_data: Dict[str, Any], pipeline_name: str):
+    """Add the summary of one run being written and fold it into the analytics rollups, without committing"""
+    summary = summary_row(run_id, row, app_data, pipeline_name)
+    db.add(RunSummary(**summary))
+    analytics.record(db, [summary])
+
+
+def rename_pipeline(db: Session, pipeline_id: int, name: str):
+    """Carry a pipeline rename into its summaries, without committing"""
+    db.execute(update(RunSummary).where(RunSummary.pipeline_id == pipeline_id).values(pipeline_name=name))
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    """Write summaries for runs that have none (runs stored before the table existed)"""
+    written = 0
+    while True:
+        runs = db.execute(
+            select(PipelineRun.id, PipelineRun.application_id, PipelineRun.pipeline_id,
+                   PipelineRun.final_status, PipelineRun.step_logs, PipelineRun.executed_at)
+            .outerjoin(RunSummary, RunSummary.run_id == PipelineRun.id)
+            .where(RunSummary.run_id.is_(None))
+            .order_by(PipelineRun.id)
+            .limit(batch_size)
+        ).all()
+        if not runs:
+            return written
+        rows = [run._asdict() for run in runs]
+        write_summaries(db, [row["id"] for row in rows], rows)
+        db.commit()
+        written += len(rows)
@@ -0,0 +1,217 @@
+"""
+Shadow (challenger) pipeline runs
+
+A pipeline with a `shadow_pipeline_id` has each of its API runs replayed on
+the challenger pipeline by background worker threads, after the primary
+result has been returned. Shadow runs go to their own table with whether the
+challenger agreed with the primary outcome; they never change application
+status or appear among real runs.
+
+Shadow work is best effort and shed under load: when the queue is full, when
+the LLM provider guard is saturated or its breaker is open, and when a job
+waited longer than `shadow_max_queue_delay_ms` before a worker got to it.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.db_models import LoanApplication, Pipeline, PipelineRun, ShadowRun
+from app.metrics import metrics
+from app.reference_data import CountryPolicySnapshot, reference_data
+from app.sentiment import openai_guard
+from app.services.pipeline_executor import CompiledPipeline, application_to_dict
+from app.steps.context import Deadline, RunContext
+
+
+class ShadowJob:
+    __slots__ = (
+        "primary_run_id", "application_id", "app_data", "primary_pipeline_id",
+        "shadow_pipeline_id", "primary_status", "reference", "enqueued_at"
+    )
+
+    def __init__(
+        self,
+        primary_run_id: int,
+        application_id: int,
+        app_data: Dict[str, Any],
+        primary_pipeline_id: int,
+        shadow_pipeline_id: int,
+        primary_status: str,
+        reference: CountryPolicySnapshot
+    ):
+        self.primary_run_id = primary_run_id
+        self.application_id = application_id
+        self.app_data = app_data
+        self.primary_pipeline_id = primary_pipeline_id
+        self.shadow_pipeline_id = shadow_pipeline_id
+        self.primary_status = primary_status
+        self.reference = reference
+        self.enqueued_at = time.monotonic()
+
+
+def llm_saturated() -> bool:
+    """True while LLM calls are rejected or at the adaptive concurrency limit"""
+    return openai_guard.is_open() or openai_guard.limiter.in_flight >= openai_guard.limiter.limit
+
+
+class ShadowRunner:
+    """Bounded queue of shadow jobs and the worker threads that run them"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_queue_delay_ms: Optional[int] = None,
+        under_load: Callable[[], bool] = llm_saturated
+    ):
+        self.session_factory = session_factory
+        self.workers = max(1, workers or settings.shadow_workers)
+        self.max_queue_delay = (max_queue_delay_ms or settings.shadow_max_queue_delay_ms) / 1000
+        self.under_load = under_load
+        self._queue: "queue.Queue[Optional[ShadowJob]]" = queue.Queue(maxsize=queue_size or settings.shadow_queue_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit_for(self, db: Session, run: PipelineRun) -> bool:
+        """Queue a shadow run for a primary run if its pipeline has a challenger"""
+        pipeline = db.get(Pipeline, run.pipeline_id)
+        if pipeline is None or pipeline.shadow_pipeline_id is None:
+            return False
+        application = db.get(LoanApplication, run.application_id)
+        return self.submit(ShadowJob(
+            run.id,
+            run.application_id,
+            application_to_dict(application),
+            run.pipeline_id,
+            pipeline.shadow_pipeline_id,
+            run.final_status,
+            reference_data.snapshot
+        ))
+
+    def submit(self, job: ShadowJob) -> bool:
+        """Queue a job without blocking; returns False when it was shed"""
+        if self.under_load():
+            metrics.increment("shadow.shed.under_load")
+            return False
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            metrics.increment("shadow.shed.queue_full")
+            return False
+        metrics.increment("shadow.submitted")
+        return True
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"shadow-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if time.monotonic() - job.enqueued_at > self.max_queue_delay:
+                    metrics.increment("shadow.shed.stale")
+                elif self.under_load():
+                    metrics.increment("shadow.shed.under_load")
+                else:
+                    self._execute(job)
+            except Exception as e:
+                metrics.increment("shadow.errors")
+                print(f"Shadow run for run {job.primary_run_id} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, job: ShadowJob):
+        db = self.session_factory()
+        try:
+            pipeline = db.get(Pipeline, job.shadow_pipeline_id)
+            if pipeline is None:
+                raise ValueError(f"Pipeline {job.shadow_pipeline_id} not found")
+            # The challenger runs under its own time budget, as a primary run of it would,
+            # and its run counters go under shadow.runs.* rather than the real runs.*
+            context = RunContext(
+                Deadline(pipeline.timeout_ms or settings.run_timeout_ms),
+                reference=job.reference,
+                metrics_prefix="shadow.runs"
+            )
+            compiled = CompiledPipeline.from_db(pipeline)
+            row = compiled.run_to_row(job.application_id, job.app_data, context)
+            db.add(ShadowRun(
+                primary_run_id=job.primary_run_id,
+                application_id=job.application_id,
+                primary_pipeline_id=job.primary_pipeline_id,
+                shadow_pipeline_id=job.shadow_pipeline_id,
+                shadow_pipeline_version=row["pipeline_version"],
+                step_logs=row["step_logs"],
+                terminal_rule_logs=row["terminal_rule_logs"],
+                primary_status=job.primary_status,
+                final_status=row["final_status"],
+                agreed=row["final_status"] == job.primary_status,
+                reference_version=row["reference_version"]
+            ))
+            db.commit()
+            metrics.increment("shadow.completed")
+        finally:
+            db.close()
+
+    def wait_idle(self):
+        """Block until every queued job has been handled"""
+        self._queue.join()
+
+    def stop(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "workers": len(self._threads),
+            "submitted": int(metrics.get("shadow.submitted")),
+            "completed": int(metrics.get("shadow.completed")),
+            "errors": int(metrics.get("shadow.errors")),
+            "shed": {k: int(v) for k, v in metrics.snapshot("shadow.shed.").items()},
+            "runs_degraded": int(metrics.get("shadow.runs.degraded")),
+        }
+
+
+def shadow_agreement(db: Session, primary_pipeline_id: int, shadow_pipeline_id: int) -> Dict[str, Any]:
+    """Agreement between a pipeline and its challenger over their shadow runs"""
+    outcomes: Dict[str, Dict[str, int]] = {}
+    runs = agreed = 0
+    for primary_status, shadow_status, count in db.query(
+        ShadowRun.primary_status, ShadowRun.final_status, func.count(ShadowRun.id)
+    ).filter(
+        ShadowRun.primary_pipeline_id == primary_pipeline_id,
+        ShadowRun.shadow_pipeline_id == shadow_pipeline_id
+    ).group_by(ShadowRun.primary_status, ShadowRun.final_status):
+        outcomes.setdefault(primary_status, {})[shadow_status] = count
+        runs += count
+        if primary_status == shadow_status:
+            agreed += count
+    return {
+        "runs": runs,
+        "agreed": agreed,
+        "agreement_rate": round(agreed / runs, 4) if runs else 0.0,
+        "outcomes": outcomes,  # primary status -> shadow status -> count
+    }
+
+
+# One runner for the API process
+shadow_runner = ShadowRunner()
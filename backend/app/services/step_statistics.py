@@ -0,0 +1,141 @@
+"""
+Runtime statistics per pipeline and step, and the adaptive step order built from them
+
+For every run the executor records each executed step's latency and outcome,
+and which steps the matching terminal rule referenced (the steps that decided
+the outcome). Every `adaptive_order_interval_runs` runs of a pipeline, its
+order-independent steps are re-sorted by expected cost to a decision:
+
+    mean latency / decisive rate
+
+so cheap steps that often settle the outcome run first. Accumulators are
+halved at each recompute, so the order follows recent traffic.
+
+Statistics are per process and are not persisted.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.config import settings
+
+# Floor for the decisive rate, so steps that never decide still get a finite rank
+_MIN_DECISIVE_RATE = 0.01
+
+
+class _StepAccumulator:
+    __slots__ = ("runs", "latency", "passes", "decisive")
+
+    def __init__(self):
+        self.runs = 0.0
+        self.latency = 0.0
+        self.passes = 0.0
+        self.decisive = 0.0
+
+    def decay(self):
+        self.runs /= 2
+        self.latency /= 2
+        self.passes /= 2
+        self.decisive /= 2
+
+    def rank(self) -> float:
+        """Expected seconds spent per decision this step contributes"""
+        mean_latency = self.latency / self.runs
+        return mean_latency / max(self.decisive / self.runs, _MIN_DECISIVE_RATE)
+
+
+class PipelineStepStats:
+    """Statistics for one pipeline's steps"""
+
+    def __init__(self, pipeline_id: int):
+        self.pipeline_id = pipeline_id
+        self.runs = 0
+        self.order: Optional[List[str]] = None  # Latest adaptive order, None until computed
+        self._steps: Dict[str, _StepAccumulator] = {}
+        self._runs_since_reorder = 0
+        self._lock = threading.Lock()
+
+    def record_steps(self, observations: List[Tuple[str, float, bool]]):
+        """Record executed steps of one run as (step_type, latency seconds, passed)"""
+        with self._lock:
+            for step_type, latency, passed in observations:
+                step = self._steps.get(step_type)
+                if step is None:
+                    step = self._steps[step_type] = _StepAccumulator()
+                step.runs += 1
+                step.latency += latency
+                step.passes += passed
+
+    def record_decisions(self, decisive_steps: Iterable[Set[str]]):
+        """Record, per run, the steps referenced by the rule that decided it"""
+        with self._lock:
+            for step_types in decisive_steps:
+                self.runs += 1
+                self._runs_since_reorder += 1
+                for step_type in step_types:
+                    step = self._steps.get(step_type)
+                    if step is not None:
+                        step.decisive += 1
+
+    def reorder_due(self) -> bool:
+        return self._runs_since_reorder >= settings.adaptive_order_interval_runs
+
+    def reorder(self, base_order: List[str], independent: Set[str]) -> List[str]:
+        """
+        Recompute the adaptive order
+
+        Independent steps with enough samples are sorted by rank into the
+        positions independent steps hold in `base_order`; the rest keep their
+        place relative to them.
+        """
+        with self._lock:
+            ranks = {
+                step_type: step.rank()
+                for step_type, step in self._steps.items()
+                if step.runs >= settings.adaptive_order_min_samples
+            }
+            movable = [step_type for step_type in base_order if step_type in independent]
+            # Unsampled steps sort after sampled ones, keeping their base order
+            ranked = sorted(movable, key=lambda step_type: (step_type not in ranks, ranks.get(step_type, 0.0)))
+            slots = iter(ranked)
+            self.order = [next(slots) if step_type in independent else step_type for step_type in base_order]
+
+            for step in self._steps.values():
+                step.decay()
+            self._runs_since_reorder = 0
+            return self.order
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                step_type: {
+                    "samples": round(step.runs, 2),
+                    "mean_latency_ms": round(step.latency / step.runs * 1000, 4) if step.runs else 0.0,
+                    "pass_rate": round(step.passes / step.runs, 4) if step.runs else 0.0,
+                    "decisive_rate": round(step.decisive / step.runs, 4) if step.runs else 0.0,
+                }
+                for step_type, step in sorted(self._steps.items())
+            }
+
+
+class StepStatistics:
+    """Statistics for every pipeline run in this process"""
+
+    def __init__(self):
+        self._pipelines: Dict[int, PipelineStepStats] = {}
+        self._lock = threading.Lock()
+
+    def for_pipeline(self, pipeline_id: int) -> PipelineStepStats:
+        with self._lock:
+            stats = self._pipelines.get(pipeline_id)
+            if stats is None:
+                stats = self._pipelines[pipeline_id] = PipelineStepStats(pipeline_id)
+            return stats
+
+    def reset(self, pipeline_id: Optional[int] = None):
+        with self._lock:
+            if pipeline_id is None:
+                self._pipelines.clear()
+            else:
+                self._pipelines.pop(pipeline_id, None)
+
+
+step_statistics = StepStatistics()
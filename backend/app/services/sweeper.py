@@ -0,0 +1,175 @@
+"""
+Background processing of PENDING applications
+
+`PendingSweeper` periodically claims PENDING applications in chunks, marks
+them PROCESSING so no other sweeper or process picks them up, and runs them
+through the configured default pipeline with `BatchExecutor` (batched
+execution, bulk writes). While a sweep finds work the next one starts right
+away; an empty sweep waits `sweeper_interval_seconds`.
+
+Each claim records the sweeper that made it (`claimed_by`) and when
+(`claimed_at`), so sweepers in several processes can share a database. A
+sweeper releases its own claims when a sweep fails. Claims older than the
+lease (the process died mid-sweep) are released when a sweeper starts and can
+be claimed again by any sweep; fresh claims of other sweepers are never
+touched.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from app.db_models import LoanApplication
+from app.metrics import metrics
+from app.models import ApplicationStatus
+from app.services.batch_executor import BatchExecutor, BatchRunSummary
+
+
+class PendingSweeper:
+    """Drain PENDING applications through one pipeline in the background"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        pipeline_id: int,
+        chunk_size: int = 200,
+        workers: int = 1,
+        interval_seconds: float = 5,
+        claim_lease_seconds: float = 600
+    ):
+        self.session_factory = session_factory
+        self.pipeline_id = pipeline_id
+        self.chunk_size = max(1, chunk_size)
+        self.workers = max(1, workers)
+        self.interval_seconds = interval_seconds
+        self.claim_lease = timedelta(seconds=claim_lease_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+
+    def _stale(self):
+        """PROCESSING claims past the lease, including claims from before claims were timestamped"""
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - self.claim_lease
+        return and_(
+            LoanApplication.status == ApplicationStatus.PROCESSING.value,
+            or_(LoanApplication.claimed_at.is_(None), LoanApplication.claimed_at < cutoff)
+        )
+
+    def claim(self, db: Session) -> List[int]:
+        """Claim up to one sweep's worth of PENDING (or stale PROCESSING) applications and return their ids"""
+        claimable = or_(LoanApplication.status == ApplicationStatus.PENDING.value, self._stale())
+        candidates = db.execute(
+            select(LoanApplication.id)
+            .where(claimable)
+            .order_by(LoanApplication.id)
+            .limit(self.chunk_size * self.workers)
+        ).scalars().all()
+        if not candidates:
+            return []
+        # Re-check the status so applications claimed concurrently are not taken twice
+        claimed = db.execute(
+            update(LoanApplication)
+            .where(LoanApplication.id.in_(candidates), claimable)
+            .values(
+                status=ApplicationStatus.PROCESSING.value,
+                claimed_by=self.owner,
+                claimed_at=datetime.now(timezone.utc).replace(tzinfo=None)
+            )
+            .returning(LoanApplication.id)
+        ).scalars().all()
+        db.commit()
+        return sorted(claimed)
+
+    def release(self, db: Session, application_ids: Optional[List[int]] = None) -> int:
+        """Put this sweeper's claims (all, or the given ids) back to PENDING"""
+        statement = update(LoanApplication).where(
+            LoanApplication.status == ApplicationStatus.PROCESSING.value,
+            LoanApplication.claimed_by == self.owner
+        )
+        if application_ids is not None:
+            statement = statement.where(LoanApplication.id.in_(application_ids))
+        return self._release(db, statement)
+
+    def release_stale(self, db: Session) -> int:
+        """Put claims past the lease, whoever made them, back to PENDING"""
+        return self._release(db, update(LoanApplication).where(self._stale()))
+
+    def _release(self, db: Session, statement) -> int:
+        released = db.execute(
+            statement.values(status=ApplicationStatus.PENDING.value, claimed_by=None, claimed_at=None)
+        ).rowcount
+        db.commit()
+        return released
+
+    def sweep_once(self) -> BatchRunSummary:
+        """Claim one sweep of PENDING applications and execute the pipeline on them"""
+        db = self.session_factory()
+        claimed: List[int] = []
+        try:
+            claimed = self.claim(db)
+            if not claimed:
+                return BatchRunSummary()
+
+            summary = BatchExecutor(db, workers=self.workers, chunk_size=self.chunk_size).execute_batch(
+                claimed, self.pipeline_id
+            )
+            metrics.increment("sweeper.sweeps")
+            metrics.increment("sweeper.applications", summary.processed)
+            metrics.increment("sweeper.busy_seconds", summary.elapsed_seconds)
+            for status, count in summary.status_counts.items():
+                metrics.increment(f"sweeper.status.{status}", count)
+            return summary
+        except Exception:
+            metrics.increment("sweeper.errors")
+            db.rollback()
+            if claimed:
+                self.release(db, claimed)
+            raise
+        finally:
+            db.close()
+
+    async def run_forever(self):
+        """Sweep until cancelled, without pausing while there is a backlog"""
+        while True:
+            try:
+                summary = await asyncio.to_thread(self.sweep_once)
+            except Exception as e:
+                print(f"Pending sweeper failed: {e}")
+                summary = BatchRunSummary()
+            if summary.processed == 0:
+                await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Release claims past the lease and start sweeping on the running event loop"""
+        db = self.session_factory()
+        try:
+            self.release_stale(db)
+        finally:
+            db.close()
+        self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def sweeper_metrics() -> dict:
+    """Sweeper counters and overall throughput"""
+    applications = metrics.get("sweeper.applications")
+    busy_seconds = metrics.get("sweeper.busy_seconds")
+    return {
+        "sweeps": int(metrics.get("sweeper.sweeps")),
+        "applications": int(applications),
+        "errors": int(metrics.get("sweeper.errors")),
+        "busy_seconds": round(busy_seconds, 4),
+        "runs_per_second": round(applications / busy_seconds, 2) if busy_seconds else 0.0,
+        "status_counts": {k: int(v) for k, v in metrics.snapshot("sweeper.status.").items()},
+    }
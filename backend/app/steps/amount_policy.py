@@ -1,52 +1,62 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.steps.base import BaseStep, StepResult
+from app.steps.context import RunContext
+from app.steps.messages import message_renderer
 
 
 class AmountPolicy(BaseStep):
     """
     Amount Policy
     Enforce country-specific loan limits.
+
+    Caps come from the run's country policy snapshot; params may override
+    or add countries.
     """
 
     step_type = "amount_policy"
-
-    def execute(self, application: Dict[str, Any], params: Dict[str, Any]) -> StepResult:
-        # Default country caps
-        default_caps = self.get_default_params()
-
-        # Merge default caps with provided params
-        country_caps = {**default_caps, **params}
+    order_independent = True
+    outputs = {"amount": "int", "country": "str", "cap": "int"}
+
+    def execute(
+        self,
+        application: Dict[str, Any],
+        params: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> StepResult:
+        # Merge the policy table with provided params; an unmodified table is
+        # shared with other steps so the cap is only resolved once per run
+        policy_caps = self.country_policy(context).caps
+        country_caps = {**policy_caps, **params} if params else policy_caps
 
         amount = application["amount"]
         country = application["country"]
 
         # Get cap for the country, or use OTHER as fallback
-        cap = country_caps.get(country, country_caps["OTHER"])
+        cap = self.features(application, context).get("cap", country_caps)
 
         # Check if amount is within the cap
         passed = amount <= cap
 
-        message = (
-            f"Loan amount: {amount} {country} (max allowed: {cap}) - "
-            f"{'PASS' if passed else 'FAIL'}"
-        )
-
         return StepResult(
             passed=passed,
             computed_values={
                 "amount": amount,
                 "country": country,
-                "cap": cap,
-                "country_caps": country_caps
+                "cap": cap
             },
-            message=message
+            trace=[self.step_type]
         )
 
     @classmethod
     def get_default_params(cls) -> Dict[str, Any]:
-        return {
-            "ES": 30000,
-            "FR": 25000,
-            "DE": 35000,
-            "OTHER": 20000
-        }
+        # Caps come from the country policy table
+        return {}
+
+
+@message_renderer(AmountPolicy.step_type)
+def _render_message(passed, computed_values):
+    return (
+        f"Loan amount: {computed_values['amount']} {computed_values['country']} "
+        f"(max allowed: {computed_values['cap']}) - "
+        f"{'PASS' if passed else 'FAIL'}"
+    )
@@ -1,33 +1,94 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from pydantic import BaseModel
+from typing import Dict, Any, List, Optional
+from app.reference_data import CountryPolicySnapshot, reference_data
+from app.steps.context import RunContext
+from app.steps.features import Features
+from app.steps.messages import render_message
 
 
-class StepResult(BaseModel):
-    passed: bool
-    computed_values: Dict[str, Any]
-    message: str
+class StepResult:
+    """
+    Outcome of one step
+
+    A plain slotted class rather than a Pydantic model: one is created for
+    every step of every run, and steps build it from values they already
+    trust, so validation would only add cost.
+    """
+
+    __slots__ = ("passed", "computed_values", "trace")
+
+    def __init__(
+        self,
+        passed: bool,
+        computed_values: Dict[str, Any],
+        trace: Optional[List[Any]] = None,
+        message: Optional[str] = None
+    ):
+        self.passed = passed
+        self.computed_values = computed_values
+        # Message code and operands, see app.steps.messages. Steps may still
+        # return a ready-made message instead of a trace.
+        self.trace = trace if trace is not None else ["text", message or ""]
+
+    @property
+    def message(self) -> str:
+        """Human-readable message, rendered on access"""
+        return render_message(self.passed, self.computed_values, self.trace)
+
+    def __eq__(self, other):
+        if not isinstance(other, StepResult):
+            return NotImplemented
+        return (self.passed, self.computed_values, self.trace) == (other.passed, other.computed_values, other.trace)
+
+    def __repr__(self):
+        return f"StepResult(passed={self.passed!r}, computed_values={self.computed_values!r}, trace={self.trace!r})"
 
 
 class BaseStep(ABC):
     """Base class for all pipeline steps"""
 
     step_type: str
+    # Relative execution cost, used to run cheap steps first
+    cost: int = 1
+    # Whether the step may run at any position (it doesn't rely on other steps having run)
+    order_independent: bool = False
+    # Whether execute may block on I/O, so async callers must run it off the event loop
+    blocking: bool = False
+    # Type of each computed value ("int", "float", "str", "bool" or "list[str]"), for typed exports
+    outputs: Dict[str, str] = {}
 
     @abstractmethod
-    def execute(self, application: Dict[str, Any], params: Dict[str, Any]) -> StepResult:
+    def execute(
+        self,
+        application: Dict[str, Any],
+        params: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> StepResult:
         """
         Execute the step logic
 
         Args:
             application: Dictionary containing loan application data
             params: Step-specific parameters
+            context: Per-run state (deadline, degradation), None outside a pipeline run
 
         Returns:
-            StepResult with pass/fail status, computed values, and message
+            StepResult with pass/fail status, computed values, and message trace
         """
         pass
 
+    @staticmethod
+    def features(application: Dict[str, Any], context: Optional[RunContext]) -> Features:
+        """Derived features shared across the run, or a fresh set outside a pipeline run"""
+        if context is not None and context.features is not None:
+            return context.features
+        return Features(application)
+
+    @staticmethod
+    def country_policy(context: Optional[RunContext]) -> CountryPolicySnapshot:
+        """Country policy snapshot pinned by the run, or the current one outside a pipeline run"""
+        return context.reference if context is not None else reference_data.snapshot
+
     @classmethod
     def get_default_params(cls) -> Dict[str, Any]:
         """Return default parameters for this step"""
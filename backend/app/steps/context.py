@@ -0,0 +1,53 @@
+import time
+from typing import Dict, Optional
+from app.reference_data import CountryPolicySnapshot, reference_data
+from app.steps.features import Features
+
+
+class Deadline:
+    """Absolute time limit for a run, measured on the monotonic clock"""
+
+    def __init__(self, timeout_ms: Optional[int] = None):
+        self.timeout_ms = timeout_ms
+        self._expires_at = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when the run has no limit"""
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining_ms(self) -> float:
+        remaining = self.remaining()
+        return float("inf") if remaining is None else remaining * 1000
+
+    def expired(self) -> bool:
+        return self._expires_at is not None and time.monotonic() >= self._expires_at
+
+
+class RunContext:
+    """
+    Per-run state shared by the executor and every step of a run
+
+    Steps read the deadline to size their own work, record in `degraded`
+    when they fell back to a cheaper method to stay within it, and share
+    derived values through `features` (set by the executor for the
+    application being run). `reference` is the country policy snapshot
+    pinned when the run started. The executor counts the run's metrics under
+    `metrics_prefix` ("runs" for real runs).
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[Deadline] = None,
+        reference: Optional[CountryPolicySnapshot] = None,
+        metrics_prefix: str = "runs"
+    ):
+        self.deadline = deadline or Deadline()
+        self.reference = reference or reference_data.snapshot
+        self.metrics_prefix = metrics_prefix
+        self.degraded: Dict[str, str] = {}  # step_type -> reason
+        self.features: Optional[Features] = None
+
+    def mark_degraded(self, step_type: str, reason: str):
+        self.degraded[step_type] = reason
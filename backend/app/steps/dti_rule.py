@@ -1,5 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.steps.base import BaseStep, StepResult
+from app.steps.context import RunContext
+from app.steps.messages import message_renderer
 
 
 class DTIRule(BaseStep):
@@ -9,24 +11,28 @@ class DTIRule(BaseStep):
     """
 
     step_type = "dti_rule"
-
-    def execute(self, application: Dict[str, Any], params: Dict[str, Any]) -> StepResult:
+    order_independent = True
+    outputs = {"dti": "float", "max_dti": "float", "monthly_income": "int", "declared_debts": "int"}
+
+    def execute(
+        self,
+        application: Dict[str, Any],
+        params: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> StepResult:
         max_dti = params.get("max_dti", self.get_default_params()["max_dti"])
 
         monthly_income = application["monthly_income"]
         declared_debts = application["declared_debts"]
 
-        # Calculate DTI ratio
-        dti = declared_debts / monthly_income if monthly_income > 0 else float('inf')
+        # DTI ratio, shared with other steps of the run
+        dti = self.features(application, context).get("dti")
+        if dti is None:
+            dti = float('inf')
 
         # Check if DTI is within acceptable range
         passed = dti < max_dti
 
-        message = (
-            f"DTI ratio: {dti:.2%} (max allowed: {max_dti:.2%}) - "
-            f"{'PASS' if passed else 'FAIL'}"
-        )
-
         return StepResult(
             passed=passed,
             computed_values={
@@ -35,9 +41,17 @@ class DTIRule(BaseStep):
                 "monthly_income": monthly_income,
                 "declared_debts": declared_debts
             },
-            message=message
+            trace=[self.step_type, dti]
         )
 
     @classmethod
     def get_default_params(cls) -> Dict[str, Any]:
         return {"max_dti": 0.40}
+
+
+@message_renderer(DTIRule.step_type)
+def _render_message(passed, computed_values, dti):
+    return (
+        f"DTI ratio: {dti:.2%} (max allowed: {computed_values['max_dti']:.2%}) - "
+        f"{'PASS' if passed else 'FAIL'}"
+    )
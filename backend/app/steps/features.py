@@ -0,0 +1,89 @@
+"""
+Derived application features shared by the steps of a run
+
+Several steps need the same derived values (debt-to-income ratio, country cap,
+amount/cap ratio, normalized purpose text). Each feature is declared once here
+with `@feature(name)`, computed on first use in a run and memoized on the
+run's `Features`, so adding steps that read it doesn't repeat the work.
+
+Features may take arguments, e.g. the caps table to resolve a cap against.
+Values are memoized per argument; unhashable arguments (caps mappings) are
+matched by identity.
+"""
+import sys
+from typing import Any, Callable, Dict, Mapping, Optional
+from app.sentiment import normalize_purpose
+
+# name -> compute(features, *args)
+_FEATURES: Dict[str, Callable[..., Any]] = {}
+
+
+def feature(name: str):
+    """Register the function that computes a feature"""
+    def register(compute: Callable[..., Any]) -> Callable[..., Any]:
+        _FEATURES[name] = compute
+        return compute
+    return register
+
+
+def _memo_key(name: str, args: tuple) -> tuple:
+    key = [name]
+    for arg in args:
+        try:
+            hash(arg)
+            key.append(arg)
+        except TypeError:
+            key.append(id(arg))
+    return tuple(key)
+
+
+class Features:
+    """Lazily computed, memoized features of one application"""
+
+    __slots__ = ("application", "_values")
+
+    def __init__(self, application: Dict[str, Any]):
+        self.application = application
+        # key -> (args, value); args are kept so identity-keyed entries stay valid
+        self._values: Dict[tuple, tuple] = {}
+
+    def get(self, name: str, *args) -> Any:
+        key = _memo_key(name, args)
+        cached = self._values.get(key)
+        if cached is not None and all(a is b for a, b in zip(cached[0], args)):
+            return cached[1]
+        value = _FEATURES[name](self, *args)
+        self._values[key] = (args, value)
+        return value
+
+
+@feature("dti")
+def _dti(features: Features) -> Optional[float]:
+    """declared_debts / monthly_income, None when there is no income"""
+    monthly_income = features.application["monthly_income"]
+    if monthly_income <= 0:
+        return None
+    return features.application["declared_debts"] / monthly_income
+
+
+@feature("country")
+def _country(features: Features) -> str:
+    """Interned country code, matching the keys of country policy snapshots"""
+    return sys.intern(features.application["country"])
+
+
+@feature("cap")
+def _cap(features: Features, country_caps: Mapping[str, int]) -> int:
+    """Loan cap for the application's country, falling back to OTHER"""
+    return country_caps.get(features.get("country"), country_caps["OTHER"])
+
+
+@feature("amount_cap_ratio")
+def _amount_cap_ratio(features: Features, country_caps: Mapping[str, int]) -> float:
+    return features.application["amount"] / features.get("cap", country_caps)
+
+
+@feature("purpose")
+def _purpose(features: Features) -> str:
+    """Normalized loan purpose text"""
+    return normalize_purpose(features.application.get("loan_purpose") or "")
@@ -0,0 +1,40 @@
+"""
+Rendering of step messages from structured traces
+
+Steps record a compact trace - a code followed by any operands that are not
+already in their computed values - instead of formatting a message on every
+run. The human-readable message is rendered from the trace only when someone
+reads it.
+"""
+from typing import Any, Callable, Dict, List
+
+# code -> render(passed, computed_values, *operands)
+_RENDERERS: Dict[str, Callable[..., str]] = {}
+
+
+def message_renderer(code: str):
+    """Register the function that renders messages for traces starting with code"""
+    def register(render: Callable[..., str]) -> Callable[..., str]:
+        _RENDERERS[code] = render
+        return render
+    return register
+
+
+def render_message(passed: bool, computed_values: Dict[str, Any], trace: List[Any]) -> str:
+    code, *operands = trace
+    return _RENDERERS[code](passed, computed_values, *operands)
+
+
+@message_renderer("text")
+def _render_text(passed, computed_values, text):
+    return text
+
+
+@message_renderer("timed_out")
+def _render_timed_out(passed, computed_values):
+    return "Not executed (run deadline exceeded)"
+
+
+@message_renderer("skipped")
+def _render_skipped(passed, computed_values):
+    return "Not executed (outcome already decided)"
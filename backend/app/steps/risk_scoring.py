@@ -1,5 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.steps.base import BaseStep, StepResult
+from app.steps.context import RunContext
+from app.steps.messages import message_renderer
 
 
 class RiskScoring(BaseStep):
@@ -9,36 +11,36 @@ class RiskScoring(BaseStep):
     """
 
     step_type = "risk_scoring"
+    order_independent = True
+    outputs = {"risk": "float", "approve_threshold": "float", "dti": "float", "amount": "int", "max_allowed": "int"}
 
-    def execute(self, application: Dict[str, Any], params: Dict[str, Any]) -> StepResult:
+    def execute(
+        self,
+        application: Dict[str, Any],
+        params: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> StepResult:
         approve_threshold = params.get("approve_threshold", 45)
 
-        # Get country caps for max_allowed calculation
-        country_caps = params.get("country_caps", self.get_default_params()["country_caps"])
+        # Country caps for max_allowed: the run's policy table unless overridden
+        country_caps = params.get("country_caps") or self.country_policy(context).caps
 
-        monthly_income = application["monthly_income"]
-        declared_debts = application["declared_debts"]
         amount = application["amount"]
-        country = application["country"]
+        features = self.features(application, context)
 
-        # Calculate DTI
-        dti = declared_debts / monthly_income if monthly_income > 0 else 1.0
-
-        # Get max allowed for country
-        max_allowed = country_caps.get(country, country_caps["OTHER"])
+        # DTI and country cap are shared with the other steps of the run
+        dti = features.get("dti")
+        if dti is None:
+            dti = 1.0
+        max_allowed = features.get("cap", country_caps)
 
         # Calculate risk score
         # risk = (dti * 100) + (amount/max_allowed * 20)
-        risk = (dti * 100) + ((amount / max_allowed) * 20)
+        risk = (dti * 100) + (features.get("amount_cap_ratio", country_caps) * 20)
 
         # Check if risk is acceptable
         passed = risk <= approve_threshold
 
-        message = (
-            f"Risk score: {risk:.2f} (threshold: {approve_threshold}) - "
-            f"{'PASS' if passed else 'FAIL'}"
-        )
-
         return StepResult(
             passed=passed,
             computed_values={
@@ -48,17 +50,19 @@ class RiskScoring(BaseStep):
                 "amount": amount,
                 "max_allowed": max_allowed
             },
-            message=message
+            trace=[self.step_type, risk]
         )
 
     @classmethod
     def get_default_params(cls) -> Dict[str, Any]:
         return {
-            "approve_threshold": 45,
-            "country_caps": {
-                "ES": 30000,
-                "FR": 25000,
-                "DE": 35000,
-                "OTHER": 20000
-            }
+            "approve_threshold": 45
         }
+
+
+@message_renderer(RiskScoring.step_type)
+def _render_message(passed, computed_values, risk):
+    return (
+        f"Risk score: {risk:.2f} (threshold: {computed_values['approve_threshold']}) - "
+        f"{'PASS' if passed else 'FAIL'}"
+    )
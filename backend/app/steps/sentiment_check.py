@@ -1,7 +1,17 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+import json
+import logging
 import os
+import threading
+import time
 from app.steps.base import BaseStep, StepResult
+from app.steps.context import RunContext
+from app.steps.messages import message_renderer
 from app.config import settings
+from app.metrics import metrics
+from app.sentiment import (
+    ProviderUnavailableError, SentimentBatcher, SingleFlight, local_text_model, normalize_purpose, openai_guard
+)
 
 # OpenAI import with error handling
 try:
@@ -10,6 +20,10 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a financial risk analyst specializing in detecting risky or speculative loan purposes."
+
 
 class SentimentCheck(BaseStep):
     """
@@ -26,9 +40,26 @@ class SentimentCheck(BaseStep):
     cryptocurrency, forex, day trading, stocks speculation
 
     Additional terms can be configured via step params.
+
+    The `analyzer` param picks the analysis: "llm" (OpenAI, falling back to
+    keywords), "local_model" (the offline text-risk classifier loaded at
+    startup, falling back to keywords when none is loaded), "keywords", or
+    "cascade": keywords, then the local model, then the LLM, stopping at the
+    first tier whose confidence reaches `cascade_threshold`.
     """
 
     step_type = "sentiment_check"
+    cost = 50  # An LLM call
+    order_independent = True
+    blocking = True
+    outputs = {
+        "risk_score": "int",
+        "detected_risks": "list[str]",
+        "confidence": "float",
+        "loan_purpose": "str",
+        "analysis_method": "str",
+        "risk_threshold": "int",
+    }
 
     # Extended default risky keywords list
     DEFAULT_RISKY_TERMS = [
@@ -38,7 +69,12 @@ class SentimentCheck(BaseStep):
         "slot machines", "sports betting", "ponzi", "pyramid scheme"
     ]
 
-    def execute(self, application: Dict[str, Any], params: Dict[str, Any]) -> StepResult:
+    def execute(
+        self,
+        application: Dict[str, Any],
+        params: Dict[str, Any],
+        context: Optional[RunContext] = None
+    ) -> StepResult:
         """
         Analyze loan purpose for risky sentiment using OpenAI.
 
@@ -46,12 +82,15 @@ class SentimentCheck(BaseStep):
             StepResult with:
             - passed: True if risk_score < risk_threshold, False otherwise
             - computed_values: Contains risk_score (0-100), detected_risks, confidence
-            - message: Description of analysis result
+            - trace: Renders the description of the analysis result on demand
         """
         # Get parameters
         additional_terms = params.get("risky_terms", self.get_default_params()["risky_terms"])
         api_model = params.get("api_model", self.get_default_params()["api_model"])
         risk_threshold = params.get("risk_threshold", self.get_default_params()["risk_threshold"])
+        min_llm_budget_ms = params.get("min_llm_budget_ms", self.get_default_params()["min_llm_budget_ms"])
+        analyzer = params.get("analyzer", self.get_default_params()["analyzer"])
+        cascade_threshold = params.get("cascade_threshold", self.get_default_params()["cascade_threshold"])
 
         # Extract loan purpose
         loan_purpose = application.get("loan_purpose", "")
@@ -61,32 +100,15 @@ class SentimentCheck(BaseStep):
 
         # Perform sentiment analysis
         risk_score, detected_risks, confidence, analysis_method = self._analyze_sentiment(
-            loan_purpose, all_risky_terms, api_model
+            loan_purpose, all_risky_terms, api_model, context, min_llm_budget_ms,
+            normalized_purpose=self.features(application, context).get("purpose"),
+            analyzer=analyzer,
+            cascade_threshold=cascade_threshold
         )
 
-        # Create message
-        if risk_score >= 70:
-            risk_level = "HIGH RISK"
-        elif risk_score >= 40:
-            risk_level = "MODERATE RISK"
-        else:
-            risk_level = "LOW RISK"
-
-        message = (
-            f"Sentiment Analysis: {risk_level} (score: {risk_score}/100) - "
-            f"Loan purpose: '{loan_purpose}' - "
-            f"Method: {analysis_method}"
-        )
-
-        if detected_risks:
-            message += f" - Detected: {', '.join(detected_risks)}"
-
         # Pass if risk score is below threshold
         passed = risk_score < risk_threshold
 
-        if not passed:
-            message += f" - FAILED: Risk score {risk_score} >= threshold {risk_threshold}"
-
         return StepResult(
             passed=passed,
             computed_values={
@@ -97,18 +119,26 @@ class SentimentCheck(BaseStep):
                 "analysis_method": analysis_method,
                 "risk_threshold": risk_threshold
             },
-            message=message
+            trace=[self.step_type]
         )
 
     def _analyze_sentiment(
         self,
         loan_purpose: str,
         risky_terms: list,
-        api_model: str
+        api_model: str,
+        context: Optional[RunContext] = None,
+        min_llm_budget_ms: int = 0,
+        normalized_purpose: Optional[str] = None,
+        analyzer: str = "llm",
+        cascade_threshold: float = 0.8
     ) -> tuple[int, list, float, str]:
         """
         Analyze sentiment using OpenAI API with fallback to keyword matching.
 
+        The "local_model" and "keywords" analyzers never call the LLM; "cascade"
+        only calls it when the cheaper analyzers are not confident enough.
+
         Returns:
             (risk_score, detected_risks, confidence, analysis_method)
         """
@@ -116,29 +146,143 @@ class SentimentCheck(BaseStep):
         if not loan_purpose or not loan_purpose.strip():
             return 0, [], 1.0, "empty_purpose"
 
-        # Try OpenAI API first - use settings from config
-        api_key = settings.openai_api_key
-
-        if OPENAI_AVAILABLE and api_key:
-            try:
-                return self._analyze_with_openai(loan_purpose, risky_terms, api_model)
-            except Exception as e:
-                # Log error and fall back to keyword matching
-                print(f"OpenAI API error: {e}. Falling back to keyword matching.")
+        if analyzer == "keywords":
+            return self._analyze_with_keywords(loan_purpose, risky_terms)
+        if analyzer == "local_model":
+            return self._analyze_with_local_model(loan_purpose, risky_terms, normalized_purpose)
+        if analyzer == "cascade":
+            return self._analyze_cascade(
+                loan_purpose, risky_terms, api_model, context, min_llm_budget_ms,
+                normalized_purpose, cascade_threshold
+            )
+
+        result, _ = self._try_llm(loan_purpose, risky_terms, api_model, context, min_llm_budget_ms, normalized_purpose)
+        if result is not None:
+            return result
 
         # Fallback: Simple keyword matching
         return self._analyze_with_keywords(loan_purpose, risky_terms)
 
+    def _analyze_cascade(
+        self,
+        loan_purpose: str,
+        risky_terms: list,
+        api_model: str,
+        context: Optional[RunContext],
+        min_llm_budget_ms: int,
+        normalized_purpose: Optional[str],
+        cascade_threshold: float
+    ) -> tuple[int, list, float, str]:
+        """
+        Run the cheap analyzers first and escalate to the LLM only when unsure
+
+        Each tier's calls and time are counted under `sentiment.tier.<tier>`
+        (the llm tier only when the provider was actually called), and the
+        tier that decided under `sentiment.cascade.decided.<tier>`
+        ("fallback" when the LLM was needed but unavailable, in which case the
+        last cheap result is used).
+        """
+        # Each tier returns (result or None, whether it ran)
+        tiers = [("keywords", lambda: (self._analyze_with_keywords(loan_purpose, risky_terms), True))]
+        if local_text_model.model is not None:
+            tiers.append(("local_model", lambda: (self._analyze_with_local_model(
+                loan_purpose, risky_terms, normalized_purpose
+            ), True)))
+        tiers.append(("llm", lambda: self._try_llm(
+            loan_purpose, risky_terms, api_model, context, min_llm_budget_ms, normalized_purpose
+        )))
+
+        best = None
+        for tier, analyze in tiers:
+            started = time.perf_counter()
+            result, ran = analyze()
+            if not ran:
+                continue
+            metrics.increment(f"sentiment.tier.{tier}.calls")
+            metrics.increment(f"sentiment.tier.{tier}.seconds", time.perf_counter() - started)
+            if result is None:
+                continue
+            if tier == "llm" or result[2] >= cascade_threshold:
+                metrics.increment(f"sentiment.cascade.decided.{tier}")
+                return result
+            best = result
+
+        metrics.increment("sentiment.cascade.decided.fallback")
+        return best
+
+    def _try_llm(
+        self,
+        loan_purpose: str,
+        risky_terms: list,
+        api_model: str,
+        context: Optional[RunContext] = None,
+        min_llm_budget_ms: int = 0,
+        normalized_purpose: Optional[str] = None
+    ) -> tuple[Optional[tuple[int, list, float, str]], bool]:
+        """
+        Analyze with OpenAI if it is configured and reachable in time
+
+        The provider is skipped while its circuit breaker is open or when the
+        run has less than `min_llm_budget_ms` left, and the LLM call is cut off
+        at the run deadline.
+
+        Returns:
+            (result, or None to fall back; whether the provider was called)
+        """
+        # Use settings from config
+        api_key = settings.openai_api_key
+
+        # Skip the provider entirely while its circuit breaker is open
+        if not (OPENAI_AVAILABLE and api_key) or openai_guard.is_open():
+            return None, False
+        remaining_ms = context.deadline.remaining_ms() if context else float("inf")
+        if remaining_ms < min_llm_budget_ms:
+            context.mark_degraded(
+                self.step_type,
+                f"Remaining budget {remaining_ms:.0f}ms below {min_llm_budget_ms}ms"
+            )
+            return None, False
+
+        timeout = context.deadline.remaining() if context else None
+        try:
+            # Identical purposes analyzed concurrently share one in-flight call
+            key = (
+                normalized_purpose if normalized_purpose is not None else normalize_purpose(loan_purpose),
+                tuple(sorted(term.lower() for term in risky_terms)),
+                api_model
+            )
+            risk_score, detected_risks, confidence, analysis_method = _in_flight.do(
+                key,
+                lambda: self._analyze_with_openai(loan_purpose, risky_terms, api_model, timeout),
+                timeout=timeout
+            )
+            return (risk_score, list(detected_risks), confidence, analysis_method), True
+        except ProviderUnavailableError as e:
+            # The guard refused before anything was sent
+            logger.debug("OpenAI call skipped: %s. Falling back to a local analyzer.", e)
+            return None, False
+        except Exception as e:
+            if context and context.deadline.expired():
+                context.mark_degraded(self.step_type, "LLM call exceeded run deadline")
+            # Log error and let the caller fall back
+            logger.warning("OpenAI API error: %s. Falling back to a local analyzer.", e)
+            return None, True
+
     def _analyze_with_openai(
         self,
         loan_purpose: str,
         risky_terms: list,
-        api_model: str
+        api_model: str,
+        timeout: Optional[float] = None
     ) -> tuple[int, list, float, str]:
         """
         Use OpenAI API to analyze sentiment with AI understanding.
+
+        When micro-batching is enabled, the purpose is queued and analyzed
+        together with concurrent requests in one prompt.
         """
-        client = OpenAI(api_key=settings.openai_api_key)
+        if settings.sentiment_batch_window_ms > 0:
+            return _get_batcher().submit(loan_purpose, risky_terms, api_model, timeout=timeout)
 
         # Construct prompt for sentiment analysis
         risky_terms_str = ", ".join(risky_terms)
@@ -160,40 +304,95 @@ Respond in this exact JSON format:
   "confidence": <number 0.0-1.0>
 }}"""
 
-        # Make API call
-        # Note: gpt-5-mini supports default temperature=1, so we don't specify it
-        response = client.chat.completions.create(
-            model=api_model,
-            messages=[
-                {"role": "system", "content": "You are a financial risk analyst specializing in detecting risky or speculative loan purposes."},
-                {"role": "user", "content": prompt}
-            ],
-            max_completion_tokens=25000  # High limit to ensure comprehensive risk analysis
-        )
+        response = _create_completion(api_model, prompt, timeout)
 
         # Parse response
-        import json
         content = response.choices[0].message.content.strip()
 
         # Try to extract JSON from response
         try:
-            # Handle case where response might have markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-
-            result = json.loads(content)
-            risk_score = int(result.get("risk_score", 50))
-            detected_risks = result.get("detected_risks", [])
-            confidence = float(result.get("confidence", 0.8))
-
-            return risk_score, detected_risks, confidence, "openai_api"
+            result = _parse_json_content(content)
+            return self._parse_openai_result(result)
         except (json.JSONDecodeError, ValueError, KeyError) as e:
-            print(f"Failed to parse OpenAI response: {e}. Response: {content}")
+            logger.warning("Failed to parse OpenAI response: %s. Response: %s", e, content)
             # Fall back to keyword matching
             return self._analyze_with_keywords(loan_purpose, risky_terms)
 
+    def _analyze_batch_with_openai(
+        self,
+        loan_purposes: List[str],
+        risky_terms: list,
+        api_model: str,
+        timeout: Optional[float] = None
+    ) -> List[tuple[int, list, float, str]]:
+        """
+        Analyze several loan purposes with a single OpenAI request.
+
+        The purposes are sent as a JSON array and the model answers with one
+        analysis object per purpose, in the same order. The batcher passes the
+        smallest remaining deadline among the batch's callers as `timeout`.
+        """
+        risky_terms_str = ", ".join(risky_terms)
+        prompt = f"""Analyze each of the following loan purposes for risky or speculative intent.
+
+Loan purposes (JSON array): {json.dumps(loan_purposes)}
+
+Risky/speculative keywords to watch for: {risky_terms_str}
+
+For each loan purpose, in the same order, provide:
+1. A risk score from 0-100 (0=completely safe, 100=extremely risky/speculative)
+2. List any detected risky terms or concerns
+3. Your confidence level (0.0-1.0)
+
+Respond with a JSON array of exactly {len(loan_purposes)} objects in this format:
+[
+  {{
+    "risk_score": <number 0-100>,
+    "detected_risks": [<list of strings>],
+    "confidence": <number 0.0-1.0>
+  }}
+]"""
+
+        response = _create_completion(api_model, prompt, timeout)
+
+        content = response.choices[0].message.content.strip()
+
+        try:
+            results = _parse_json_content(content)
+            if not isinstance(results, list) or len(results) != len(loan_purposes):
+                raise ValueError(f"Expected a JSON array of {len(loan_purposes)} results")
+            return [self._parse_openai_result(result) for result in results]
+        except (json.JSONDecodeError, ValueError, KeyError, AttributeError) as e:
+            logger.warning("Failed to parse OpenAI batch response: %s. Response: %s", e, content)
+            return [self._analyze_with_keywords(purpose, risky_terms) for purpose in loan_purposes]
+
+    def _parse_openai_result(self, result: Dict[str, Any]) -> tuple[int, list, float, str]:
+        risk_score = int(result.get("risk_score", 50))
+        detected_risks = result.get("detected_risks", [])
+        confidence = float(result.get("confidence", 0.8))
+
+        return risk_score, detected_risks, confidence, "openai_api"
+
+    def _analyze_with_local_model(
+        self,
+        loan_purpose: str,
+        risky_terms: list,
+        normalized_purpose: Optional[str] = None
+    ) -> tuple[int, list, float, str]:
+        """
+        Score with the local text-risk classifier; detected risks are the keyword hits.
+        Falls back to keyword matching when no model is loaded.
+        """
+        model = local_text_model.model
+        if model is None:
+            return self._analyze_with_keywords(loan_purpose, risky_terms)
+
+        risk_score, confidence = model.predict(
+            normalized_purpose if normalized_purpose is not None else normalize_purpose(loan_purpose)
+        )
+        _, detected_risks, _, _ = self._analyze_with_keywords(loan_purpose, risky_terms)
+        return risk_score, detected_risks, round(confidence, 4), "local_model"
+
     def _analyze_with_keywords(
         self,
         loan_purpose: str,
@@ -230,9 +429,94 @@ Respond in this exact JSON format:
             risky_terms: Additional terms to add to default list (default: empty)
             api_model: OpenAI model to use (default: gpt-5-mini)
             risk_threshold: Maximum risk score to pass (default: 45)
+            min_llm_budget_ms: Use keyword matching when the run has less time left (default: 2000)
+            analyzer: llm, local_model, keywords or cascade (default: llm)
+            cascade_threshold: Confidence at which a cascade tier's answer is kept (default: 0.8)
         """
         return {
             "risky_terms": [],
             "api_model": "gpt-5-mini",
-            "risk_threshold": 45
+            "risk_threshold": 45,
+            "min_llm_budget_ms": 2000,
+            "analyzer": "llm",
+            "cascade_threshold": 0.8
         }
+
+
+@message_renderer(SentimentCheck.step_type)
+def _render_message(passed, computed_values):
+    risk_score = computed_values["risk_score"]
+    if risk_score >= 70:
+        risk_level = "HIGH RISK"
+    elif risk_score >= 40:
+        risk_level = "MODERATE RISK"
+    else:
+        risk_level = "LOW RISK"
+
+    message = (
+        f"Sentiment Analysis: {risk_level} (score: {risk_score}/100) - "
+        f"Loan purpose: '{computed_values['loan_purpose']}' - "
+        f"Method: {computed_values['analysis_method']}"
+    )
+
+    if computed_values["detected_risks"]:
+        message += f" - Detected: {', '.join(computed_values['detected_risks'])}"
+
+    if not passed:
+        message += f" - FAILED: Risk score {risk_score} >= threshold {computed_values['risk_threshold']}"
+
+    return message
+
+
+def _create_completion(api_model: str, prompt: str, timeout: Optional[float] = None):
+    """
+    Send one chat completion through the shared provider guard.
+
+    The guard owns retries, so the client's own retries are disabled, and each
+    attempt is bounded by whatever is left of `timeout`.
+    """
+    client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url, max_retries=0)
+    expires_at = None if timeout is None else time.monotonic() + timeout
+
+    def attempt():
+        request_client = client
+        if expires_at is not None:
+            request_client = client.with_options(timeout=max(0.001, expires_at - time.monotonic()))
+        # Note: gpt-5-mini supports default temperature=1, so we don't specify it
+        return request_client.chat.completions.create(
+            model=api_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_completion_tokens=25000  # High limit to ensure comprehensive risk analysis
+        )
+
+    return openai_guard.call(attempt, timeout)
+
+
+def _parse_json_content(content: str) -> Any:
+    """Parse a JSON payload, handling responses wrapped in markdown code blocks"""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+    return json.loads(content)
+
+
+# Shared across all SentimentCheck instances so concurrent runs coalesce and batch together
+_in_flight = SingleFlight()
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def _get_batcher() -> SentimentBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = SentimentBatcher(
+                SentimentCheck()._analyze_batch_with_openai,
+                window_ms=settings.sentiment_batch_window_ms,
+                max_items=settings.sentiment_batch_max_items
+            )
+        return _batcher
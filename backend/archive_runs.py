@@ -0,0 +1,56 @@
+"""
+Move old pipeline runs out of the hot table into the run archive
+
+Runs executed more than the retention window ago are appended to monthly
+compressed columnar files under ARCHIVE_DIR and deleted from pipeline_runs.
+They stay readable through GET /api/runs/{id}. Run one archiver at a time,
+e.g. nightly from cron.
+
+Usage:
+    uv run python archive_runs.py
+    uv run python archive_runs.py --retention-days 30 --vacuum
+"""
+import argparse
+import os
+import time
+from sqlalchemy import text
+from app.config import settings
+from app.database import SessionLocal, engine, init_db
+from app.services import run_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--retention-days", type=int, default=settings.archive_retention_days)
+    parser.add_argument("--archive-dir", default=settings.archive_dir)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Runs read per batch")
+    parser.add_argument("--vacuum", action="store_true", help="Reclaim the freed space in the SQLite file afterwards")
+    args = parser.parse_args()
+
+    init_db()
+    cutoff = run_archive.retention_cutoff(args.retention_days)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        archived = run_archive.archive_runs(db, cutoff, args.archive_dir, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Archived runs executed before {cutoff:%Y-%m-%d %H:%M} in {time.perf_counter() - started:.2f}s")
+    for month, count in sorted(archived.items()):
+        size = os.path.getsize(os.path.join(args.archive_dir, f"runs-{month}.seg"))
+        print(f"  {month}: {count} runs ({size / 1024:.0f} KiB file)")
+    if not archived:
+        print("  Nothing to archive")
+
+    if args.vacuum and "sqlite" in settings.database_url:
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+        print("Database vacuumed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Rebuild the decision analytics rollups from existing runs
+
+Writes run summaries for runs stored before the run_summary table existed,
+then recomputes decision_rollups and score_histograms from every summary in
+one transaction. Safe to re-run; new runs keep the rollups current after that.
+
+Usage:
+    uv run python backfill_analytics.py
+    uv run python backfill_analytics.py --batch-size 10000
+"""
+import argparse
+import time
+from app.database import SessionLocal, init_db
+from app.services import analytics, run_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch-size", type=int, default=5000, help="Runs read per query")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        summaries = run_summary.backfill(db, args.batch_size)
+        runs = analytics.rebuild(db, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Run summaries backfilled: {summaries}")
+    print(f"Runs folded into rollups: {runs} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
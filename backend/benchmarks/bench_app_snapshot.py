@@ -0,0 +1,79 @@
+"""
+Benchmark batch scoring from SQLite against the memory-mapped snapshot
+
+Builds a throwaway SQLite database with synthetic applications and scores
+them all with the standard pipeline, without persisting, reading the
+applications either through the ORM (as score_applications does) or from
+the snapshot (as score_snapshot_chunk does). Reports reading alone and
+reading plus scoring, and times building the snapshot and a refresh.
+
+Usage:
+    uv run python benchmarks/bench_app_snapshot.py --applications 50000 --chunk-size 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.db_models import LoanApplication, Pipeline  # noqa: E402
+from app.services import CompiledPipeline, app_snapshot  # noqa: E402
+from app.services.pipeline_executor import application_to_dict  # noqa: E402
+from bench_batch_executor import build_database  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_database(os.path.join(tmp, "bench.db"), args.applications)
+        db = sessionmaker(bind=engine)()
+        path = os.path.join(tmp, "applications.snap")
+        compiled = CompiledPipeline.from_db(db.get(Pipeline, 1))
+        ids = list(range(1, args.applications + 1))
+
+        started = time.perf_counter()
+        app_snapshot.build_snapshot(db, path)
+        print(f"build snapshot: {time.perf_counter() - started:.3f}s ({os.path.getsize(path) / 1024:.0f} KiB)")
+        started = time.perf_counter()
+        app_snapshot.refresh_snapshot(db, path)
+        print(f"refresh (no new rows): {time.perf_counter() - started:.4f}s")
+
+        def read_sqlite():
+            for start in range(0, len(ids), args.chunk_size):
+                chunk = ids[start:start + args.chunk_size]
+                yield [(app.id, application_to_dict(app)) for app in db.query(LoanApplication).filter(
+                    LoanApplication.id.in_(chunk)
+                )]
+            db.rollback()
+
+        def read_snapshot():
+            snapshot = app_snapshot.ApplicationSnapshot(path)
+            for index, selector in snapshot.slices(args.chunk_size):
+                yield snapshot.chunk(index, selector).applications()
+
+        print(f"{'source':>8} {'read (s)':>9} {'read+score (s)':>15} {'applications/s':>15}")
+        for name, read in (("sqlite", read_sqlite), ("snapshot", read_snapshot)):
+            read_time = score_time = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                for _ in read():
+                    pass
+                read_time = min(read_time, time.perf_counter() - started)
+                started = time.perf_counter()
+                for applications in read():
+                    compiled.run_batch_to_rows(applications, include_rule_logs=False)
+                score_time = min(score_time, time.perf_counter() - started)
+            print(f"{name:>8} {read_time:>9.3f} {score_time:>15.3f} {args.applications / score_time:>15,.0f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
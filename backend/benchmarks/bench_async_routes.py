@@ -0,0 +1,100 @@
+"""
+Benchmark the sync and async (ASYNC_DB) routes under concurrent requests
+
+Builds a throwaway SQLite database per mode, then fires concurrent
+`GET /api/applications/{id}` and `POST /api/runs` requests at the app in
+process (httpx ASGI transport, no network) and reports requests/sec.
+
+Usage:
+    uv run python benchmarks/bench_async_routes.py --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.database import async_database_url, get_async_db, get_db  # noqa: E402
+from app.main import include_routers  # noqa: E402
+from bench_batch_executor import build_database  # noqa: E402
+
+APPLICATIONS = 500
+
+
+def build_app(path: str, async_db: bool):
+    engine = build_database(path, APPLICATIONS)
+    Session = sessionmaker(bind=engine)
+    async_engine = create_async_engine(async_database_url(str(engine.url)))
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    include_routers(app, async_db)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app, async_engine
+
+
+async def hammer(client: httpx.AsyncClient, count: int, concurrency: int, request) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            response = await request(client, i)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return count / (time.perf_counter() - started)
+
+
+async def bench(path: str, async_db: bool, count: int, concurrency: int):
+    app, async_engine = build_app(path, async_db)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        get_rate = await hammer(
+            client, count, concurrency,
+            lambda c, i: c.get(f"/api/applications/{i % APPLICATIONS + 1}")
+        )
+        run_rate = await hammer(
+            client, count, concurrency,
+            lambda c, i: c.post("/api/runs", json={"application_id": i % APPLICATIONS + 1, "pipeline_id": 1})
+        )
+    await async_engine.dispose()
+    return get_rate, run_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests per route, concurrency {args.concurrency}")
+    print(f"{'mode':>6} {'GET app req/s':>14} {'POST run req/s':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for async_db in (False, True):
+            path = os.path.join(tmp, f"bench_{async_db}.db")
+            get_rate, run_rate = asyncio.run(bench(path, async_db, args.requests, args.concurrency))
+            print(f"{'async' if async_db else 'sync':>6} {get_rate:>14.0f} {run_rate:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
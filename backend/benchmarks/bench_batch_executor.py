@@ -0,0 +1,90 @@
+"""
+Benchmark batch rescoring throughput for different worker counts
+
+Builds a throwaway SQLite database with synthetic applications and runs the
+standard pipeline over all of them with 1..N worker processes.
+
+Usage:
+    uv run python benchmarks/bench_batch_executor.py --applications 20000 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.db_models import LoanApplication, Pipeline, PipelineRun, RunSummary  # noqa: E402
+from app.services import BatchExecutor  # noqa: E402
+
+STEPS = [
+    {"step_type": "dti_rule", "order": 1, "params": {"max_dti": 0.40}},
+    {"step_type": "amount_policy", "order": 2, "params": {}},
+    {"step_type": "risk_scoring", "order": 3, "params": {"approve_threshold": 45}}
+]
+RULES = [
+    {"condition": "dti_rule.failed OR amount_policy.failed", "outcome": "REJECTED", "order": 1},
+    {"condition": "risk_scoring.risk <= 45", "outcome": "APPROVED", "order": 2},
+    {"condition": "else", "outcome": "NEEDS_REVIEW", "order": 3}
+]
+
+
+def build_database(path: str, count: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Pipeline), [{
+            "name": "Benchmark Pipeline",
+            "steps_config": json.dumps(STEPS),
+            "terminal_rules": json.dumps(RULES)
+        }])
+        conn.execute(insert(LoanApplication), [{
+            "applicant_name": f"Applicant {i}",
+            "amount": rng.randint(1000, 40000),
+            "monthly_income": rng.randint(1000, 8000),
+            "declared_debts": rng.randint(0, 3000),
+            "country": rng.choice(["ES", "FR", "DE", "OTHER"]),
+            "loan_purpose": "home improvement",
+            "status": "PENDING"
+        } for i in range(count)])
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_database(os.path.join(tmp, "bench.db"), args.applications)
+        Session = sessionmaker(bind=engine)
+        ids = list(range(1, args.applications + 1))
+
+        print(f"{args.applications} applications, chunk size {args.chunk_size}, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>10} {'runs/sec':>12} {'speedup':>8}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            with engine.begin() as conn:
+                conn.execute(RunSummary.__table__.delete())
+                conn.execute(PipelineRun.__table__.delete())
+                conn.execute(update(LoanApplication).values(status="PENDING"))
+
+            db = Session()
+            summary = BatchExecutor(db, workers=workers, chunk_size=args.chunk_size).execute_batch(ids, 1)
+            db.close()
+
+            baseline = baseline or summary.runs_per_second
+            print(f"{workers:>8} {summary.elapsed_seconds:>10.2f} {summary.runs_per_second:>12.0f} "
+                  f"{summary.runs_per_second / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark columnar exports against the JSON the API serves today
+
+Builds a throwaway SQLite database with synthetic applications, runs the
+standard pipeline over all of them, then compares:
+
+- json: every run as GET /api/runs returns it (step logs as JSON text)
+- parquet / arrow: the export of applications joined with their latest run
+
+reporting the time to write each and its size, and the time to load the
+typed DTI and risk columns back.
+
+Usage:
+    uv run python benchmarks/bench_export.py --applications 20000
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.api.runs import _run_to_response  # noqa: E402
+from app.db_models import PipelineRun  # noqa: E402
+from app.services import BatchExecutor, export  # noqa: E402
+from bench_batch_executor import build_database  # noqa: E402
+
+
+def bench_json(db):
+    started = time.perf_counter()
+    runs = [_run_to_response(run).model_dump(mode="json") for run in db.query(PipelineRun).all()]
+    data = json.dumps(runs).encode()
+    written = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = [
+        (log["computed_values"].get("dti"), log["computed_values"].get("risk"))
+        for run in json.loads(data) for log in run["step_logs"]
+        if log["step_type"] in ("dti_rule", "risk_scoring")
+    ]
+    loaded = time.perf_counter() - started
+    assert scores
+    return written, len(data), loaded
+
+
+def bench_columnar(db, export_format):
+    buffer = io.BytesIO()
+    started = time.perf_counter()
+    export.write_export(db, buffer.write, export_format)
+    written = time.perf_counter() - started
+
+    buffer.seek(0)
+    started = time.perf_counter()
+    columns = ["dti_rule_dti", "risk_scoring_risk"]
+    if export_format == "parquet":
+        table = pq.read_table(buffer, columns=columns)
+    else:
+        table = pa.ipc.open_stream(buffer).read_all().select(columns)
+    loaded = time.perf_counter() - started
+    assert table.num_rows
+    return written, buffer.getbuffer().nbytes, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_database(os.path.join(tmp, "bench.db"), args.applications)
+        db = sessionmaker(bind=engine)()
+        BatchExecutor(db).execute_batch(list(range(1, args.applications + 1)), 1)
+
+        print(f"{args.applications} applications")
+        print(f"{'format':>8} {'write (s)':>10} {'size (KiB)':>11} {'load (s)':>9}")
+        for name, bench in (
+            ("json", bench_json),
+            ("parquet", lambda db: bench_columnar(db, "parquet")),
+            ("arrow", lambda db: bench_columnar(db, "arrow")),
+        ):
+            written, size, loaded = bench(db)
+            print(f"{name:>8} {written:>10.2f} {size / 1024:>11.0f} {loaded:>9.3f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark the run hot path: slotted records versus Pydantic models
+
+Runs the standard pipeline over synthetic applications and serializes each run
+to the stored JSON two ways: "slotted" writes the executor's log records
+directly (what the executor does), "pydantic" first converts them to the API's
+StepLog / TerminalRuleLog models and dumps those (what the executor used to do
+on every run). Reports runs per second and peak bytes allocated per run
+(tracemalloc).
+
+Usage:
+    uv run python benchmarks/bench_hot_path.py --runs 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import CompiledPipeline  # noqa: E402
+from app.services.run_log import dump_logs  # noqa: E402
+
+STEPS = [
+    {"step_type": "dti_rule", "order": 1, "params": {"max_dti": 0.40}},
+    {"step_type": "amount_policy", "order": 2, "params": {}},
+    {"step_type": "risk_scoring", "order": 3, "params": {"approve_threshold": 45}}
+]
+RULES = [
+    {"condition": "dti_rule.failed OR amount_policy.failed", "outcome": "REJECTED", "order": 1},
+    {"condition": "risk_scoring.risk <= 45", "outcome": "APPROVED", "order": 2},
+    {"condition": "else", "outcome": "NEEDS_REVIEW", "order": 3}
+]
+
+
+def applications(count: int):
+    rng = random.Random(42)
+    return [
+        {
+            "applicant_name": f"Applicant {i}",
+            "amount": rng.randint(1000, 60000),
+            "monthly_income": rng.randint(800, 8000),
+            "declared_debts": rng.randint(0, 3000),
+            "country": rng.choice(["ES", "FR", "DE", "OTHER"]),
+            "loan_purpose": "home renovation",
+        }
+        for i in range(count)
+    ]
+
+
+def run_slotted(compiled: CompiledPipeline, app_data):
+    _, step_logs, rule_logs = compiled.run(app_data)
+    return dump_logs(step_logs), dump_logs(rule_logs)
+
+
+def run_pydantic(compiled: CompiledPipeline, app_data):
+    _, step_logs, rule_logs = compiled.run(app_data)
+    return (
+        json.dumps([log.to_model().model_dump(exclude_none=True) for log in step_logs]),
+        json.dumps([log.to_model().model_dump(exclude_none=True) for log in rule_logs]),
+    )
+
+
+def measure(run, compiled: CompiledPipeline, apps):
+    started = time.perf_counter()
+    for app_data in apps:
+        run(compiled, app_data)
+    runs_per_second = len(apps) / (time.perf_counter() - started)
+
+    allocated = 0
+    tracemalloc.start()
+    for app_data in apps:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run(compiled, app_data)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return runs_per_second, allocated / len(apps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5000)
+    args = parser.parse_args()
+
+    compiled = CompiledPipeline(1, STEPS, RULES)
+    apps = applications(args.runs)
+    print(f"{args.runs} runs of the standard pipeline")
+    print(f"{'mode':>9} {'runs/sec':>10} {'peak B/run':>11}")
+    baseline = None
+    for name, run in (("pydantic", run_pydantic), ("slotted", run_slotted)):
+        runs_per_second, allocated = measure(run, compiled, apps)
+        speedup = f"  ({runs_per_second / baseline:.2f}x)" if baseline else ""
+        baseline = baseline or runs_per_second
+        print(f"{name:>9} {runs_per_second:>10.0f} {allocated:>11.0f}{speedup}")
+
+
+if __name__ == "__main__":
+    main()
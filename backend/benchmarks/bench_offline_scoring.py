@@ -0,0 +1,60 @@
+"""
+Benchmark offline file scoring throughput for different worker counts
+
+Generates a synthetic NDJSON file of applications and scores it with the
+standard pipeline (as a JSON definition) with 1..N worker processes,
+writing NDJSON decisions to a throwaway file.
+
+Usage:
+    uv run python benchmarks/bench_offline_scoring.py --applications 100000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import offline_scoring  # noqa: E402
+from bench_batch_executor import RULES, STEPS  # noqa: E402
+
+
+def write_applications(path: str, count: int):
+    rng = random.Random(42)
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "application_id": i + 1,
+                "applicant_name": f"Applicant {i}",
+                "amount": rng.randint(1000, 40000),
+                "monthly_income": rng.randint(1000, 8000),
+                "declared_debts": rng.randint(0, 3000),
+                "country": rng.choice(["ES", "FR", "DE", "OTHER"]),
+                "loan_purpose": "home improvement"
+            }) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    spec = offline_scoring.definition_spec({"name": "Benchmark Pipeline", "steps": STEPS, "terminal_rules": RULES})
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "applications.ndjson")
+        write_applications(input_path, args.applications)
+        print(f"{args.applications} applications, chunk size {args.chunk_size}")
+        for workers in args.workers:
+            with open(input_path) as input_stream, open(os.path.join(tmp, "decisions.ndjson"), "w") as output_stream:
+                summary = offline_scoring.score_stream(
+                    input_stream, output_stream, spec, chunk_size=args.chunk_size, workers=workers
+                )
+            print(f"workers={workers}: {summary.elapsed_seconds:.2f}s, {summary.runs_per_second:,.0f} applications/s")
+
+
+if __name__ == "__main__":
+    main()
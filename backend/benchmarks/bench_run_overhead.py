@@ -0,0 +1,99 @@
+"""
+Benchmark per-run overhead of lazy traces versus eager message formatting
+
+Runs the standard pipeline over synthetic applications and serializes each run
+the way the executor stores it. "lazy" stores structured traces as-is; "eager"
+also renders every step message and rule reason during the run, as the
+executor did before traces. Reports CPU time per run, bytes allocated per run
+(tracemalloc) and stored log bytes per run.
+
+Usage:
+    uv run python benchmarks/bench_run_overhead.py --runs 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import CompiledPipeline  # noqa: E402
+from app.services.pipeline_executor import render_run_logs  # noqa: E402
+
+STEPS = [
+    {"step_type": "dti_rule", "order": 1, "params": {"max_dti": 0.40}},
+    {"step_type": "amount_policy", "order": 2, "params": {}},
+    {"step_type": "risk_scoring", "order": 3, "params": {"approve_threshold": 45}}
+]
+RULES = [
+    {"condition": "dti_rule.failed OR amount_policy.failed", "outcome": "REJECTED", "order": 1},
+    {"condition": "risk_scoring.risk <= 45", "outcome": "APPROVED", "order": 2},
+    {"condition": "else", "outcome": "NEEDS_REVIEW", "order": 3}
+]
+
+
+def applications(count: int):
+    rng = random.Random(42)
+    return [
+        {
+            "applicant_name": f"Applicant {i}",
+            "amount": rng.randint(1000, 60000),
+            "monthly_income": rng.randint(800, 8000),
+            "declared_debts": rng.randint(0, 3000),
+            "country": rng.choice(["ES", "FR", "DE", "OTHER"]),
+            "loan_purpose": "home renovation",
+        }
+        for i in range(count)
+    ]
+
+
+def run_once(compiled: CompiledPipeline, app_data, eager: bool) -> int:
+    """Run and serialize one application, returning the stored log size in bytes"""
+    _, step_logs, rule_logs = compiled.run(app_data)
+    step_logs = [log.to_dict() for log in step_logs]
+    rule_logs = [log.to_dict() for log in rule_logs]
+    if eager:
+        render_run_logs(step_logs, rule_logs)
+        for log in step_logs + rule_logs:
+            log.pop("trace", None)
+    return len(json.dumps(step_logs)) + len(json.dumps(rule_logs))
+
+
+def measure(compiled: CompiledPipeline, apps, eager: bool):
+    started = time.process_time()
+    stored = sum(run_once(compiled, app_data, eager) for app_data in apps)
+    cpu = time.process_time() - started
+
+    # Peak bytes allocated while producing each run
+    allocated = 0
+    tracemalloc.start()
+    for app_data in apps:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run_once(compiled, app_data, eager)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    runs = len(apps)
+    return cpu / runs * 1e6, allocated / runs, stored / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5000)
+    args = parser.parse_args()
+
+    compiled = CompiledPipeline(1, STEPS, RULES)
+    apps = applications(args.runs)
+    print(f"{args.runs} runs of the standard pipeline")
+    print(f"{'mode':>6} {'us/run':>8} {'alloc B/run':>12} {'stored B/run':>13}")
+    for eager in (True, False):
+        cpu, allocated, stored = measure(compiled, apps, eager)
+        print(f"{'eager' if eager else 'lazy':>6} {cpu:>8.1f} {allocated:>12.0f} {stored:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark SentimentCheck throughput with and without LLM micro-batching
+
+Runs concurrent SentimentCheck executions against the fake local LLM endpoint
+from the test suite, which simulates a fixed per-request latency, and reports
+analyzed purposes per second and the number of HTTP requests made.
+
+Usage:
+    uv run python benchmarks/bench_sentiment_batching.py --items 400 --threads 32 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.steps import sentiment_check  # noqa: E402
+from app.steps.sentiment_check import SentimentCheck  # noqa: E402
+from tests.fake_llm import FakeLLMServer  # noqa: E402
+
+PURPOSES = ["home improvement", "casino trip", "education", "crypto mining", "car repair", "wedding"]
+
+
+def run(items: int, threads: int, window_ms: int, max_items: int, latency: float):
+    settings.sentiment_batch_window_ms = window_ms
+    settings.sentiment_batch_max_items = max_items
+    sentiment_check._batcher = None
+
+    with FakeLLMServer(latency=latency) as server:
+        settings.openai_api_key = "benchmark"
+        settings.openai_base_url = server.base_url
+        step = SentimentCheck()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(
+                lambda i: step.execute({"loan_purpose": PURPOSES[i % len(PURPOSES)]}, {}),
+                range(items)
+            ))
+        elapsed = time.perf_counter() - started
+        return items / elapsed, server.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per LLM request")
+    parser.add_argument("--window-ms", type=int, default=20)
+    parser.add_argument("--max-items", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{args.items} purposes, {args.threads} threads, {args.latency * 1000:.0f}ms per LLM request")
+    print(f"{'mode':>10} {'calls/sec':>10} {'requests':>9}")
+    baseline, requests = run(args.items, args.threads, 0, args.max_items, args.latency)
+    print(f"{'single':>10} {baseline:>10.1f} {requests:>9}")
+    batched, requests = run(args.items, args.threads, args.window_ms, args.max_items, args.latency)
+    print(f"{'batched':>10} {batched:>10.1f} {requests:>9}  ({batched / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark the local text-risk classifier against keyword matching
+
+Trains a model on synthetic LLM-scored purposes, then reports microseconds
+per purpose for SentimentCheck's keyword matching, the model's single-item
+predict and its batched predict_batch. Purposes are mostly distinct, so the
+feature cache helps only for the repeated share (--repeat).
+
+Usage:
+    uv run python benchmarks/bench_text_model.py --purposes 20000 --repeat 0.5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.sentiment.text_model import TextRiskModel, _hashed_features  # noqa: E402
+from app.steps.sentiment_check import SentimentCheck  # noqa: E402
+
+SAFE = ["home improvement", "education", "car repair", "wedding", "medical bills", "kitchen renovation"]
+RISKY = ["crypto trading", "casino trip", "sports betting", "bitcoin investment", "forex day trading"]
+
+
+def purposes(count: int, repeat: float, rng: random.Random):
+    pool = [f"{rng.choice(SAFE + RISKY)} {rng.choice(['', 'for my family', 'next year'])}" for _ in range(50)]
+    return [
+        rng.choice(pool) if rng.random() < repeat else f"{rng.choice(SAFE + RISKY)} plan {i}"
+        for i in range(count)
+    ]
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed / count * 1e6:8.2f} us/purpose")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--purposes", type=int, default=20000)
+    parser.add_argument("--repeat", type=float, default=0.5, help="Share of purposes drawn from a small repeated pool")
+    parser.add_argument("--train", type=int, default=2000, help="Synthetic training examples")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    training = [rng.choice(SAFE + RISKY) for _ in range(args.train)]
+    scores = [rng.randint(70, 95) if purpose in RISKY else rng.randint(5, 30) for purpose in training]
+    started = time.perf_counter()
+    model = TextRiskModel.train(training, scores)
+    print(f"Trained on {args.train} examples in {time.perf_counter() - started:.2f}s")
+
+    step = SentimentCheck()
+    terms = SentimentCheck.DEFAULT_RISKY_TERMS
+    batch = purposes(args.purposes, args.repeat, rng)
+
+    timed("keyword matching", len(batch), lambda: [step._analyze_with_keywords(p, terms) for p in batch])
+    _hashed_features.cache_clear()
+    timed("local model, predict", len(batch), lambda: [model.predict(p) for p in batch])
+    _hashed_features.cache_clear()
+    timed("local model, predict_batch", len(batch), lambda: model.predict_batch(batch))
+    timed("  again, features cached", len(batch), lambda: model.predict_batch(batch))
+
+
+if __name__ == "__main__":
+    main()
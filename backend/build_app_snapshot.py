@@ -0,0 +1,51 @@
+"""
+Build or refresh the memory-mapped application snapshot
+
+The snapshot (APP_SNAPSHOT_PATH) holds every application in columnar form
+for offline batch scoring (BatchExecutor.execute_snapshot). By default only
+applications created since the last run are appended; --rebuild rewrites the
+whole file, which also merges the segments refreshes appended.
+
+Usage:
+    uv run python build_app_snapshot.py
+    uv run python build_app_snapshot.py --rebuild --path ./snapshots/applications.snap
+"""
+import argparse
+import os
+import time
+from app.config import settings
+from app.database import SessionLocal, init_db
+from app.services import app_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--path", default=settings.app_snapshot_path, help="Snapshot file")
+    parser.add_argument("--rebuild", action="store_true", help="Rewrite the snapshot instead of appending new rows")
+    parser.add_argument("--batch-size", type=int, default=100000, help="Applications per segment")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if args.rebuild:
+            written = app_snapshot.build_snapshot(db, args.path, args.batch_size)
+        else:
+            written = app_snapshot.refresh_snapshot(db, args.path, args.batch_size)
+    finally:
+        db.close()
+
+    snapshot = app_snapshot.ApplicationSnapshot(args.path)
+    print(f"Applications written: {written} in {time.perf_counter() - started:.2f}s")
+    print(
+        f"Snapshot {args.path}: {snapshot.rows} applications, {len(snapshot.segments)} segment(s), "
+        f"{os.path.getsize(args.path) / 1024:.1f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Export applications joined with their latest run to Parquet or Arrow
+
+Writes one row per application with typed columns for every step output of
+its latest run (`dti_rule_dti`, `risk_scoring_risk`, ...), streamed one row
+group per batch, for analysis in pandas, Polars or DuckDB. Needs pyarrow.
+
+Usage:
+    uv run python export_applications.py applications.parquet
+    uv run python export_applications.py applications.arrows --format arrow --pipeline-id 1
+"""
+import argparse
+import time
+from app.database import SessionLocal, init_db
+from app.services import export
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("output", help="File to write")
+    parser.add_argument("--format", choices=sorted(export.FORMATS), default="parquet", help="Output format")
+    parser.add_argument("--pipeline-id", type=int, help="Join each application's latest run of this pipeline")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Applications per row group / record batch")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        with open(args.output, "wb") as f:
+            size = export.write_export(db, f.write, args.format, args.pipeline_id, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Wrote {args.output}: {size / 1024:.1f} KiB in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
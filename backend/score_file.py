@@ -0,0 +1,95 @@
+"""
+Score a file of loan applications offline, without the API
+
+Reads applications (CSV with a header row, or NDJSON) from a file or stdin,
+runs a stored pipeline (--pipeline-id) or a JSON definition in the POST
+/api/pipelines format (--pipeline-file, e.g. the pipeline in
+seed_default_pipeline.py), and writes one decision per input row, with the
+step outputs, to stdout or --output. Nothing is stored. The country policy
+comes from the database. Progress and throughput go to stderr.
+
+Usage:
+    uv run python score_file.py applications.csv --pipeline-id 1 > decisions.ndjson
+    cat applications.ndjson | uv run python score_file.py - --pipeline-file pipeline.json --workers 4
+    uv run python score_file.py partner.csv --pipeline-id 1 --output-format csv --output decisions.csv
+"""
+import argparse
+import json
+import sys
+import time
+from app.database import SessionLocal, init_db
+from app.db_models import Pipeline
+from app.reference_data import reference_data
+from app.services import offline_scoring
+
+
+def input_format_of(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", help="Applications file, or - for stdin")
+    pipeline = parser.add_mutually_exclusive_group(required=True)
+    pipeline.add_argument("--pipeline-id", type=int, help="Stored pipeline to run")
+    pipeline.add_argument("--pipeline-file", help="JSON pipeline definition to run")
+    parser.add_argument(
+        "--input-format", choices=offline_scoring.FORMATS, help="Default: from the extension, else ndjson"
+    )
+    parser.add_argument("--output", default="-", help="Decisions file, or - for stdout")
+    parser.add_argument("--output-format", choices=offline_scoring.FORMATS, default="ndjson")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Applications scored per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes")
+    parser.add_argument("--quiet", action="store_true", help="Only report the final summary")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        reference_data.load(db)
+        if args.pipeline_id is not None:
+            stored = db.get(Pipeline, args.pipeline_id)
+            if stored is None:
+                parser.error(f"Pipeline {args.pipeline_id} not found")
+            spec = offline_scoring.pipeline_spec(stored)
+        else:
+            with open(args.pipeline_file) as f:
+                spec = offline_scoring.definition_spec(json.load(f))
+    finally:
+        db.close()
+
+    last_report = [time.perf_counter()]
+
+    def report(summary):
+        if not args.quiet and time.perf_counter() - last_report[0] >= 1:
+            last_report[0] = time.perf_counter()
+            rate = f"{summary.runs_per_second:,.0f}/s"
+            print(f"{summary.processed} scored, {summary.invalid} invalid, {rate}", file=sys.stderr)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        summary = offline_scoring.score_stream(
+            input_stream,
+            output_stream,
+            spec,
+            input_format=args.input_format or input_format_of(args.input),
+            output_format=args.output_format,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            progress=report
+        )
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(json.dumps(summary.to_dict()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
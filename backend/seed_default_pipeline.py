@@ -18,27 +18,15 @@ def create_default_pipeline():
                 "params": {"max_dti": 0.40}
             },
             {
+                # Country caps come from the country policy table
                 "step_type": "amount_policy",
                 "order": 2,
-                "params": {
-                    "ES": 30000,
-                    "FR": 25000,
-                    "DE": 35000,
-                    "OTHER": 20000
-                }
+                "params": {}
             },
             {
                 "step_type": "risk_scoring",
                 "order": 3,
-                "params": {
-                    "approve_threshold": 45,
-                    "country_caps": {
-                        "ES": 30000,
-                        "FR": 25000,
-                        "DE": 35000,
-                        "OTHER": 20000
-                    }
-                }
+                "params": {"approve_threshold": 45}
             }
         ],
         "terminal_rules": [
@@ -0,0 +1,82 @@
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base
+from app.db_models import LoanApplication, Pipeline
+from app.sentiment import ProviderGuard
+from app.services.step_statistics import step_statistics
+from app.steps import sentiment_check
+from tests.fake_llm import FakeLLMServer
+
+STANDARD_STEPS = [
+    {"step_type": "dti_rule", "order": 1, "params": {"max_dti": 0.40}},
+    {"step_type": "amount_policy", "order": 2, "params": {}},
+    {"step_type": "risk_scoring", "order": 3, "params": {"approve_threshold": 45}}
+]
+
+STANDARD_RULES = [
+    {"condition": "dti_rule.failed OR amount_policy.failed", "outcome": "REJECTED", "order": 1},
+    {"condition": "risk_scoring.risk <= 45", "outcome": "APPROVED", "order": 2},
+    {"condition": "else", "outcome": "NEEDS_REVIEW", "order": 3}
+]
+
+# Ana, Luis and Mia from the specification
+SCENARIO_APPLICATIONS = [
+    {"applicant_name": "Ana", "amount": 12000, "monthly_income": 4000, "declared_debts": 500,
+     "country": "ES", "loan_purpose": "home improvement"},
+    {"applicant_name": "Luis", "amount": 28000, "monthly_income": 2000, "declared_debts": 1200,
+     "country": "OTHER", "loan_purpose": "business"},
+    {"applicant_name": "Mia", "amount": 20000, "monthly_income": 3000, "declared_debts": 900,
+     "country": "FR", "loan_purpose": "education"},
+]
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    """Session bound to a fresh file-backed SQLite database"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+    # Pipeline ids restart with every database
+    step_statistics.reset()
+
+
+@pytest.fixture
+def standard_pipeline(db_session):
+    """The default DTI / amount / risk pipeline"""
+    pipeline = Pipeline(
+        name="Standard Pipeline",
+        steps_config=json.dumps(STANDARD_STEPS),
+        terminal_rules=json.dumps(STANDARD_RULES)
+    )
+    db_session.add(pipeline)
+    db_session.commit()
+    return pipeline
+
+
+@pytest.fixture
+def scenario_applications(db_session):
+    """Ana (APPROVED), Luis (REJECTED) and Mia (NEEDS_REVIEW)"""
+    applications = [LoanApplication(status="PENDING", **data) for data in SCENARIO_APPLICATIONS]
+    db_session.add_all(applications)
+    db_session.commit()
+    return applications
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Point SentimentCheck at a local fake OpenAI endpoint"""
+    with FakeLLMServer() as server:
+        monkeypatch.setattr(settings, "openai_api_key", "test-key")
+        monkeypatch.setattr(settings, "openai_base_url", server.base_url)
+        monkeypatch.setattr(sentiment_check, "_batcher", None)
+        monkeypatch.setattr(sentiment_check, "openai_guard", ProviderGuard.from_settings())
+        yield server
@@ -0,0 +1,96 @@
+"""
+Fake OpenAI-compatible chat completions endpoint for tests and benchmarks
+
+Scores a loan purpose 90 if it mentions a risky term from the prompt and 10
+otherwise. Understands both the single-purpose and the batched prompt used by
+SentimentCheck, and can simulate per-request latency.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SINGLE_PURPOSE = re.compile(r'^Loan purpose: "(.*)"$', re.MULTILINE)
+BATCH_PURPOSES = re.compile(r"^Loan purposes \(JSON array\): (.*)$", re.MULTILINE)
+RISKY_TERMS = re.compile(r"^Risky/speculative keywords to watch for: (.*)$", re.MULTILINE)
+
+
+def _score(purpose, risky_terms):
+    detected = [term for term in risky_terms if term and term in purpose.lower()]
+    return {"risk_score": 90 if detected else 10, "detected_risks": detected, "confidence": 0.95}
+
+
+class FakeLLMServer:
+    """Threaded HTTP server speaking just enough of the chat completions API"""
+
+    def __init__(self, latency: float = 0.0, status_code: int = 200):
+        self.latency = latency
+        self.status_code = status_code
+        self.requests = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def complete(self, prompt: str) -> str:
+        risky_terms = RISKY_TERMS.search(prompt).group(1).split(", ")
+        batch = BATCH_PURPOSES.search(prompt)
+        if batch:
+            return json.dumps([_score(purpose, risky_terms) for purpose in json.loads(batch.group(1))])
+        return json.dumps(_score(SINGLE_PURPOSE.search(prompt).group(1), risky_terms))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][-1]["content"]
+                with server._lock:
+                    server.requests += 1
+                    server.prompts.append(prompt)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server.status_code != 200:
+                    payload = {"error": {"message": "fake failure", "type": "server_error"}}
+                    status = server.status_code
+                else:
+                    status = 200
+                    payload = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body["model"],
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": server.complete(prompt)},
+                            "finish_reason": "stop"
+                        }],
+                    }
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.db_models import DecisionRollup, ScoreHistogram
+from app.main import app
+from app.services import BatchExecutor, PipelineExecutor, analytics
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+    return TestClient(app)
+
+
+def today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class TestAnalyticsRollups:
+    """Test rollups maintained as runs are written"""
+
+    def test_single_and_batch_runs_roll_up(self, db_session, standard_pipeline, scenario_applications):
+        ana, luis, mia = scenario_applications
+        executor = PipelineExecutor(db_session)
+        executor.execute(ana.id, standard_pipeline.id)
+        executor.execute(ana.id, standard_pipeline.id)
+        BatchExecutor(db_session).execute_batch([luis.id, mia.id], standard_pipeline.id)
+
+        rollups = {(r.country, r.final_status): r for r in db_session.query(DecisionRollup)}
+        assert {key: r.runs for key, r in rollups.items()} == {
+            ("ES", "APPROVED"): 2, ("OTHER", "REJECTED"): 1, ("FR", "NEEDS_REVIEW"): 1
+        }
+        ana_rollup = rollups[("ES", "APPROVED")]
+        assert ana_rollup.dti_count == 2
+        assert ana_rollup.dti_sum == pytest.approx(2 * 500 / 4000)
+        assert sum(h.runs for h in db_session.query(ScoreHistogram).filter(ScoreHistogram.metric == "dti")) == 4
+
+    def test_rebuild_matches_incremental(self, db_session, standard_pipeline, scenario_applications):
+        BatchExecutor(db_session).execute_batch([app.id for app in scenario_applications], standard_pipeline.id)
+        before = analytics.summarize(db_session)
+
+        assert analytics.rebuild(db_session, batch_size=2) == 3
+        assert analytics.summarize(db_session) == before
+        assert analytics.rebuild(db_session) == 3
+        assert analytics.summarize(db_session)["runs"] == 3
+
+    def test_buckets(self):
+        assert analytics.bucket_of("dti", 0.125) == 2
+        assert analytics.bucket_of("dti", 3.5) == 20
+        assert analytics.bucket_of("risk", -1) == 0
+        assert analytics.bucket_of("risk", 42.5) == 4
+
+
+class TestAnalyticsAPI:
+    """Test GET /api/analytics"""
+
+    def test_breakdowns(self, client, standard_pipeline, scenario_applications):
+        for application in scenario_applications:
+            client.post("/api/runs", json={"application_id": application.id, "pipeline_id": standard_pipeline.id})
+
+        result = client.get("/api/analytics").json()
+        assert result["runs"] == 3
+        assert result["approval_rate"] == pytest.approx(1 / 3, abs=1e-4)
+        assert result["by_country"]["ES"]["status_counts"] == {"APPROVED": 1}
+        assert result["by_pipeline"][str(standard_pipeline.id)]["runs"] == 3
+        assert result["by_day"][today()]["runs"] == 3
+        assert result["mean_dti"] is not None
+        assert sum(bucket["runs"] for bucket in result["histograms"]["risk"]) == 3
+
+        assert client.get("/api/analytics", params={"country": "FR"}).json()["status_counts"] == {"NEEDS_REVIEW": 1}
+        assert client.get("/api/analytics", params={"start": date(2000, 1, 2).isoformat(), "end": "2000-01-03"}).json()["runs"] == 0
@@ -0,0 +1,96 @@
+import json
+import numpy as np
+import pytest
+from app.db_models import LoanApplication, PipelineRun
+from app.services import BatchExecutor, app_snapshot
+from app.services.pipeline_executor import application_to_dict
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "applications.snap")
+
+
+def add_application(db_session, name, country="DE", purpose="café renovation"):
+    application = LoanApplication(
+        applicant_name=name, amount=12000, monthly_income=3000,
+        declared_debts=600, country=country, loan_purpose=purpose, status="PENDING"
+    )
+    db_session.add(application)
+    db_session.commit()
+    return application
+
+
+class TestApplicationSnapshot:
+    """Test the memory-mapped application snapshot"""
+
+    def test_round_trip(self, db_session, scenario_applications, snapshot_path):
+        assert app_snapshot.build_snapshot(db_session, snapshot_path) == 3
+        snapshot = app_snapshot.ApplicationSnapshot(snapshot_path)
+
+        assert snapshot.rows == 3
+        assert snapshot.max_id == scenario_applications[-1].id
+        segment_index, selector = next(snapshot.slices(10))
+        chunk = snapshot.chunk(segment_index, selector)
+        assert isinstance(chunk.amount, np.ndarray) and not chunk.amount.flags.owndata  # A view of the mapping
+        assert chunk.applications() == [(app.id, application_to_dict(app)) for app in scenario_applications]
+
+    def test_incremental_refresh(self, db_session, scenario_applications, snapshot_path):
+        app_snapshot.build_snapshot(db_session, snapshot_path)
+        assert app_snapshot.refresh_snapshot(db_session, snapshot_path) == 0
+        added = add_application(db_session, "Zoë")
+
+        assert app_snapshot.refresh_snapshot(db_session, snapshot_path) == 1
+        snapshot = app_snapshot.ApplicationSnapshot(snapshot_path)
+        assert len(snapshot.segments) == 2
+        chunks, missing = snapshot.locate([added.id, scenario_applications[0].id, 999], chunk_size=10)
+        assert missing == [999]
+        found = [app for index, positions in chunks for app in snapshot.chunk(index, positions).applications()]
+        ana = scenario_applications[0]
+        assert sorted(found) == sorted([(added.id, application_to_dict(added)), (ana.id, application_to_dict(ana))])
+
+    def test_incomplete_tail_is_ignored(self, db_session, scenario_applications, snapshot_path):
+        app_snapshot.build_snapshot(db_session, snapshot_path)
+        with open(snapshot_path, "ab") as f:
+            f.write(app_snapshot.MAGIC + b"\x10\x00")  # A refresh that crashed mid-write
+        assert app_snapshot.ApplicationSnapshot(snapshot_path).rows == 3
+
+        add_application(db_session, "Zoë")
+        assert app_snapshot.refresh_snapshot(db_session, snapshot_path) == 1
+        assert app_snapshot.ApplicationSnapshot(snapshot_path).rows == 4
+
+
+class TestSnapshotBatchExecutor:
+    """Test batch scoring from the snapshot"""
+
+    def test_matches_database_batch(self, db_session, standard_pipeline, scenario_applications, snapshot_path):
+        ids = [app.id for app in scenario_applications]
+        BatchExecutor(db_session).execute_batch(ids, standard_pipeline.id)
+        summary = BatchExecutor(db_session, chunk_size=2).execute_snapshot(standard_pipeline.id, path=snapshot_path)
+        assert summary.processed == 3
+
+        def outcome(run):
+            return run.application_id, run.final_status, json.loads(run.step_logs), run.input_hash
+
+        runs = db_session.query(PipelineRun).order_by(PipelineRun.id).all()
+        assert [outcome(run) for run in runs[3:]] == [outcome(run) for run in runs[:3]]
+
+    def test_selected_ids_and_refresh(self, db_session, standard_pipeline, scenario_applications, snapshot_path):
+        app_snapshot.build_snapshot(db_session, snapshot_path)
+        added = add_application(db_session, "Zoë")
+
+        summary = BatchExecutor(db_session).execute_snapshot(
+            standard_pipeline.id, [added.id, scenario_applications[0].id, 999], path=snapshot_path
+        )
+        assert summary.processed == 2
+        assert summary.missing == [999]
+
+    def test_process_pool(self, db_session, standard_pipeline, scenario_applications, snapshot_path):
+        summary = BatchExecutor(db_session, workers=2, chunk_size=1).execute_snapshot(
+            standard_pipeline.id, path=snapshot_path
+        )
+        assert summary.status_counts == {"APPROVED": 1, "REJECTED": 1, "NEEDS_REVIEW": 1}
+        db_session.expire_all()
+        assert [app.status for app in db_session.query(LoanApplication).order_by(LoanApplication.id)] == [
+            "APPROVED", "REJECTED", "NEEDS_REVIEW"
+        ]
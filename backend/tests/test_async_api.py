@@ -0,0 +1,96 @@
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.database import async_database_url, get_async_db, get_db
+from app.db_models import LoanApplication, PipelineRun, RunSummary
+from app.main import include_routers
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+
+@pytest.fixture
+def client(db_session):
+    """App with async routes on the test database; sync-only routes share it"""
+    url = async_database_url(str(db_session.get_bind().url))
+    engine = create_async_engine(url)
+    factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    async_app = FastAPI()
+    include_routers(async_app, async_db=True)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    async_app.dependency_overrides[get_db] = lambda: db_session
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+class TestAsyncRoutes:
+    """Test the async application, pipeline and run routes"""
+
+    def test_async_routes_serve_core_paths(self):
+        async_app = FastAPI()
+        include_routers(async_app, async_db=True)
+        operations = {
+            (path, method): operation["operationId"]
+            for path, item in async_app.openapi()["paths"].items()
+            for method, operation in item.items()
+        }
+        assert operations[("/api/runs", "post")].startswith("execute_pipeline_async")
+        assert operations[("/api/pipelines/{pipeline_id}/shadow", "put")].startswith("set_shadow")
+
+    def test_application_pipeline_and_run(self, client, db_session):
+        application = client.post("/api/applications", json=SCENARIO_APPLICATIONS[2])
+        assert application.status_code == 201
+        application_id = application.json()["id"]
+        assert client.get(f"/api/applications/{application_id}").json()["status"] == "PENDING"
+
+        pipeline = client.post("/api/pipelines", json={
+            "name": "Standard", "steps": STANDARD_STEPS, "terminal_rules": STANDARD_RULES
+        })
+        assert pipeline.status_code == 201
+        pipeline_id = pipeline.json()["id"]
+        updated = client.put(f"/api/pipelines/{pipeline_id}", json={"short_circuit": True})
+        assert updated.json()["version"] == 2
+
+        run = client.post("/api/runs", json={"application_id": application_id, "pipeline_id": pipeline_id})
+        assert run.status_code == 201
+        assert run.json()["final_status"] == "NEEDS_REVIEW"
+        assert run.json()["pipeline_version"] == 2
+        assert client.get(f"/api/applications/{application_id}").json()["status"] == "NEEDS_REVIEW"
+        assert client.get(f"/api/runs/{run.json()['id']}").json()["step_logs"][0]["message"]
+
+        # Same logs as the sync executor writes
+        stored = db_session.query(PipelineRun).one()
+        assert [log["step_type"] for log in json.loads(stored.step_logs)] == ["dti_rule", "amount_policy", "risk_scoring"]
+        assert db_session.get(RunSummary, stored.id).applicant_name == "Mia"
+
+        reused = client.post("/api/runs", json={"application_id": application_id, "pipeline_id": pipeline_id, "reuse": True})
+        assert (reused.status_code, reused.json()["reused"]) == (200, True)
+
+    def test_idempotency_and_errors(self, client):
+        headers = {"Idempotency-Key": "async-1"}
+        first = client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers)
+        retry = client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers)
+        assert (first.status_code, retry.status_code) == (201, 200)
+        assert retry.json()["id"] == first.json()["id"]
+
+        assert client.post("/api/runs", json={"application_id": 999, "pipeline_id": 1}).status_code == 404
+        assert client.get("/api/pipelines/999").status_code == 404
+
+    def test_failed_application_insert_releases_key(self, client, monkeypatch):
+        commit = AsyncSession.commit
+
+        async def failing_commit(self):
+            if any(isinstance(obj, LoanApplication) for obj in self.new):
+                raise RuntimeError("disk I/O error")
+            await commit(self)
+
+        headers = {"Idempotency-Key": "async-2"}
+        monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+        assert client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers).status_code == 500
+        monkeypatch.setattr(AsyncSession, "commit", commit)
+        assert client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers).status_code == 201
@@ -0,0 +1,37 @@
+import json
+from app.db_models import LoanApplication, PipelineRun
+from app.services import BatchExecutor, PipelineExecutor
+
+EXPECTED_STATUSES = ["APPROVED", "REJECTED", "NEEDS_REVIEW"]
+
+
+class TestBatchExecutor:
+    """Test batch execution over many applications"""
+
+    def test_in_process_batch_matches_single_execution(self, db_session, standard_pipeline, scenario_applications):
+        """Batch runs produce the same decisions and logs as one-by-one runs"""
+        ids = [app.id for app in scenario_applications]
+        summary = BatchExecutor(db_session, workers=1, chunk_size=2).execute_batch(ids, standard_pipeline.id)
+
+        assert summary.processed == 3
+        assert summary.missing == []
+        assert summary.status_counts == {"APPROVED": 1, "REJECTED": 1, "NEEDS_REVIEW": 1}
+
+        batch_runs = db_session.query(PipelineRun).order_by(PipelineRun.application_id).all()
+        assert [run.final_status for run in batch_runs] == EXPECTED_STATUSES
+
+        single = PipelineExecutor(db_session).execute(ids[0], standard_pipeline.id)
+        assert json.loads(single.step_logs) == json.loads(batch_runs[0].step_logs)
+        assert json.loads(single.terminal_rule_logs) == json.loads(batch_runs[0].terminal_rule_logs)
+
+    def test_process_pool_batch(self, db_session, standard_pipeline, scenario_applications):
+        """Worker processes score chunks and the parent persists them"""
+        ids = [app.id for app in scenario_applications]
+        summary = BatchExecutor(db_session, workers=2, chunk_size=1).execute_batch(ids + [999], standard_pipeline.id)
+
+        assert summary.processed == 3
+        assert summary.missing == [999]
+        db_session.expire_all()
+        statuses = [app.status for app in db_session.query(LoanApplication).order_by(LoanApplication.id)]
+        assert statuses == EXPECTED_STATUSES
+        assert db_session.query(PipelineRun).count() == 3
@@ -0,0 +1,78 @@
+import numpy as np
+from app.models import FinalStatus
+from app.services import CompiledPipeline
+from app.services.conditions import CompiledRules, StepColumns, parse_condition, render_reason
+from app.steps import AmountPolicy, DTIRule, RiskScoring
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+
+def reason(trace, results):
+    return render_reason(trace, {step_type: result.message for step_type, result in results.items()})
+
+
+def step_results(application):
+    return {
+        "dti_rule": DTIRule().execute(application, {}),
+        "amount_policy": AmountPolicy().execute(application, {}),
+        "risk_scoring": RiskScoring().execute(application, {}),
+    }
+
+
+class TestConditionEvaluation:
+    """Test single-application condition evaluation and reasons"""
+
+    def test_comparison_reason(self):
+        results = step_results(SCENARIO_APPLICATIONS[0])
+        matched, trace = parse_condition("risk_scoring.risk <= 45").evaluate(results)
+        assert matched is True
+        assert trace == ["cmp", "risk_scoring.risk", 20.5, "<=", "45", 45]
+        assert reason(trace, results) == "risk_scoring.risk (20.5) <= 45 (45)"
+
+    def test_or_with_failed_step(self):
+        results = step_results(SCENARIO_APPLICATIONS[1])
+        matched, trace = parse_condition("dti_rule.failed OR amount_policy.failed").evaluate(results)
+        assert matched is True
+        assert reason(trace, results).startswith("OR condition TRUE: dti_rule failed (DTI ratio: 60.00%")
+
+    def test_and_lists_every_part_when_true(self):
+        results = step_results(SCENARIO_APPLICATIONS[0])
+        matched, trace = parse_condition("dti_rule.passed AND risk_scoring.risk <= 45").evaluate(results)
+        assert matched is True
+        assert reason(trace, results).startswith("AND condition TRUE: dti_rule passed (")
+        assert reason(trace, results).endswith(" AND risk_scoring.risk (20.5) <= 45 (45)")
+
+    def test_missing_step_is_not_matched(self):
+        matched, trace = parse_condition("sentiment_check.failed").evaluate({})
+        assert (matched, reason(trace, {})) == (False, "sentiment_check not found")
+
+
+class TestVectorizedRules:
+    """Test batch evaluation with boolean masks"""
+
+    def test_comparison_mask(self):
+        columns = StepColumns.from_results([step_results(app) for app in SCENARIO_APPLICATIONS])
+        mask = parse_condition("risk_scoring.risk <= 45").mask(columns)
+        assert mask.tolist() == [True, False, False]
+        assert columns.column("risk_scoring", "risk").dtype == np.float64
+
+    def test_first_match_wins(self):
+        columns = StepColumns.from_results([step_results(app) for app in SCENARIO_APPLICATIONS])
+        matched = CompiledRules(STANDARD_RULES).match_batch(columns)
+        # Luis matches both the rejection rule and else; the earlier rule wins
+        assert matched.tolist() == [1, 0, 2]
+
+    def test_batch_matches_single_runs(self):
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES)
+        batch = compiled.run_batch(SCENARIO_APPLICATIONS)
+
+        assert [status for status, _, _ in batch] == [
+            FinalStatus.APPROVED, FinalStatus.REJECTED, FinalStatus.NEEDS_REVIEW
+        ]
+        for application, (_, _, rule_logs) in zip(SCENARIO_APPLICATIONS, batch):
+            _, _, single_rule_logs = compiled.run(application)
+            assert rule_logs == single_rule_logs
+
+    def test_rule_logs_only_when_requested(self):
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES)
+        batch = compiled.run_batch(SCENARIO_APPLICATIONS, include_rule_logs=False)
+        assert all(rule_logs == [] for _, _, rule_logs in batch)
@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, upgrade_schema
+from app.db_models import Pipeline, PipelineRun
+
+# Tables as the first release created them
+BASELINE_SCHEMA = [
+    """CREATE TABLE applications (
+        id INTEGER PRIMARY KEY, applicant_name VARCHAR NOT NULL, amount INTEGER NOT NULL,
+        monthly_income INTEGER NOT NULL, declared_debts INTEGER NOT NULL, country VARCHAR NOT NULL,
+        loan_purpose VARCHAR NOT NULL, status VARCHAR, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE pipelines (
+        id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, description VARCHAR, steps_config TEXT NOT NULL,
+        terminal_rules TEXT NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE pipeline_runs (
+        id INTEGER PRIMARY KEY, application_id INTEGER NOT NULL REFERENCES applications (id),
+        pipeline_id INTEGER NOT NULL REFERENCES pipelines (id), step_logs TEXT NOT NULL,
+        terminal_rule_logs TEXT NOT NULL, final_status VARCHAR NOT NULL,
+        executed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "INSERT INTO pipelines (name, steps_config, terminal_rules) VALUES ('Old', '[]', '[]')",
+]
+
+
+class TestUpgradeSchema:
+    """Test upgrading databases created by older versions"""
+
+    def test_adds_missing_columns_and_indexes(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            for statement in BASELINE_SCHEMA:
+                conn.execute(text(statement))
+
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine)
+        upgrade_schema(engine)  # Idempotent
+
+        inspector = inspect(engine)
+        columns = {column["name"] for column in inspector.get_columns("pipelines")}
+        assert {"timeout_ms", "short_circuit", "execution_plan", "version", "shadow_pipeline_id"} <= columns
+        columns = {column["name"] for column in inspector.get_columns("pipeline_runs")}
+        assert {"reference_version", "pipeline_version", "input_hash"} <= columns
+        indexes = {index["name"] for index in inspector.get_indexes("pipeline_runs")}
+        assert "ix_pipeline_runs_application_executed" in indexes
+
+        db = sessionmaker(bind=engine)()
+        pipeline = db.query(Pipeline).one()
+        assert (pipeline.name, pipeline.version, pipeline.short_circuit) == ("Old", 1, False)
+        assert db.query(PipelineRun).count() == 0
+        db.close()
+        engine.dispose()
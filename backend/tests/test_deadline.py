@@ -0,0 +1,69 @@
+import time
+from fastapi.testclient import TestClient
+from app.main import app
+from app.metrics import metrics
+from app.services import CompiledPipeline
+from app.steps.context import Deadline, RunContext
+from app.steps.sentiment_check import SentimentCheck
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+
+def expired_context():
+    context = RunContext(Deadline(1))
+    time.sleep(0.005)
+    return context
+
+
+class TestRunDeadline:
+    """Test deadline propagation through pipeline runs"""
+
+    def test_no_deadline_runs_every_step(self):
+        """Runs without a budget execute all steps"""
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES)
+        final_status, step_logs, _ = compiled.run(SCENARIO_APPLICATIONS[0])
+
+        assert final_status == "APPROVED"
+        assert not any(log.timed_out for log in step_logs)
+
+    def test_expired_deadline_skips_steps(self):
+        """Steps after the deadline are logged as timed out and the run goes to review"""
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES)
+        before = metrics.get("runs.degraded")
+
+        final_status, step_logs, _ = compiled.run(SCENARIO_APPLICATIONS[1], expired_context())
+
+        assert final_status == "NEEDS_REVIEW"
+        assert all(log.timed_out and not log.passed for log in step_logs)
+        assert metrics.get("runs.degraded") == before + 1
+
+
+class TestSentimentDegradation:
+    """Test SentimentCheck falling back to keywords under a deadline"""
+
+    def test_small_budget_skips_llm(self, fake_llm):
+        """Below min_llm_budget_ms the LLM is not called at all"""
+        context = RunContext(Deadline(500))
+        result = SentimentCheck().execute({"loan_purpose": "casino trip"}, {"min_llm_budget_ms": 2000}, context)
+
+        assert fake_llm.requests == 0
+        assert result.computed_values["analysis_method"] == "keyword_matching"
+        assert "sentiment_check" in context.degraded
+
+    def test_hung_llm_call_is_cut_off(self, fake_llm):
+        """A slow LLM call is abandoned at the deadline"""
+        fake_llm.latency = 2
+        context = RunContext(Deadline(200))
+        started = time.monotonic()
+        result = SentimentCheck().execute({"loan_purpose": "casino trip"}, {"min_llm_budget_ms": 0}, context)
+
+        assert time.monotonic() - started < 1.5
+        assert result.computed_values["analysis_method"] == "keyword_matching"
+        assert context.degraded["sentiment_check"] == "LLM call exceeded run deadline"
+
+
+def test_run_metrics_endpoint():
+    """Degradation counts are exposed through the metrics API"""
+    response = TestClient(app).get("/api/metrics/runs")
+    assert response.status_code == 200
+    data = response.json()
+    assert {"runs_total", "runs_degraded", "degradation_rate", "steps_degraded", "steps_timed_out"} <= data.keys()
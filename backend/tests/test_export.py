@@ -0,0 +1,91 @@
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.main import app
+from app.services import BatchExecutor, PipelineExecutor, export, run_archive
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+    return TestClient(app)
+
+
+def read_export(db_session, export_format="parquet", **kwargs):
+    buffer = io.BytesIO()
+    export.write_export(db_session, buffer.write, export_format, **kwargs)
+    buffer.seek(0)
+    if export_format == "parquet":
+        return pq.ParquetFile(buffer)
+    return pa.ipc.open_stream(buffer).read_all()
+
+
+class TestExport:
+    """Test columnar exports of applications and their latest run"""
+
+    def test_typed_step_columns(self, db_session, standard_pipeline, scenario_applications):
+        BatchExecutor(db_session).execute_batch([app.id for app in scenario_applications], standard_pipeline.id)
+        table = read_export(db_session, pipeline_id=standard_pipeline.id).read()
+
+        assert table.num_rows == 3
+        assert table.schema.field("dti_rule_dti").type == pa.float64()
+        assert table.schema.field("amount_policy_cap").type == pa.int64()
+        assert table.schema.field("dti_rule_passed").type == pa.bool_()
+        assert "sentiment_check_risk_score" not in table.schema.names  # Not a step of this pipeline
+        rows = {row["applicant_name"]: row for row in table.to_pylist()}
+        assert rows["Ana"]["final_status"] == "APPROVED"
+        assert rows["Ana"]["dti_rule_dti"] == pytest.approx(500 / 4000)
+        assert rows["Luis"]["amount_policy_passed"] is False
+
+    def test_latest_run_and_unrun_applications(self, db_session, standard_pipeline, scenario_applications):
+        ana = scenario_applications[0]
+        executor = PipelineExecutor(db_session)
+        executor.execute(ana.id, standard_pipeline.id)
+        latest = executor.execute(ana.id, standard_pipeline.id)
+        table = read_export(db_session, "arrow")
+
+        rows = {row["application_id"]: row for row in table.to_pylist()}
+        assert rows[ana.id]["run_id"] == latest.id
+        assert rows[scenario_applications[1].id]["run_id"] is None
+        assert rows[scenario_applications[1].id]["dti_rule_dti"] is None
+        assert table.schema.field("sentiment_check_detected_risks").type == pa.list_(pa.string())
+
+    def test_row_group_per_batch(self, db_session, standard_pipeline, scenario_applications):
+        parquet = read_export(db_session, batch_size=2)
+        assert parquet.metadata.num_row_groups == 2
+        assert parquet.metadata.num_rows == 3
+
+    def test_archived_runs(self, db_session, standard_pipeline, scenario_applications, tmp_path, monkeypatch):
+        monkeypatch.setattr(run_archive.settings, "archive_dir", str(tmp_path))
+        ana = scenario_applications[0]
+        run = PipelineExecutor(db_session).execute(ana.id, standard_pipeline.id)
+        assert run_archive.archive_runs(db_session, run_archive.retention_cutoff(-1))
+
+        rows = {row["application_id"]: row for row in read_export(db_session).read().to_pylist()}
+        assert rows[ana.id]["run_id"] == run.id
+        assert rows[ana.id]["risk_scoring_risk"] is not None
+
+
+class TestExportAPI:
+    """Test GET /api/export/applications"""
+
+    def test_parquet_download(self, client, standard_pipeline, scenario_applications):
+        for application in scenario_applications:
+            client.post("/api/runs", json={"application_id": application.id, "pipeline_id": standard_pipeline.id})
+        response = client.get("/api/export/applications", params={"pipeline_id": standard_pipeline.id})
+
+        assert response.status_code == 200
+        assert response.headers["content-disposition"] == 'attachment; filename="applications.parquet"'
+        table = pq.read_table(io.BytesIO(response.content))
+        assert sorted(table.column("final_status").to_pylist()) == ["APPROVED", "NEEDS_REVIEW", "REJECTED"]
+
+    def test_empty_arrow_export(self, client):
+        response = client.get("/api/export/applications", params={"format": "arrow"})
+        assert response.status_code == 200
+        assert pa.ipc.open_stream(response.content).read_all().num_rows == 0
+
+    def test_unknown_pipeline(self, client):
+        assert client.get("/api/export/applications", params={"pipeline_id": 999}).status_code == 404
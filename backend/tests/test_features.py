@@ -0,0 +1,51 @@
+import pytest
+from app.services import CompiledPipeline
+from app.steps import features as features_module
+from app.reference_data import DEFAULT_COUNTRY_CAPS
+from app.steps.features import Features
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+
+@pytest.fixture
+def compute_counts(monkeypatch):
+    """Count how often each feature is actually computed"""
+    counts = {}
+    for name, compute in list(features_module._FEATURES.items()):
+        def counting(features, *args, _name=name, _compute=compute):
+            counts[_name] = counts.get(_name, 0) + 1
+            return _compute(features, *args)
+        monkeypatch.setitem(features_module._FEATURES, name, counting)
+    return counts
+
+
+class TestFeatures:
+    """Test derived feature computation and memoization"""
+
+    def test_values(self):
+        features = Features({"monthly_income": 4000, "declared_debts": 500, "amount": 15000,
+                             "country": "XX", "loan_purpose": "  Home   Renovation "})
+        assert features.get("dti") == 0.125
+        assert features.get("cap", DEFAULT_COUNTRY_CAPS) == 20000
+        assert features.get("amount_cap_ratio", DEFAULT_COUNTRY_CAPS) == 0.75
+        assert features.get("purpose") == "home renovation"
+
+    def test_no_income_has_no_dti(self):
+        assert Features({"monthly_income": 0, "declared_debts": 500}).get("dti") is None
+
+    def test_memoized_per_caps_table(self, compute_counts):
+        features = Features({"amount": 10000, "country": "FR"})
+        custom_caps = {"FR": 5000, "OTHER": 1000}
+
+        assert features.get("cap", DEFAULT_COUNTRY_CAPS) == 25000
+        assert features.get("cap", DEFAULT_COUNTRY_CAPS) == 25000
+        assert features.get("cap", custom_caps) == 5000
+        assert compute_counts["cap"] == 2
+
+    def test_shared_across_steps_of_a_run(self, compute_counts):
+        """DTI and the cap are computed once per run even though two steps read each"""
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES)
+        for application in SCENARIO_APPLICATIONS:
+            compiled.run(application)
+
+        assert compute_counts["dti"] == len(SCENARIO_APPLICATIONS)
+        assert compute_counts["cap"] == len(SCENARIO_APPLICATIONS)
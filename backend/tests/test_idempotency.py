@@ -0,0 +1,166 @@
+from datetime import timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.db_models import IdempotencyKey, LoanApplication, PipelineRun
+from app.main import app
+from app.reference_data import CountryPolicySnapshot, reference_data
+from app.services import PipelineExecutor, idempotency
+from app.services.pipeline_executor import CompiledPipeline
+from tests.conftest import SCENARIO_APPLICATIONS
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+    return TestClient(app)
+
+
+class TestIdempotencyKeys:
+    """Test Idempotency-Key handling on create endpoints"""
+
+    def test_run_retry_returns_first_run(self, client, db_session, standard_pipeline, scenario_applications):
+        body = {"application_id": scenario_applications[0].id, "pipeline_id": standard_pipeline.id}
+        first = client.post("/api/runs", json=body, headers={"Idempotency-Key": "retry-1"})
+        retry = client.post("/api/runs", json=body, headers={"Idempotency-Key": "retry-1"})
+
+        assert first.status_code == 201
+        assert retry.status_code == 200
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert retry.json()["id"] == first.json()["id"]
+        assert db_session.query(PipelineRun).count() == 1
+
+    def test_key_reused_with_other_body(self, client, standard_pipeline, scenario_applications):
+        headers = {"Idempotency-Key": "retry-2"}
+        client.post("/api/runs", json={"application_id": scenario_applications[0].id, "pipeline_id": standard_pipeline.id}, headers=headers)
+        response = client.post("/api/runs", json={"application_id": scenario_applications[1].id, "pipeline_id": standard_pipeline.id}, headers=headers)
+
+        assert response.status_code == 422
+
+    def test_failed_request_releases_key(self, client, standard_pipeline, scenario_applications):
+        body = {"application_id": 999, "pipeline_id": standard_pipeline.id}
+        assert client.post("/api/runs", json=body, headers={"Idempotency-Key": "retry-3"}).status_code == 404
+        assert client.post("/api/runs", json=body, headers={"Idempotency-Key": "retry-3"}).status_code == 404
+
+    def test_in_flight_key(self, db_session):
+        assert idempotency.begin(db_session, "runs", "retry-4", {"a": 1}) is None
+        with pytest.raises(idempotency.IdempotencyKeyInProgress):
+            idempotency.begin(db_session, "runs", "retry-4", {"a": 1})
+
+        idempotency.complete(db_session, "runs", "retry-4", 7)
+        assert idempotency.begin(db_session, "runs", "retry-4", {"a": 1}) == 7
+        # Keys are scoped per endpoint
+        assert idempotency.begin(db_session, "applications", "retry-4", {"a": 1}) is None
+
+    def test_unfinished_key_is_taken_over_after_lease(self, db_session):
+        assert idempotency.begin(db_session, "runs", "retry-5", {"a": 1}) is None
+        record = db_session.query(IdempotencyKey).filter(IdempotencyKey.key == "retry-5").one()
+        record.lease_expires_at = idempotency._utcnow() - timedelta(seconds=1)
+        db_session.commit()
+
+        # The first request died: one retry takes the key over, and holds it under a new lease
+        assert idempotency.begin(db_session, "runs", "retry-5", {"a": 1}) is None
+        with pytest.raises(idempotency.IdempotencyKeyInProgress):
+            idempotency.begin(db_session, "runs", "retry-5", {"a": 1})
+        with pytest.raises(idempotency.IdempotencyKeyMismatch):
+            idempotency.begin(db_session, "runs", "retry-5", {"a": 2})
+
+    @pytest.mark.parametrize("timeout_ms, key, expected_ms", [
+        (None, "deadline-1", 30000),  # No configured budget: a key still gets a finite one
+        (90000, "deadline-2", 30000),
+        (5000, "deadline-3", 5000),
+        (None, None, None),
+    ])
+    def test_run_with_key_has_finite_budget_within_lease(
+        self, client, db_session, standard_pipeline, scenario_applications, monkeypatch, timeout_ms, key, expected_ms
+    ):
+        monkeypatch.setattr(idempotency.settings, "run_timeout_ms", None)
+        monkeypatch.setattr(idempotency.settings, "idempotency_run_timeout_ms", 30000)
+        deadlines = []
+        run_to_row = CompiledPipeline.run_to_row
+
+        def capture(self, application_id, app_data, context=None):
+            deadlines.append(context.deadline)
+            return run_to_row(self, application_id, app_data, context)
+
+        monkeypatch.setattr(CompiledPipeline, "run_to_row", capture)
+        body = {"application_id": scenario_applications[0].id, "pipeline_id": standard_pipeline.id, "timeout_ms": timeout_ms}
+        started = idempotency._utcnow()
+        response = client.post("/api/runs", json=body, headers={"Idempotency-Key": key} if key else {})
+
+        assert response.status_code == 201
+        assert deadlines[0].timeout_ms == expected_ms
+        if key:
+            record = db_session.query(IdempotencyKey).filter(IdempotencyKey.key == key).one()
+            assert record.lease_expires_at > started + timedelta(milliseconds=expected_ms)
+
+    def test_failed_application_insert_releases_key(self, client, db_session, monkeypatch):
+        commit = db_session.commit
+
+        def failing_commit():
+            if any(isinstance(obj, LoanApplication) for obj in db_session.new):
+                raise RuntimeError("disk I/O error")
+            commit()
+
+        headers = {"Idempotency-Key": "create-2"}
+        monkeypatch.setattr(db_session, "commit", failing_commit)
+        assert client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers).status_code == 500
+        monkeypatch.setattr(db_session, "commit", commit)
+        assert client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers).status_code == 201
+
+    def test_application_retry(self, client):
+        headers = {"Idempotency-Key": "create-1"}
+        first = client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers)
+        retry = client.post("/api/applications", json=SCENARIO_APPLICATIONS[0], headers=headers)
+
+        assert (first.status_code, retry.status_code) == (201, 200)
+        assert retry.json()["id"] == first.json()["id"]
+        assert len(client.get("/api/applications").json()) == 1
+
+
+class TestRunReuse:
+    """Test returning the latest run when nothing that affects it changed"""
+
+    def test_reuses_unchanged_run(self, client, db_session, standard_pipeline, scenario_applications):
+        body = {"application_id": scenario_applications[0].id, "pipeline_id": standard_pipeline.id, "reuse": True}
+        first = client.post("/api/runs", json=body)
+        second = client.post("/api/runs", json=body)
+
+        assert first.status_code == 201
+        assert first.json()["reused"] is False
+        assert second.status_code == 200
+        assert second.json()["reused"] is True
+        assert second.json()["id"] == first.json()["id"]
+        assert db_session.query(PipelineRun).count() == 1
+
+    def test_pipeline_update_invalidates(self, client, db_session, standard_pipeline, scenario_applications):
+        body = {"application_id": scenario_applications[0].id, "pipeline_id": standard_pipeline.id, "reuse": True}
+        first = client.post("/api/runs", json=body)
+        assert first.json()["pipeline_version"] == 1
+
+        response = client.put(f"/api/pipelines/{standard_pipeline.id}", json={"short_circuit": True})
+        assert response.json()["version"] == 2
+        second = client.post("/api/runs", json=body)
+        assert second.status_code == 201
+        assert second.json()["pipeline_version"] == 2
+
+        # Renaming does not change outcomes
+        client.put(f"/api/pipelines/{standard_pipeline.id}", json={"name": "Renamed"})
+        assert client.post("/api/runs", json=body).json()["reused"] is True
+
+    def test_application_and_policy_changes_invalidate(self, db_session, standard_pipeline, scenario_applications, monkeypatch):
+        executor = PipelineExecutor(db_session)
+        application = scenario_applications[0]
+        executor.execute(application.id, standard_pipeline.id)
+        assert executor.find_reusable_run(application.id, standard_pipeline.id) is not None
+
+        application.amount += 1
+        db_session.commit()
+        assert executor.find_reusable_run(application.id, standard_pipeline.id) is None
+
+        executor.execute(application.id, standard_pipeline.id)
+        assert executor.find_reusable_run(application.id, standard_pipeline.id) is not None
+
+        snapshot = reference_data.snapshot
+        monkeypatch.setattr(reference_data, "_snapshot", CountryPolicySnapshot(snapshot.version + 1, snapshot.caps))
+        assert executor.find_reusable_run(application.id, standard_pipeline.id) is None
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+import pytest
+from pydantic import ValidationError
+from app.services import PipelineExecutor, offline_scoring
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+DEFINITION = {"name": "Standard Pipeline", "steps": STANDARD_STEPS, "terminal_rules": STANDARD_RULES}
+
+
+def score(text, spec=None, **kwargs):
+    output = io.StringIO()
+    summary = offline_scoring.score_stream(
+        io.StringIO(text), output, spec or offline_scoring.definition_spec(DEFINITION), **kwargs
+    )
+    return summary, output.getvalue()
+
+
+def ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+class TestOfflineScoring:
+    """Test scoring application files without the API"""
+
+    def test_matches_api_decisions(self, db_session, standard_pipeline, scenario_applications):
+        executor = PipelineExecutor(db_session)
+        expected = [executor.execute(app.id, standard_pipeline.id) for app in scenario_applications]
+
+        summary, output = score(ndjson(SCENARIO_APPLICATIONS), offline_scoring.pipeline_spec(standard_pipeline))
+        rows = [json.loads(line) for line in output.splitlines()]
+        assert [row["final_status"] for row in rows] == [run.final_status for run in expected]
+        logs = {log["step_type"]: log["computed_values"] for log in json.loads(expected[0].step_logs)}
+        assert rows[0]["risk_scoring_risk"] == logs["risk_scoring"]["risk"]
+        assert rows[0]["application_id"] == 1  # Line number without an id field
+        assert summary.processed == 3
+        assert summary.status_counts == {"APPROVED": 1, "REJECTED": 1, "NEEDS_REVIEW": 1}
+
+    def test_invalid_rows_are_reported_in_place(self):
+        records = ndjson([{**SCENARIO_APPLICATIONS[0], "id": "A-1"}]) + "not json\n" + ndjson([
+            {**SCENARIO_APPLICATIONS[1], "application_id": 42, "amount": -5}
+        ])
+        summary, output = score(records)
+
+        rows = [json.loads(line) for line in output.splitlines()]
+        assert [(row["application_id"], row["final_status"]) for row in rows] == [
+            ("A-1", "APPROVED"), (2, None), (42, None)
+        ]
+        assert rows[1]["error"].startswith("invalid JSON")
+        assert rows[2]["error"] == "amount: Input should be greater than 0"
+        assert summary.processed == 1
+        assert summary.invalid == 2
+
+    def test_csv_in_and_out(self):
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=list(SCENARIO_APPLICATIONS[0]))
+        writer.writeheader()
+        writer.writerows(SCENARIO_APPLICATIONS)
+        _, output = score(text.getvalue(), input_format="csv", output_format="csv")
+
+        rows = list(csv.DictReader(io.StringIO(output)))
+        assert [row["final_status"] for row in rows] == ["APPROVED", "REJECTED", "NEEDS_REVIEW"]
+        assert rows[0]["dti_rule_dti"] == "0.125"
+        assert list(rows[0])[:3] == ["application_id", "final_status", "error"]
+
+    def test_process_pool_keeps_input_order(self):
+        records = [SCENARIO_APPLICATIONS[i % 3] for i in range(30)]
+        summary, output = score(ndjson(records), chunk_size=4, workers=2)
+
+        rows = [json.loads(line) for line in output.splitlines()]
+        assert [row["application_id"] for row in rows] == list(range(1, 31))
+        assert [row["final_status"] for row in rows[:3]] == ["APPROVED", "REJECTED", "NEEDS_REVIEW"]
+        assert summary.processed == 30
+
+    def test_invalid_definition(self):
+        with pytest.raises(ValidationError):
+            offline_scoring.definition_spec({"name": "Empty", "steps": [], "terminal_rules": STANDARD_RULES})
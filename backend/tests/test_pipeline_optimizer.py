@@ -0,0 +1,109 @@
+import random
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.main import app
+from app.services import CompiledPipeline
+from app.services.pipeline_optimizer import optimize_pipeline
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+SENTIMENT_FIRST_STEPS = [
+    {"step_type": "sentiment_check", "order": 1, "params": {}},
+    {"step_type": "risk_scoring", "order": 2, "params": {}},
+    {"step_type": "dti_rule", "order": 3, "params": {}},
+    {"step_type": "amount_policy", "order": 4, "params": {}},
+]
+
+
+class TestOptimizer:
+    """Test save-time pipeline analysis"""
+
+    def test_standard_pipeline_is_clean(self):
+        plan = optimize_pipeline(STANDARD_STEPS, STANDARD_RULES)
+        assert plan["warnings"] == []
+        assert plan["step_order"] == ["dti_rule", "amount_policy", "risk_scoring"]
+
+    def test_cheap_rejecting_steps_first(self):
+        rules = STANDARD_RULES[:2] + [
+            {"condition": "sentiment_check.failed", "outcome": "NEEDS_REVIEW", "order": 3},
+            {"condition": "else", "outcome": "APPROVED", "order": 4},
+        ]
+        plan = optimize_pipeline(SENTIMENT_FIRST_STEPS, rules)
+        # risk_scoring is as cheap but never rejects on its own; the LLM step goes last
+        assert plan["step_order"] == ["dti_rule", "amount_policy", "risk_scoring", "sentiment_check"]
+
+    def test_warnings(self):
+        rules = [
+            {"condition": "bogus", "outcome": "REJECTED", "order": 1},
+            {"condition": "credit_check.failed", "outcome": "REJECTED", "order": 2},
+            {"condition": "1 < 2", "outcome": "APPROVED", "order": 3},
+            {"condition": "dti_rule.failed", "outcome": "REJECTED", "order": 4},
+            {"condition": "else", "outcome": "NEEDS_REVIEW", "order": 5},
+        ]
+        plan = optimize_pipeline(SENTIMENT_FIRST_STEPS, rules)
+
+        assert plan["unreachable_rules"] == [4, 5]
+        assert plan["unreferenced_steps"] == ["sentiment_check", "risk_scoring", "dti_rule", "amount_policy"]
+        assert plan["warnings"][:3] == [
+            "Rule 1 (bogus) never matches",
+            "Rule 2 (credit_check.failed) references credit_check, which is not in the pipeline",
+            "Rule 3 (1 < 2) is always true",
+        ]
+
+
+class TestShortCircuit:
+    """Test skipping steps once the outcome is decided"""
+
+    def test_rejection_skips_remaining_steps(self):
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES, short_circuit=True)
+        final_status, step_logs, _ = compiled.run(SCENARIO_APPLICATIONS[1])  # Luis fails DTI
+
+        assert final_status == "REJECTED"
+        assert [(log.step_type, log.skipped) for log in step_logs] == [
+            ("dti_rule", False), ("amount_policy", True), ("risk_scoring", True)
+        ]
+
+    def test_unreferenced_steps_never_run(self):
+        plan = optimize_pipeline(SENTIMENT_FIRST_STEPS, STANDARD_RULES)
+        compiled = CompiledPipeline(1, SENTIMENT_FIRST_STEPS, STANDARD_RULES, plan["step_order"], short_circuit=True)
+        _, step_logs, _ = compiled.run(SCENARIO_APPLICATIONS[0])
+
+        assert [log.step_type for log in step_logs] == [s["step_type"] for s in SENTIMENT_FIRST_STEPS]
+        assert {log.step_type for log in step_logs if log.skipped} == {"sentiment_check"}
+
+    def test_same_outcomes_as_full_runs(self):
+        rng = random.Random(7)
+        applications = [
+            {"applicant_name": "x", "amount": rng.randint(1000, 60000), "monthly_income": rng.randint(0, 8000),
+             "declared_debts": rng.randint(0, 3000), "country": rng.choice(["ES", "FR", "DE", "OTHER"]),
+             "loan_purpose": rng.choice(["home", "casino trip", ""])}
+            for _ in range(300)
+        ]
+        rules = [
+            {"condition": "amount_policy.failed AND sentiment_check.failed", "outcome": "REJECTED", "order": 1},
+            {"condition": "dti_rule.passed AND risk_scoring.risk <= 45", "outcome": "APPROVED", "order": 2},
+            {"condition": "risk_scoring.risk > 80 OR sentiment_check.failed", "outcome": "REJECTED", "order": 3},
+        ]
+        plan = optimize_pipeline(SENTIMENT_FIRST_STEPS, rules)
+        full = CompiledPipeline(1, SENTIMENT_FIRST_STEPS, rules)
+        fast = CompiledPipeline(1, SENTIMENT_FIRST_STEPS, rules, plan["step_order"], short_circuit=True)
+
+        for application in applications:
+            assert fast.run(application)[0] == full.run(application)[0]
+
+
+def test_pipeline_response_includes_plan(db_session, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+    response = TestClient(app).post("/api/pipelines", json={
+        "name": "Unordered",
+        "steps": SENTIMENT_FIRST_STEPS,
+        "terminal_rules": STANDARD_RULES,
+        "short_circuit": True,
+    })
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["short_circuit"] is True
+    assert data["execution_plan"]["step_order"][-1] == "sentiment_check"
+    assert data["warnings"] == [
+        "Step sentiment_check is not referenced by any terminal rule and cannot affect the outcome"
+    ]
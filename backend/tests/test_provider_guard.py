@@ -0,0 +1,129 @@
+import logging
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.sentiment import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    ProviderGuard,
+    ProviderUnavailableError,
+    TokenBucket
+)
+from app.steps import sentiment_check
+from app.steps.sentiment_check import SentimentCheck
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def failing(status_code):
+    def call():
+        raise StatusError(status_code)
+    return call
+
+
+def make_guard(**overrides):
+    options = dict(
+        rate_per_second=1000, burst=100, max_concurrency=4, latency_target=1.0, max_retries=2,
+        backoff_base=0.001, backoff_max=0.002, failure_threshold=3, reset_timeout=0.05
+    )
+    options.update(overrides)
+    return ProviderGuard(**options)
+
+
+class TestGuardPrimitives:
+    """Test the token bucket, AIMD limiter and circuit breaker"""
+
+    def test_token_bucket_times_out_when_empty(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        assert bucket.acquire(timeout=0) is True
+        assert bucket.acquire(timeout=0.01) is False
+
+    def test_aimd_limit(self):
+        """Throttling halves the limit, successes grow it back additively"""
+        limiter = AdaptiveConcurrencyLimiter(initial=8, maximum=8, latency_target=1.0)
+        assert limiter.acquire(0)
+        limiter.release(latency=0.1, throttled=True)
+        assert limiter.limit == 4
+        assert limiter.acquire(0)
+        limiter.release(latency=0.1, throttled=False)
+        assert limiter.limit == 4.25
+
+    def test_breaker_opens_and_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.allow_request() is False
+
+        time.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False  # Only one probe at a time
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestProviderGuard:
+    """Test retries and short-circuiting in ProviderGuard.call"""
+
+    def test_retries_throttled_calls(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise StatusError(429)
+            return "ok"
+
+        guard = make_guard()
+        assert guard.call(flaky) == "ok"
+        assert guard.stats["retries"] == 2
+        assert guard.stats["throttled"] == 2
+
+    def test_client_errors_are_not_retried(self):
+        guard = make_guard()
+        with pytest.raises(StatusError):
+            guard.call(failing(400))
+        assert guard.stats["calls"] == 1
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+
+    def test_open_breaker_short_circuits(self):
+        guard = make_guard(max_retries=0, failure_threshold=1)
+        with pytest.raises(StatusError):
+            guard.call(failing(503))
+        with pytest.raises(ProviderUnavailableError):
+            guard.call(lambda: "never called")
+        assert guard.state()["circuit_state"] == CircuitBreaker.OPEN
+        assert guard.stats["short_circuited"] == 1
+
+
+class TestSentimentCheckWithGuard:
+    """Test SentimentCheck against an unhealthy provider"""
+
+    def test_outage_trips_breaker_and_skips_provider(self, fake_llm, monkeypatch, caplog):
+        fake_llm.status_code = 503
+        monkeypatch.setattr(sentiment_check, "openai_guard", make_guard(max_retries=0, failure_threshold=2))
+        caplog.set_level(logging.DEBUG, logger=sentiment_check.__name__)
+
+        for purpose in ["car", "boat", "bike", "house"]:
+            result = SentimentCheck().execute({"loan_purpose": purpose}, {})
+            assert result.computed_values["analysis_method"] == "keyword_matching"
+
+        # Two failures opened the breaker; later runs never reached the provider
+        assert fake_llm.requests == 2
+        assert sentiment_check.openai_guard.is_open()
+        # Each provider error is one warning; skipping the open provider logs nothing above debug
+        levels = [record.levelno for record in caplog.records if record.name == sentiment_check.__name__]
+        assert [level for level in levels if level > logging.DEBUG] == [logging.WARNING, logging.WARNING]
+
+
+def test_llm_metrics_endpoint():
+    """Guard state is exposed through the metrics API"""
+    response = TestClient(app).get("/api/metrics/llm")
+    assert response.status_code == 200
+    assert response.json()["circuit_state"] in ("CLOSED", "OPEN", "HALF_OPEN")
@@ -0,0 +1,140 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import reference_data as reference_data_module
+from app.database import get_db
+from app.db_models import CountryPolicy
+from app.main import app
+from app.reference_data import DEFAULT_COUNTRY_CAPS, CountryPolicySnapshot, ReferenceData, reference_data
+from app.services import CompiledPipeline, PipelineExecutor
+from app.steps.context import RunContext
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+
+@pytest.fixture(autouse=True)
+def restore_snapshot(monkeypatch):
+    """Keep snapshot swaps from leaking into other tests"""
+    monkeypatch.setattr(reference_data, "_snapshot", reference_data.snapshot)
+
+
+class TestReferenceData:
+    """Test versioned country policy snapshots"""
+
+    def test_first_load_writes_defaults(self, db_session):
+        holder = ReferenceData()
+        snapshot = holder.load(db_session)
+
+        assert snapshot.version == 1
+        assert dict(snapshot.caps) == DEFAULT_COUNTRY_CAPS
+        assert holder.load(db_session).version == 1
+
+    def test_publish_creates_new_version(self, db_session):
+        holder = ReferenceData()
+        holder.load(db_session)
+        first = holder.snapshot
+
+        second = holder.publish(db_session, {**DEFAULT_COUNTRY_CAPS, "ES": 40000})
+
+        assert (second.version, second.caps["ES"]) == (2, 40000)
+        assert holder.snapshot is second
+        assert first.caps["ES"] == 30000  # earlier snapshots are immutable
+        with pytest.raises(TypeError):
+            second.caps["ES"] = 1
+
+    def test_publish_retries_version_taken_elsewhere(self, db_session, monkeypatch):
+        holder = ReferenceData()
+        holder.load(db_session)
+        # Another process publishes version 2 after this one read the latest version
+        latest_version = reference_data_module.latest_version
+        reads = []
+
+        def racing_latest_version(db):
+            reads.append(latest_version(db))
+            if len(reads) == 1:
+                db.add(CountryPolicy(version=2, country="OTHER", cap=1000))
+                db.commit()
+            return reads[-1]
+
+        monkeypatch.setattr(reference_data_module, "latest_version", racing_latest_version)
+        snapshot = holder.publish(db_session, {**DEFAULT_COUNTRY_CAPS, "ES": 40000})
+
+        assert reads == [1, 2]
+        assert (snapshot.version, snapshot.caps["ES"]) == (3, 40000)
+        assert holder.snapshot is snapshot
+
+    def test_refresh_picks_up_other_publishers(self, db_session, monkeypatch):
+        holder = ReferenceData()
+        holder.load(db_session)
+        ReferenceData().publish(db_session, {**DEFAULT_COUNTRY_CAPS, "ES": 40000})
+
+        monkeypatch.setattr(reference_data_module.settings, "reference_data_refresh_seconds", 3600)
+        assert holder.refresh_if_due(db_session).version == 2
+        ReferenceData().publish(db_session, {**DEFAULT_COUNTRY_CAPS, "ES": 45000})
+        # Checked moments ago: not due yet
+        assert holder.refresh_if_due(db_session).version == 2
+        assert holder.refresh(db_session).caps["ES"] == 45000
+
+    def test_swap_keeps_newest(self):
+        holder = ReferenceData()
+        newer = CountryPolicySnapshot(5, DEFAULT_COUNTRY_CAPS)
+        holder.swap(newer)
+        holder.swap(CountryPolicySnapshot(3, DEFAULT_COUNTRY_CAPS))
+        assert holder.snapshot is newer
+
+    def test_other_cap_required(self):
+        with pytest.raises(ValueError):
+            CountryPolicySnapshot(1, {"ES": 1000})
+
+
+class TestPolicyInRuns:
+    """Test that runs use and record the pinned snapshot"""
+
+    def test_run_uses_pinned_snapshot(self):
+        compiled = CompiledPipeline(1, STANDARD_STEPS, STANDARD_RULES)
+        strict = CountryPolicySnapshot(7, {"ES": 10000, "OTHER": 10000})
+
+        row = compiled.run_to_row(1, SCENARIO_APPLICATIONS[0], RunContext(reference=strict))
+
+        assert row["reference_version"] == 7
+        assert row["final_status"] == "REJECTED"  # Ana's 12000 is over the 10000 cap
+
+    def test_executed_run_references_version(self, db_session, standard_pipeline, scenario_applications):
+        reference_data.load(db_session)
+        run = PipelineExecutor(db_session).execute(scenario_applications[0].id, standard_pipeline.id)
+        assert run.reference_version == reference_data.snapshot.version
+        assert "country_caps" not in run.step_logs
+
+    def test_run_picks_up_version_published_elsewhere(
+        self, db_session, standard_pipeline, scenario_applications, monkeypatch
+    ):
+        reference_data.load(db_session)
+        ReferenceData().publish(db_session, {**DEFAULT_COUNTRY_CAPS, "ES": 10000})
+        monkeypatch.setattr(reference_data_module.settings, "reference_data_refresh_seconds", 0)
+
+        run = PipelineExecutor(db_session).execute(scenario_applications[0].id, standard_pipeline.id)
+
+        assert run.reference_version == reference_data.snapshot.version == 2
+        assert run.final_status == "REJECTED"  # Ana's 12000 is over the new ES cap
+
+
+class TestCountryPolicyAPI:
+    """Test the country policy endpoints"""
+
+    @pytest.fixture
+    def client(self, db_session, monkeypatch):
+        monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+        return TestClient(app)
+
+    def test_publish_and_read_versions(self, client):
+        response = client.post("/api/reference-data/country-policies", json={"caps": {"ES": 50000, "OTHER": 15000}})
+        assert response.status_code == 201
+        version = response.json()["version"]
+
+        assert client.get("/api/reference-data/country-policies").json() == {
+            "version": version, "caps": {"ES": 50000, "OTHER": 15000}
+        }
+        assert client.get(f"/api/reference-data/country-policies/{version}").json()["caps"]["ES"] == 50000
+        assert client.get("/api/reference-data/country-policies/999").status_code == 404
+
+    def test_other_cap_required(self, client):
+        response = client.post("/api/reference-data/country-policies", json={"caps": {"ES": 50000}})
+        assert response.status_code == 422
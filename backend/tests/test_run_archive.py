@@ -0,0 +1,134 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.db_models import LoanApplication, Pipeline, PipelineRun, RunArchiveSegment, RunSummary, ShadowRun
+from app.main import app
+from app.services import PipelineExecutor, run_archive
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES, STANDARD_STEPS
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    path = str(tmp_path / "archive")
+    monkeypatch.setattr(run_archive.settings, "archive_dir", path)
+    return path
+
+
+@pytest.fixture
+def runs(db_session, standard_pipeline, scenario_applications):
+    """One run per scenario application, the first two executed in earlier months"""
+    executor = PipelineExecutor(db_session)
+    runs = [executor.execute(app.id, standard_pipeline.id) for app in scenario_applications]
+    runs[0].executed_at = datetime(2024, 1, 15, 10, 30)
+    runs[1].executed_at = datetime(2024, 2, 3, 8, 0, 0, 123456)
+    db_session.commit()
+    return [
+        {column: getattr(run, column) for column in run_archive.COLUMNS}
+        for run in runs
+    ]
+
+
+class TestRunArchive:
+    """Test moving old runs to the columnar archive and reading them back"""
+
+    def test_archive_moves_old_runs(self, db_session, archive_dir, runs):
+        archived = run_archive.archive_runs(db_session, datetime(2024, 6, 1), batch_size=1)
+
+        assert archived == {"2024-01": 1, "2024-02": 1}
+        assert [run.id for run in db_session.query(PipelineRun)] == [runs[2]["id"]]
+        assert [s.path for s in db_session.query(RunArchiveSegment).order_by(RunArchiveSegment.id)] == [
+            "runs-2024-01.seg", "runs-2024-02.seg"
+        ]
+        # Nothing left to archive
+        assert run_archive.archive_runs(db_session, datetime(2024, 6, 1)) == {}
+
+    def test_round_trip(self, db_session, archive_dir, runs):
+        run_archive.archive_runs(db_session, datetime(2024, 6, 1))
+
+        for original in runs[:2]:
+            restored = run_archive.load_run(db_session, original["id"])
+            assert {column: getattr(restored, column) for column in run_archive.COLUMNS} == original
+        assert run_archive.load_run(db_session, runs[2]["id"]) is None
+        assert sorted(run_archive.find_runs(db_session, [r["id"] for r in runs])) == [runs[0]["id"], runs[1]["id"]]
+        assert [run.id for run in run_archive.iter_runs(db_session, month="2024-02")] == [runs[1]["id"]]
+
+    def test_nulls_and_segments(self):
+        rows = [
+            {"id": 1, "application_id": 1, "pipeline_id": 1, "final_status": "APPROVED", "reference_version": None,
+             "pipeline_version": None, "input_hash": None, "executed_at": datetime(2024, 1, 1),
+             "step_logs": "[]", "terminal_rule_logs": "[]"},
+            {"id": 2, "application_id": 2, "pipeline_id": 1, "final_status": "REJECTED", "reference_version": 3,
+             "pipeline_version": 2, "input_hash": "abc", "executed_at": datetime(2024, 1, 1) + timedelta(seconds=1),
+             "step_logs": "[{\"é\": 1}]", "terminal_rule_logs": "[]"},
+        ]
+        segment = run_archive.Segment(run_archive.encode_segment(rows))
+
+        assert [segment.position(2), segment.position(3)] == [1, None]
+        assert [{c: getattr(segment.run(i), c) for c in run_archive.COLUMNS} for i in range(2)] == rows
+
+    def test_unreferenced_tail_is_ignored(self, db_session, archive_dir, runs):
+        # A crash after appending but before committing leaves bytes no index row points to
+        run_archive._append(archive_dir, "2024-01", [runs[0]])
+        run_archive.archive_runs(db_session, datetime(2024, 2, 1))
+
+        assert db_session.query(RunArchiveSegment).one().offset > 0
+        assert run_archive.load_run(db_session, runs[0]["id"]).final_status == runs[0]["final_status"]
+
+
+class TestArchivedRunsAPI:
+    """Test that run reads fall back to the archive"""
+
+    def test_get_archived_run(self, db_session, archive_dir, runs, monkeypatch):
+        monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+        client = TestClient(app)
+        hot = client.get(f"/api/runs/{runs[0]['id']}").json()
+
+        run_archive.archive_runs(db_session, datetime(2024, 6, 1))
+        archived = client.get(f"/api/runs/{runs[0]['id']}")
+        assert archived.status_code == 200
+        assert archived.json() == hot
+        assert client.get("/api/runs/999").status_code == 404
+
+
+class TestArchiveWithForeignKeys:
+    """Test archiving where the database enforces foreign keys"""
+
+    @pytest.fixture
+    def fk_session(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'fk.db'}")
+        event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(autoflush=False, bind=engine)()
+        yield session
+        session.close()
+        engine.dispose()
+
+    def test_dependent_rows_survive_archival(self, fk_session, archive_dir, monkeypatch):
+        pipeline = Pipeline(name="Standard", steps_config=json.dumps(STANDARD_STEPS), terminal_rules=json.dumps(STANDARD_RULES))
+        application = LoanApplication(**SCENARIO_APPLICATIONS[0], status="PENDING")
+        fk_session.add_all([pipeline, application])
+        fk_session.commit()
+        run = PipelineExecutor(fk_session).execute(application.id, pipeline.id)
+        run.executed_at = datetime(2024, 1, 15)
+        fk_session.add(ShadowRun(
+            primary_run_id=run.id, application_id=application.id, primary_pipeline_id=pipeline.id,
+            shadow_pipeline_id=pipeline.id, step_logs="[]", primary_status=run.final_status,
+            final_status=run.final_status, agreed=True
+        ))
+        fk_session.commit()
+        run_id = run.id
+
+        assert run_archive.archive_runs(fk_session, datetime(2024, 6, 1)) == {"2024-01": 1}
+        assert fk_session.query(PipelineRun).count() == 0
+        assert fk_session.get(RunSummary, run_id).archived is True
+        assert fk_session.query(ShadowRun).one().primary_run_id == run_id
+
+        monkeypatch.setitem(app.dependency_overrides, get_db, lambda: fk_session)
+        client = TestClient(app)
+        assert client.get("/api/run-summaries").json() == []
+        listed = client.get("/api/run-summaries", params={"include_archived": True}).json()
+        assert [(summary["run_id"], summary["archived"]) for summary in listed] == [(run_id, True)]
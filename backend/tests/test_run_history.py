@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.dialects import sqlite
+from app.database import get_db
+from app.db_models import PipelineRun
+from app.main import app, include_routers
+from app.services import PipelineExecutor, run_history
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+    return TestClient(app)
+
+
+@pytest.fixture
+def runs(db_session, standard_pipeline, scenario_applications):
+    """Ana run twice, Luis and Mia once each, on the standard pipeline"""
+    executor = PipelineExecutor(db_session)
+    ana, luis, mia = scenario_applications
+    return [executor.execute(app.id, standard_pipeline.id) for app in (ana, luis, ana, mia)]
+
+
+def query_plan(db_session, statement) -> str:
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return " ".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+class TestRunHistory:
+    """Test per-application and per-pipeline run lookups"""
+
+    def test_application_runs_newest_first(self, db_session, runs):
+        ana_runs = run_history.application_runs(db_session, runs[0].application_id)
+        assert [run.id for run in ana_runs] == [runs[2].id, runs[0].id]
+        assert run_history.application_runs(db_session, runs[0].application_id, skip=1) == [runs[0]]
+
+    def test_latest_runs(self, db_session, standard_pipeline, runs):
+        assert [run.id for run in run_history.latest_runs(db_session)] == [runs[2].id, runs[1].id, runs[3].id]
+        assert run_history.latest_runs(db_session, application_ids=[runs[1].application_id]) == [runs[1]]
+        assert run_history.latest_runs(db_session, pipeline_id=standard_pipeline.id + 1) == []
+
+    def test_latest_runs_pages(self, db_session, runs):
+        first = run_history.latest_runs(db_session, limit=2)
+        assert [run.id for run in first] == [runs[2].id, runs[1].id]
+        rest = run_history.latest_runs(db_session, limit=2, after_application_id=first[-1].application_id)
+        assert [run.id for run in rest] == [runs[3].id]
+
+    def test_lookups_use_indexes(self, db_session):
+        application_plan = query_plan(db_session, run_history._newest_first(
+            select(PipelineRun).where(PipelineRun.application_id == 1)
+        ))
+        pipeline_plan = query_plan(db_session, run_history._newest_first(
+            select(PipelineRun).where(PipelineRun.pipeline_id == 1)
+        ))
+        assert "ix_pipeline_runs_application_executed" in application_plan
+        assert "ix_pipeline_runs_pipeline_executed" in pipeline_plan
+        assert "TEMP B-TREE FOR ORDER BY" not in application_plan + pipeline_plan
+
+
+class TestRunHistoryAPI:
+    """Test the run history endpoints"""
+
+    def test_application_and_pipeline_runs(self, client, standard_pipeline, runs):
+        ana_runs = client.get(f"/api/applications/{runs[0].application_id}/runs").json()
+        assert [run["id"] for run in ana_runs] == [runs[2].id, runs[0].id]
+        pipeline_runs = client.get(f"/api/pipelines/{standard_pipeline.id}/runs", params={"limit": 2}).json()
+        assert [run["id"] for run in pipeline_runs] == [runs[3].id, runs[2].id]
+
+        assert client.get("/api/applications/999/runs").status_code == 404
+        assert client.get("/api/pipelines/999/runs").status_code == 404
+
+    def test_latest(self, client, runs):
+        latest = client.get("/api/runs/latest").json()
+        assert [run["id"] for run in latest] == [runs[2].id, runs[1].id, runs[3].id]
+        some = client.get("/api/runs/latest", params={"application_id": [runs[1].application_id, runs[3].application_id]})
+        assert [run["id"] for run in some.json()] == [runs[1].id, runs[3].id]
+
+        page = client.get("/api/runs/latest", params={"limit": 1, "after_application_id": runs[2].application_id})
+        assert [run["id"] for run in page.json()] == [runs[1].id]
+        assert client.get("/api/runs/latest", params={"limit": 5000}).status_code == 422
+
+    def test_latest_with_async_routes(self, db_session, runs):
+        async_app = FastAPI()
+        include_routers(async_app, async_db=True)
+        async_app.dependency_overrides[get_db] = lambda: db_session
+
+        response = TestClient(async_app).get("/api/runs/latest")
+        assert response.status_code == 200
+        assert len(response.json()) == 3
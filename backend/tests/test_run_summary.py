@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.db_models import PipelineRun, RunSummary
+from app.main import app
+from app.services import BatchExecutor, PipelineExecutor, run_summary
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+    return TestClient(app)
+
+
+class TestRunSummary:
+    """Test the denormalized run_summary read table"""
+
+    def test_written_with_run(self, db_session, standard_pipeline, scenario_applications):
+        ana = scenario_applications[0]
+        run = PipelineExecutor(db_session).execute(ana.id, standard_pipeline.id)
+
+        summary = db_session.get(RunSummary, run.id)
+        assert (summary.applicant_name, summary.country, summary.amount) == ("Ana", "ES", ana.amount)
+        assert summary.pipeline_name == standard_pipeline.name
+        assert summary.final_status == run.final_status == "APPROVED"
+        assert summary.dti == pytest.approx(ana.declared_debts / ana.monthly_income, abs=1e-4)
+        assert summary.risk is not None
+        assert summary.sentiment_risk is None
+
+    def test_batch_writes_summaries(self, db_session, standard_pipeline, scenario_applications):
+        BatchExecutor(db_session).execute_batch([app.id for app in scenario_applications], standard_pipeline.id)
+
+        summaries = db_session.query(RunSummary).order_by(RunSummary.run_id).all()
+        runs = db_session.query(PipelineRun).order_by(PipelineRun.id).all()
+        assert [s.run_id for s in summaries] == [r.id for r in runs]
+        assert [s.applicant_name for s in summaries] == ["Ana", "Luis", "Mia"]
+        assert [s.final_status for s in summaries] == [r.final_status for r in runs]
+
+    def test_backfill(self, db_session, standard_pipeline, scenario_applications):
+        executor = PipelineExecutor(db_session)
+        runs = [executor.execute(app.id, standard_pipeline.id) for app in scenario_applications]
+        db_session.query(RunSummary).delete()
+        db_session.commit()
+
+        assert run_summary.backfill(db_session, batch_size=2) == 3
+        assert run_summary.backfill(db_session) == 0
+        summary = db_session.get(RunSummary, runs[1].id)
+        assert (summary.applicant_name, summary.final_status) == ("Luis", "REJECTED")
+        assert summary.executed_at == runs[1].executed_at
+
+
+class TestRunSummaryAPI:
+    """Test GET /api/run-summaries"""
+
+    def test_list_and_filters(self, client, standard_pipeline, scenario_applications):
+        for application in scenario_applications:
+            client.post("/api/runs", json={"application_id": application.id, "pipeline_id": standard_pipeline.id})
+
+        rows = client.get("/api/run-summaries").json()
+        assert [row["applicant_name"] for row in rows] == ["Mia", "Luis", "Ana"]
+        assert "step_logs" not in rows[0]
+
+        rejected = client.get("/api/run-summaries", params={"status": "REJECTED"}).json()
+        assert [row["applicant_name"] for row in rejected] == ["Luis"]
+        older = client.get("/api/run-summaries", params={"before_id": rows[0]["run_id"], "limit": 1}).json()
+        assert [row["applicant_name"] for row in older] == ["Luis"]
+        assert client.get("/api/run-summaries", params={"pipeline_id": 999}).json() == []
+
+    def test_pipeline_rename(self, client, standard_pipeline, scenario_applications):
+        client.post("/api/runs", json={"application_id": scenario_applications[0].id, "pipeline_id": standard_pipeline.id})
+        client.put(f"/api/pipelines/{standard_pipeline.id}", json={"name": "Renamed"})
+
+        assert client.get("/api/run-summaries").json()[0]["pipeline_name"] == "Renamed"
@@ -0,0 +1,163 @@
+import threading
+import time
+import pytest
+from app.config import settings
+from app.sentiment import SentimentBatcher, SingleFlight
+from app.steps.sentiment_check import SentimentCheck
+
+
+def run_concurrently(purposes):
+    """Execute SentimentCheck for each purpose on its own thread"""
+    results = [None] * len(purposes)
+
+    def worker(i):
+        results[i] = SentimentCheck().execute({"loan_purpose": purposes[i]}, {})
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(purposes))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSentimentBatcher:
+    """Test the micro-batching layer"""
+
+    def test_concurrent_submissions_share_one_batch(self):
+        """Callers within the window are sent together and get their own result"""
+        batches = []
+
+        def send_batch(purposes, risky_terms, api_model, timeout):
+            batches.append(list(purposes))
+            return [purpose.upper() for purpose in purposes]
+
+        batcher = SentimentBatcher(send_batch, window_ms=100, max_items=4)
+        results = {}
+
+        def worker(purpose):
+            results[purpose] = batcher.submit(purpose, ["crypto"], "model")
+
+        threads = [threading.Thread(target=worker, args=(f"p{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {f"p{i}": f"P{i}" for i in range(4)}
+        assert len(batches) == 1
+        assert sorted(batches[0]) == ["p0", "p1", "p2", "p3"]
+
+    def test_batch_failure_reaches_every_caller(self):
+        """An error sending the batch is raised in each waiting caller"""
+        def send_batch(purposes, risky_terms, api_model, timeout):
+            raise RuntimeError("provider down")
+
+        batcher = SentimentBatcher(send_batch, window_ms=0)
+        with pytest.raises(RuntimeError):
+            batcher.submit("car", [], "model")
+
+    def test_batch_call_bounded_by_tightest_deadline(self):
+        """The batch is sent with the smallest remaining timeout of its callers"""
+        timeouts = []
+
+        def send_batch(purposes, risky_terms, api_model, timeout):
+            timeouts.append(timeout)
+            return purposes
+
+        batcher = SentimentBatcher(send_batch, window_ms=100, max_items=3)
+        threads = [
+            threading.Thread(target=batcher.submit, args=(f"p{i}", [], "model"), kwargs={"timeout": timeout})
+            for i, timeout in enumerate([None, 5.0, 0.5])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(timeouts) == 1
+        assert 0 < timeouts[0] <= 0.5
+
+    def test_batch_without_deadlines_has_no_timeout(self):
+        """Callers without a timeout leave the batch call unbounded"""
+        timeouts = []
+
+        def send_batch(purposes, risky_terms, api_model, timeout):
+            timeouts.append(timeout)
+            return purposes
+
+        SentimentBatcher(send_batch, window_ms=0).submit("car", [], "model")
+
+        assert timeouts == [None]
+
+
+class TestSentimentCheckOpenAI:
+    """Test SentimentCheck against the fake LLM endpoint"""
+
+    def test_single_request(self, fake_llm):
+        """Without batching each purpose is one request"""
+        result = SentimentCheck().execute({"loan_purpose": "bitcoin trading"}, {})
+
+        assert result.computed_values["analysis_method"] == "openai_api"
+        assert result.computed_values["risk_score"] == 90
+        assert result.passed is False
+        assert fake_llm.requests == 1
+
+    def test_micro_batched_requests(self, fake_llm, monkeypatch):
+        """Concurrent purposes are analyzed with fewer requests and correct fan-out"""
+        monkeypatch.setattr(settings, "sentiment_batch_window_ms", 200)
+        purposes = ["home improvement", "casino weekend", "education", "crypto mining"] * 2
+
+        results = run_concurrently(purposes)
+
+        assert fake_llm.requests < len(purposes)
+        assert [r.computed_values["risk_score"] for r in results] == [10, 90, 10, 90] * 2
+        assert all(r.computed_values["analysis_method"] == "openai_api" for r in results)
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight requests"""
+
+    def test_identical_purposes_share_one_call(self, fake_llm):
+        """Concurrent identical purposes (after normalization) make one request"""
+        fake_llm.latency = 0.3
+        purposes = ["Crypto  mining", "crypto mining", " CRYPTO mining "] * 3
+
+        results = run_concurrently(purposes)
+
+        assert fake_llm.requests == 1
+        assert all(r.computed_values["risk_score"] == 90 for r in results)
+        # Each run keeps its own original text
+        assert [r.computed_values["loan_purpose"] for r in results] == purposes
+
+    def test_errors_are_shared_with_waiters(self):
+        """Waiters receive the owner's exception"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def slow_failure():
+            started.set()
+            release.wait()
+            raise RuntimeError("boom")
+
+        def call():
+            try:
+                flight.do("key", slow_failure)
+            except RuntimeError as e:
+                errors.append(e)
+
+        owner = threading.Thread(target=call)
+        owner.start()
+        started.wait()
+        waiter = threading.Thread(target=call)
+        waiter.start()
+        while flight.shared == 0:
+            time.sleep(0.001)
+        release.set()
+        owner.join()
+        waiter.join()
+
+        assert len(errors) == 2
+        assert flight.executed == 1
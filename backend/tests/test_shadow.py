@@ -0,0 +1,166 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.database import get_db
+from app.db_models import LoanApplication, Pipeline, ShadowRun
+from app.main import app
+from app.metrics import metrics
+from app.reference_data import reference_data
+from app.services import PipelineExecutor, shadow
+from app.services.pipeline_executor import CompiledPipeline, application_to_dict
+from app.services.shadow import ShadowJob, ShadowRunner, shadow_agreement, shadow_runner
+from tests.conftest import STANDARD_STEPS
+
+# Approves anything the DTI rule lets through: disagrees with the standard pipeline on Mia
+LENIENT_RULES = [
+    {"condition": "dti_rule.failed", "outcome": "REJECTED", "order": 1},
+    {"condition": "else", "outcome": "APPROVED", "order": 2},
+]
+
+
+@pytest.fixture
+def challenger(db_session):
+    pipeline = Pipeline(
+        name="Lenient",
+        steps_config=json.dumps(STANDARD_STEPS),
+        terminal_rules=json.dumps(LENIENT_RULES)
+    )
+    db_session.add(pipeline)
+    db_session.commit()
+    return pipeline
+
+
+def _runner(db_session, **kwargs):
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    kwargs.setdefault("under_load", lambda: False)
+    return ShadowRunner(factory, **kwargs)
+
+
+def _job(run, application, shadow_pipeline_id):
+    return ShadowJob(
+        run.id, application.id, application_to_dict(application),
+        run.pipeline_id, shadow_pipeline_id, run.final_status, reference_data.snapshot
+    )
+
+
+class TestShadowRunner:
+    """Test challenger runs in background workers"""
+
+    def test_shadow_runs_and_agreement(self, db_session, standard_pipeline, challenger, scenario_applications):
+        runner = _runner(db_session)
+        executor = PipelineExecutor(db_session)
+        try:
+            for application in scenario_applications:
+                run = executor.execute(application.id, standard_pipeline.id)
+                assert runner.submit(_job(run, application, challenger.id))
+            runner.wait_idle()
+        finally:
+            runner.stop()
+
+        shadow_runs = db_session.query(ShadowRun).order_by(ShadowRun.application_id).all()
+        assert [run.final_status for run in shadow_runs] == ["APPROVED", "REJECTED", "APPROVED"]
+        assert [run.agreed for run in shadow_runs] == [True, True, False]
+        # Shadow runs never touch application status
+        db_session.expire_all()
+        assert db_session.get(LoanApplication, scenario_applications[2].id).status == "NEEDS_REVIEW"
+
+        stats = shadow_agreement(db_session, standard_pipeline.id, challenger.id)
+        assert stats["runs"] == 3
+        assert stats["agreement_rate"] == 0.6667
+        assert stats["outcomes"]["NEEDS_REVIEW"] == {"APPROVED": 1}
+
+    @pytest.mark.parametrize("timeout_ms, expected_ms", [(250, 250), (None, 1500)])
+    def test_runs_under_challenger_deadline(
+        self, db_session, standard_pipeline, challenger, scenario_applications, monkeypatch, timeout_ms, expected_ms
+    ):
+        """Shadow runs use the challenger's timeout_ms, falling back to the global default"""
+        challenger.timeout_ms = timeout_ms
+        db_session.commit()
+        monkeypatch.setattr(shadow.settings, "run_timeout_ms", 1500)
+        deadlines = []
+        run_to_row = CompiledPipeline.run_to_row
+
+        def capture(self, application_id, app_data, context=None):
+            deadlines.append(context.deadline)
+            return run_to_row(self, application_id, app_data, context)
+
+        monkeypatch.setattr(CompiledPipeline, "run_to_row", capture)
+        run = PipelineExecutor(db_session).execute(scenario_applications[0].id, standard_pipeline.id)
+        runner = _runner(db_session)
+        try:
+            runner.submit(_job(run, scenario_applications[0], challenger.id))
+            runner.wait_idle()
+        finally:
+            runner.stop()
+
+        assert deadlines[-1].timeout_ms == expected_ms
+        assert db_session.query(ShadowRun).count() == 1
+
+    def test_sheds_under_load(self, db_session, standard_pipeline, challenger, scenario_applications):
+        runner = _runner(db_session, under_load=lambda: True)
+        run = PipelineExecutor(db_session).execute(scenario_applications[0].id, standard_pipeline.id)
+
+        before = runner.state()["shed"].get("under_load", 0)
+        assert not runner.submit(_job(run, scenario_applications[0], challenger.id))
+        assert runner.state()["shed"]["under_load"] == before + 1
+        assert runner.state()["workers"] == 0
+
+    def test_sheds_when_queue_full(self, db_session, standard_pipeline, challenger, scenario_applications, monkeypatch):
+        runner = _runner(db_session, queue_size=1)
+        monkeypatch.setattr(runner, "_ensure_workers", lambda: None)  # Nothing drains the queue
+        run = PipelineExecutor(db_session).execute(scenario_applications[0].id, standard_pipeline.id)
+        job = _job(run, scenario_applications[0], challenger.id)
+
+        assert runner.submit(job)
+        assert not runner.submit(job)
+
+    def test_sheds_stale_jobs(self, db_session, standard_pipeline, challenger, scenario_applications):
+        runner = _runner(db_session, max_queue_delay_ms=1)
+        run = PipelineExecutor(db_session).execute(scenario_applications[0].id, standard_pipeline.id)
+        job = _job(run, scenario_applications[0], challenger.id)
+        job.enqueued_at -= 1
+        try:
+            runner.submit(job)
+            runner.wait_idle()
+        finally:
+            runner.stop()
+        assert db_session.query(ShadowRun).count() == 0
+
+
+class TestShadowAPI:
+    """Test configuring shadows and shadowing API runs"""
+
+    @pytest.fixture
+    def client(self, db_session, monkeypatch):
+        monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+        monkeypatch.setattr(shadow_runner, "session_factory", factory)
+        monkeypatch.setattr(shadow_runner, "under_load", lambda: False)
+        yield TestClient(app)
+        shadow_runner.stop()
+
+    def test_api_run_is_shadowed(self, client, standard_pipeline, challenger, scenario_applications):
+        response = client.put(f"/api/pipelines/{standard_pipeline.id}/shadow", json={"shadow_pipeline_id": challenger.id})
+        assert response.status_code == 200
+        assert client.get(f"/api/pipelines/{standard_pipeline.id}").json()["shadow_pipeline_id"] == challenger.id
+
+        runs_before, shadow_runs_before = metrics.get("runs.total"), metrics.get("shadow.runs.total")
+        response = client.post("/api/runs", json={"application_id": scenario_applications[2].id, "pipeline_id": standard_pipeline.id})
+        assert response.json()["final_status"] == "NEEDS_REVIEW"
+        shadow_runner.wait_idle()
+        # The challenger's run is counted apart from real runs
+        assert metrics.get("runs.total") == runs_before + 1
+        assert metrics.get("shadow.runs.total") == shadow_runs_before + 1
+
+        stats = client.get(f"/api/pipelines/{standard_pipeline.id}/shadow").json()
+        assert stats["runs"] == 1
+        assert stats["outcomes"] == {"NEEDS_REVIEW": {"APPROVED": 1}}
+        assert len(client.get("/api/runs").json()) == 1  # Shadow runs are not real runs
+
+        response = client.delete(f"/api/pipelines/{standard_pipeline.id}/shadow")
+        assert response.json()["shadow_pipeline_id"] is None
+
+    def test_invalid_shadow(self, client, standard_pipeline):
+        assert client.put(f"/api/pipelines/{standard_pipeline.id}/shadow", json={"shadow_pipeline_id": standard_pipeline.id}).status_code == 400
+        assert client.put(f"/api/pipelines/{standard_pipeline.id}/shadow", json={"shadow_pipeline_id": 999}).status_code == 400
@@ -0,0 +1,134 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.services import CompiledPipeline
+from app.services.step_statistics import PipelineStepStats, step_statistics
+from tests.conftest import SCENARIO_APPLICATIONS, STANDARD_RULES
+
+RISK_FIRST_STEPS = [
+    {"step_type": "risk_scoring", "order": 1, "params": {}},
+    {"step_type": "dti_rule", "order": 2, "params": {}},
+    {"step_type": "amount_policy", "order": 3, "params": {}},
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_statistics():
+    yield
+    step_statistics.reset()
+
+
+@pytest.fixture
+def frequent_reorder(monkeypatch):
+    monkeypatch.setattr(settings, "adaptive_order_interval_runs", 3)
+    monkeypatch.setattr(settings, "adaptive_order_min_samples", 1)
+
+
+class TestPipelineStepStats:
+    """Test runtime step statistics and the adaptive order"""
+
+    def test_snapshot(self):
+        stats = PipelineStepStats(1)
+        stats.record_steps([("dti_rule", 0.001, True), ("risk_scoring", 0.003, False)])
+        stats.record_steps([("dti_rule", 0.003, False)])
+        stats.record_decisions([{"dti_rule"}, set()])
+
+        assert stats.runs == 2
+        assert stats.snapshot() == {
+            "dti_rule": {"samples": 2, "mean_latency_ms": 2.0, "pass_rate": 0.5, "decisive_rate": 0.5},
+            "risk_scoring": {"samples": 1, "mean_latency_ms": 3.0, "pass_rate": 0.0, "decisive_rate": 0.0},
+        }
+
+    def test_cheap_decisive_steps_move_first(self, frequent_reorder):
+        stats = PipelineStepStats(1)
+        for _ in range(3):
+            stats.record_steps([("a", 0.010, True), ("b", 0.001, True), ("c", 0.001, False), ("d", 0.001, True)])
+        stats.record_decisions([{"c"}, {"c"}, {"a"}])
+
+        assert stats.reorder_due()
+        # d is not order-independent and keeps its slot
+        assert stats.reorder(["a", "b", "c", "d"], {"a", "b", "c"}) == ["c", "a", "b", "d"]
+        assert not stats.reorder_due()
+        assert stats.snapshot()["a"]["samples"] == 1.5  # halved at recompute
+
+
+class TestAdaptiveExecution:
+    """Test pipelines reordering themselves from runtime statistics"""
+
+    def _pipeline(self, pinned=False):
+        return CompiledPipeline(7, RISK_FIRST_STEPS, STANDARD_RULES, adaptive=not pinned)
+
+    def test_reorders_after_interval(self, frequent_reorder):
+        compiled = self._pipeline()
+        for _ in range(3):
+            final_status, _, _ = compiled.run(SCENARIO_APPLICATIONS[1])  # Luis, rejected by the first rule
+            assert final_status == "REJECTED"
+
+        # risk_scoring never decided a run, so it now runs last
+        assert [step[0] for step in compiled.steps][-1] == "risk_scoring"
+        assert compiled.stats.order[-1] == "risk_scoring"
+        # Pipelines compiled later pick up the adaptive order
+        assert [step[0] for step in self._pipeline().steps] == compiled.stats.order
+
+    def test_pinned_pipeline_keeps_order(self, frequent_reorder):
+        compiled = self._pipeline(pinned=True)
+        for _ in range(3):
+            compiled.run(SCENARIO_APPLICATIONS[1])
+
+        assert compiled.stats.runs == 3
+        assert compiled.stats.order is None
+        assert [step[0] for step in compiled.steps] == ["risk_scoring", "dti_rule", "amount_policy"]
+
+
+class TestExecutionOrderAPI:
+    """Test viewing and pinning the execution order"""
+
+    @pytest.fixture
+    def client(self, db_session, monkeypatch):
+        monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db_session)
+        return TestClient(app)
+
+    @pytest.fixture
+    def pipeline_id(self, client):
+        response = client.post("/api/pipelines", json={
+            "name": "Risk first", "steps": RISK_FIRST_STEPS, "terminal_rules": STANDARD_RULES
+        })
+        return response.json()["id"]
+
+    def test_view(self, client, pipeline_id):
+        response = client.get(f"/api/pipelines/{pipeline_id}/execution-order")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["source"] == "plan"
+        assert data["pinned"] is False
+        assert data["step_order"] == ["dti_rule", "amount_policy", "risk_scoring"]
+
+    def test_pin_and_unpin(self, client, pipeline_id, db_session):
+        order = ["amount_policy", "risk_scoring", "dti_rule"]
+        response = client.put(f"/api/pipelines/{pipeline_id}/execution-order", json={"step_order": order})
+        assert response.status_code == 200
+        assert response.json()["source"] == "pinned"
+        assert response.json()["step_order"] == order
+
+        # The pin survives edits that keep the same steps
+        client.put(f"/api/pipelines/{pipeline_id}", json={"name": "Renamed"})
+        assert client.get(f"/api/pipelines/{pipeline_id}/execution-order").json()["step_order"] == order
+
+        response = client.delete(f"/api/pipelines/{pipeline_id}/execution-order")
+        assert response.json()["pinned"] is False
+        assert response.json()["step_order"] == ["dti_rule", "amount_policy", "risk_scoring"]
+
+    def test_pin_current_order(self, client, pipeline_id):
+        response = client.put(f"/api/pipelines/{pipeline_id}/execution-order", json={})
+
+        assert response.json()["pinned"] is True
+        assert response.json()["step_order"] == ["dti_rule", "amount_policy", "risk_scoring"]
+
+    def test_pin_requires_permutation(self, client, pipeline_id):
+        response = client.put(f"/api/pipelines/{pipeline_id}/execution-order", json={"step_order": ["dti_rule"]})
+        assert response.status_code == 400
+
+        assert client.put("/api/pipelines/999/execution-order", json={}).status_code == 404
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.orm import sessionmaker
+from app.db_models import LoanApplication, PipelineRun
+from app.models import TerminalRule
+from app.services.sweeper import PendingSweeper, sweeper_metrics
+
+
+def _sweeper(db_session, pipeline_id, **kwargs):
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    return PendingSweeper(factory, pipeline_id, **kwargs)
+
+
+def _statuses(db_session):
+    db_session.expire_all()
+    return [app.status for app in db_session.query(LoanApplication).order_by(LoanApplication.id)]
+
+
+class TestPendingSweeper:
+    """Test background processing of PENDING applications"""
+
+    def test_sweep_drains_backlog(self, db_session, standard_pipeline, scenario_applications):
+        before = sweeper_metrics()
+        sweeper = _sweeper(db_session, standard_pipeline.id, chunk_size=2)
+
+        first = sweeper.sweep_once()
+        assert first.processed == 2
+        assert _statuses(db_session) == ["APPROVED", "REJECTED", "PENDING"]
+
+        second = sweeper.sweep_once()
+        assert second.processed == 1
+        assert sweeper.sweep_once().processed == 0
+        assert _statuses(db_session) == ["APPROVED", "REJECTED", "NEEDS_REVIEW"]
+        assert db_session.query(PipelineRun).count() == 3
+
+        after = sweeper_metrics()
+        assert after["sweeps"] == before["sweeps"] + 2
+        assert after["applications"] == before["applications"] + 3
+        assert after["status_counts"]["REJECTED"] == before["status_counts"].get("REJECTED", 0) + 1
+
+    def test_claimed_applications_are_not_taken_twice(self, db_session, standard_pipeline, scenario_applications):
+        sweeper = _sweeper(db_session, standard_pipeline.id, chunk_size=2)
+
+        assert sweeper.claim(db_session) == [scenario_applications[0].id, scenario_applications[1].id]
+        assert sweeper.claim(db_session) == [scenario_applications[2].id]
+        assert sweeper.claim(db_session) == []
+        assert sweeper.release(db_session) == 3
+        assert _statuses(db_session) == ["PENDING"] * 3
+
+    def test_other_sweepers_claims_are_kept(self, db_session, standard_pipeline, scenario_applications):
+        """A sweeper starting or releasing leaves fresh claims of other sweepers alone"""
+        first = _sweeper(db_session, standard_pipeline.id)
+        second = _sweeper(db_session, standard_pipeline.id)
+        assert len(first.claim(db_session)) == 3
+
+        assert second.release_stale(db_session) == 0
+        assert second.release(db_session) == 0
+        assert second.claim(db_session) == []
+        assert _statuses(db_session) == ["PROCESSING"] * 3
+        assert first.release(db_session) == 3
+
+    def test_stale_claims_are_released_and_taken_over(self, db_session, standard_pipeline, scenario_applications):
+        """Claims older than the lease are released on start or claimed again by another sweeper"""
+        crashed = _sweeper(db_session, standard_pipeline.id)
+        survivor = _sweeper(db_session, standard_pipeline.id, claim_lease_seconds=60)
+        crashed.claim(db_session)
+        db_session.query(LoanApplication).filter(LoanApplication.id == scenario_applications[0].id).update(
+            {"claimed_at": datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=5)}
+        )
+        db_session.commit()
+
+        assert survivor.claim(db_session) == [scenario_applications[0].id]
+        db_session.expire_all()
+        assert db_session.get(LoanApplication, scenario_applications[0].id).claimed_by == survivor.owner
+
+        db_session.query(LoanApplication).update({"claimed_at": None})
+        db_session.commit()
+        assert survivor.release_stale(db_session) == 3
+        assert _statuses(db_session) == ["PENDING"] * 3
+
+    def test_failed_sweep_releases_claims(self, db_session, scenario_applications):
+        sweeper = _sweeper(db_session, pipeline_id=999)
+
+        with pytest.raises(ValueError):
+            sweeper.sweep_once()
+        assert _statuses(db_session) == ["PENDING"] * 3
+
+    def test_background_task(self, db_session, standard_pipeline, scenario_applications):
+        sweeper = _sweeper(db_session, standard_pipeline.id, interval_seconds=0.01)
+
+        async def run():
+            sweeper.start()
+            for _ in range(200):
+                if "PENDING" not in _statuses(db_session):
+                    break
+                await asyncio.sleep(0.01)
+            await sweeper.stop()
+
+        asyncio.run(run())
+        assert _statuses(db_session) == ["APPROVED", "REJECTED", "NEEDS_REVIEW"]
+
+    def test_processing_is_not_a_run_outcome(self):
+        """PROCESSING marks a sweeper claim; terminal rules cannot produce it"""
+        with pytest.raises(ValidationError):
+            TerminalRule(condition="else", outcome="PROCESSING", order=1)
@@ -0,0 +1,146 @@
+import random
+import numpy as np
+import pytest
+from app.api.metrics import get_sentiment_metrics
+from app.config import settings
+from app.metrics import metrics
+from app.sentiment import TextRiskModel, local_text_model
+from app.sentiment.text_model import training_example
+from app.steps import sentiment_check
+from app.steps.sentiment_check import SentimentCheck
+
+SAFE = ["home improvement", "education", "car repair", "wedding", "medical bills", "tuition fees"]
+RISKY = ["crypto trading", "casino trip", "sports betting", "bitcoin investment", "poker tournament", "lottery tickets"]
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = random.Random(7)
+    purposes, scores = [], []
+    for _ in range(300):
+        if rng.random() < 0.5:
+            purposes.append(f"{rng.choice(SAFE)} {rng.choice(['', 'for family', 'plan'])}")
+            scores.append(rng.randint(5, 25))
+        else:
+            purposes.append(f"{rng.choice(RISKY)} {rng.choice(['', 'for family', 'plan'])}")
+            scores.append(rng.randint(80, 95))
+    return TextRiskModel.train(purposes, scores, n_features=2 ** 12)
+
+
+class TestTextRiskModel:
+    """Test the hashed n-gram text-risk classifier"""
+
+    def test_separates_safe_and_risky(self, model):
+        safe_score, _ = model.predict("Home improvement")
+        risky_score, _ = model.predict("casino plan")
+        assert safe_score < 45 <= risky_score
+
+    def test_batch_matches_single(self, model):
+        purposes = ["education", "sports betting for family", "", "something new"]
+        scores, confidences = model.predict_batch(purposes)
+
+        assert scores.tolist() == [model.predict(purpose)[0] for purpose in purposes]
+        assert np.allclose(confidences, [model.predict(purpose)[1] for purpose in purposes])
+
+    def test_save_and_load(self, model, tmp_path):
+        path = str(tmp_path / "model.npz")
+        model.save(path)
+        loaded = TextRiskModel.load(path)
+
+        assert loaded.metadata == {"samples": 300}
+        assert loaded.predict("crypto trading") == model.predict("crypto trading")
+        assert local_text_model.load(str(tmp_path / "missing.npz")) is None
+
+    def test_training_example(self):
+        logs = [
+            {"step_type": "dti_rule", "computed_values": {}},
+            {"step_type": "sentiment_check", "computed_values": {
+                "loan_purpose": "casino", "risk_score": 90, "analysis_method": "openai_api"
+            }},
+        ]
+        assert training_example(logs) == ("casino", 90)
+        logs[1]["computed_values"]["analysis_method"] = "keyword_matching"
+        assert training_example(logs) is None
+
+
+class TestLocalModelAnalyzer:
+    """Test SentimentCheck's local_model analyzer"""
+
+    def test_uses_loaded_model(self, model, monkeypatch):
+        monkeypatch.setattr(local_text_model, "model", model)
+        result = SentimentCheck().execute({"loan_purpose": "sports betting"}, {"analyzer": "local_model"})
+
+        assert result.computed_values["analysis_method"] == "local_model"
+        assert result.computed_values["risk_score"] == model.predict("sports betting")[0]
+        assert result.computed_values["detected_risks"] == ["betting", "sports betting"]
+        assert not result.passed
+
+    def test_falls_back_to_keywords(self, monkeypatch):
+        monkeypatch.setattr(local_text_model, "model", None)
+        result = SentimentCheck().execute({"loan_purpose": "home improvement"}, {"analyzer": "local_model"})
+
+        assert result.computed_values["analysis_method"] == "keyword_matching"
+        assert result.passed
+
+
+class TestCascade:
+    """Test escalating only unsure purposes to the LLM"""
+
+    def _decided(self):
+        return metrics.snapshot("sentiment.cascade.decided.")
+
+    def _run(self, purpose, **params):
+        return SentimentCheck().execute({"loan_purpose": purpose}, {"analyzer": "cascade", **params})
+
+    def test_keyword_hit_skips_llm(self, model, fake_llm, monkeypatch):
+        monkeypatch.setattr(local_text_model, "model", model)
+        before = self._decided()
+        result = self._run("weekend at the casino")
+
+        assert result.computed_values["analysis_method"] == "keyword_matching"
+        assert fake_llm.requests == 0
+        assert self._decided()["keywords"] == before.get("keywords", 0) + 1
+
+    def test_confident_local_model_skips_llm(self, model, fake_llm, monkeypatch):
+        monkeypatch.setattr(local_text_model, "model", model)
+        result = self._run("home improvement")
+
+        assert result.computed_values["analysis_method"] == "local_model"
+        assert fake_llm.requests == 0
+
+    def test_unsure_purpose_goes_to_llm(self, model, fake_llm, monkeypatch):
+        monkeypatch.setattr(local_text_model, "model", model)
+        before = metrics.get("sentiment.tier.llm.calls")
+        result = self._run("something unusual", cascade_threshold=0.99)
+
+        assert result.computed_values["analysis_method"] == "openai_api"
+        assert fake_llm.requests == 1
+        assert metrics.get("sentiment.tier.llm.calls") == before + 1
+
+    def test_falls_back_without_llm(self, monkeypatch):
+        monkeypatch.setattr(local_text_model, "model", None)
+        monkeypatch.setattr(settings, "openai_api_key", None)
+        before = self._decided()
+        result = self._run("home improvement")
+
+        assert result.computed_values["analysis_method"] == "keyword_matching"
+        assert self._decided()["fallback"] == before.get("fallback", 0) + 1
+
+    @pytest.mark.parametrize("provider", ["no_api_key", "breaker_open"])
+    def test_skipped_llm_is_not_counted(self, model, fake_llm, monkeypatch, provider):
+        """The llm tier only counts calls that reached the provider"""
+        monkeypatch.setattr(local_text_model, "model", model)
+        if provider == "no_api_key":
+            monkeypatch.setattr(settings, "openai_api_key", None)
+        else:
+            breaker = sentiment_check.openai_guard.breaker
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+        before = metrics.snapshot("sentiment.tier.llm.")
+        avoided = get_sentiment_metrics()["llm_calls_avoided"]
+        result = self._run("something unusual", cascade_threshold=0.99)
+
+        assert result.computed_values["analysis_method"] == "local_model"
+        assert fake_llm.requests == 0
+        assert metrics.snapshot("sentiment.tier.llm.") == before
+        assert get_sentiment_metrics()["llm_calls_avoided"] == avoided + 1
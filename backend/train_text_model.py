@@ -0,0 +1,72 @@
+"""
+Train the local text-risk classifier used by SentimentCheck's local_model analyzer
+
+Reads the loan purposes and risk scores the LLM assigned in stored runs,
+fits a hashed n-gram logistic regression (app/sentiment/text_model.py) and
+saves it where the server loads it at startup (TEXT_MODEL_PATH).
+
+Usage:
+    uv run python train_text_model.py
+    uv run python train_text_model.py --output ./text_risk_model.npz --epochs 300
+"""
+import argparse
+import json
+import numpy as np
+from app.config import settings
+from app.database import SessionLocal
+from app.db_models import PipelineRun
+from app.sentiment.text_model import TextRiskModel, training_example
+
+
+def load_examples(db):
+    """(loan_purpose, risk_score) of every stored run the LLM scored"""
+    purposes, scores = [], []
+    runs = db.query(PipelineRun.step_logs).filter(PipelineRun.step_logs.like('%"openai_api"%')).yield_per(1000)
+    for (step_logs,) in runs:
+        example = training_example(json.loads(step_logs))
+        if example is not None:
+            purposes.append(example[0])
+            scores.append(example[1])
+    return purposes, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", default=settings.text_model_path, help="Where to save the model")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--min-samples", type=int, default=50, help="Refuse to train on fewer LLM-scored runs")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share of examples held out to report error")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        purposes, scores = load_examples(db)
+    finally:
+        db.close()
+
+    if len(purposes) < args.min_samples:
+        raise SystemExit(f"Only {len(purposes)} LLM-scored runs found, need at least {args.min_samples}")
+
+    # Every n-th example is held out, so the split is stable across runs
+    step = max(2, round(1 / args.holdout)) if args.holdout > 0 else 0
+    held_out = [i for i in range(len(purposes)) if step and i % step == 0]
+    held = set(held_out)
+    train = [i for i in range(len(purposes)) if i not in held]
+
+    model = TextRiskModel.train([purposes[i] for i in train], [scores[i] for i in train], epochs=args.epochs)
+    if held_out:
+        predicted, _ = model.predict_batch([purposes[i] for i in held_out])
+        error = np.abs(predicted - np.array([scores[i] for i in held_out])).mean()
+        print(f"Held-out mean absolute error: {error:.1f} points over {len(held_out)} examples")
+
+    # Retrain on everything for the saved model
+    model = TextRiskModel.train(purposes, scores, epochs=args.epochs)
+    model.save(args.output)
+    print(f"Saved model trained on {len(purposes)} examples to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,10 @@ export const applications = {
     const response = await api.post('/applications', data);
     return response.data;
   },
+  runs: async (id, params = {}) => {
+    const response = await api.get(`/applications/${id}/runs`, { params });
+    return response.data;
+  },
 };
 
 // Pipelines API
@@ -41,6 +45,10 @@ export const pipelines = {
     const response = await api.put(`/pipelines/${id}`, data);
     return response.data;
   },
+  runs: async (id, params = {}) => {
+    const response = await api.get(`/pipelines/${id}/runs`, { params });
+    return response.data;
+  },
   delete: async (id) => {
     const response = await api.delete(`/pipelines/${id}`);
     return response.data;
@@ -57,12 +65,32 @@ export const runs = {
     const response = await api.get(`/runs/${id}`);
     return response.data;
   },
+  latest: async (params = {}) => {
+    const response = await api.get('/runs/latest', { params });
+    return response.data;
+  },
   execute: async (data) => {
     const response = await api.post('/runs', data);
     return response.data;
   },
 };
 
+// Run summaries API (run history rows without logs)
+export const runSummaries = {
+  list: async (params = {}) => {
+    const response = await api.get('/run-summaries', { params });
+    return response.data;
+  },
+};
+
+// Exports API (Parquet / Arrow files)
+export const exports = {
+  applications: async (params = {}) => {
+    const response = await api.get('/export/applications', { params, responseType: 'blob' });
+    return response.data;
+  },
+};
+
 // Step Catalog API
 export const catalog = {
   getSteps: async () => {
@@ -25,6 +25,7 @@ function ApplicationsPage() {
       REJECTED: 'destructive',
       NEEDS_REVIEW: 'warning',
       PENDING: 'outline',
+      PROCESSING: 'outline',
     };
     return <Badge variant={variants[status] || 'default'}>{status}</Badge>;
   };
@@ -1,6 +1,6 @@
 import { useState, Fragment } from 'react';
 import { useQuery } from '@tanstack/react-query';
-import { runs } from '@/lib/api';
+import { runs, runSummaries } from '@/lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import {
   Table,
@@ -13,12 +13,140 @@ import {
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 
+function RunDetails({ runId, getStatusBadge }) {
+  const { data: run, isLoading, error } = useQuery({
+    queryKey: ['runs', runId],
+    queryFn: () => runs.get(runId),
+  });
+
+  if (isLoading) {
+    return <div className="text-muted-foreground">Loading run details...</div>;
+  }
+
+  if (error) {
+    return <div className="text-destructive">Error loading run: {error.message}</div>;
+  }
+
+  return (
+    <div className="space-y-4 mt-2">
+      {/* Step Logs */}
+      <Card>
+        <CardHeader>
+          <CardTitle className="text-base">Step Logs</CardTitle>
+        </CardHeader>
+        <CardContent className="space-y-3">
+          {run.step_logs && run.step_logs.map((log, index) => (
+            <div key={index} className="border-l-4 pl-4 py-2" style={{
+              borderLeftColor: log.passed ? '#22c55e' : '#ef4444'
+            }}>
+              <div className="flex items-center gap-2 mb-1">
+                <span className={log.passed ? 'text-green-600' : 'text-red-600'}>
+                  {log.passed ? '✓' : '✗'}
+                </span>
+                <span className="font-medium">{log.step_type}</span>
+                <Badge variant={log.passed ? 'success' : 'destructive'} className="ml-2">
+                  {log.passed ? 'Passed' : 'Failed'}
+                </Badge>
+              </div>
+              <div className="text-xs space-y-2 mt-2">
+                {log.message && (
+                  <div className="text-muted-foreground">
+                    {log.message}
+                  </div>
+                )}
+                {log.computed_values && Object.keys(log.computed_values).length > 0 && (
+                  <div>
+                    <span className="font-medium">Computed Values:</span>
+                    <pre className="bg-muted p-2 rounded overflow-auto mt-1">
+                      {JSON.stringify(log.computed_values, null, 2)}
+                    </pre>
+                  </div>
+                )}
+              </div>
+            </div>
+          ))}
+        </CardContent>
+      </Card>
+
+      {/* Terminal Rule Logs */}
+      <Card>
+        <CardHeader>
+          <CardTitle className="text-base">Terminal Rules Evaluation</CardTitle>
+        </CardHeader>
+        <CardContent className="space-y-3">
+          {run.terminal_rule_logs && run.terminal_rule_logs.map((log, index) => {
+            // Determine background color and border based on match and outcome
+            let borderColor = '#d1d5db'; // default gray
+            let bgColor = '';
+
+            if (log.matched) {
+              // Matched rule gets a light background based on outcome
+              if (log.outcome === 'APPROVED') {
+                borderColor = '#86efac'; // green-300
+                bgColor = 'bg-green-50';
+              } else if (log.outcome === 'REJECTED') {
+                borderColor = '#fca5a5'; // red-300
+                bgColor = 'bg-red-50';
+              } else if (log.outcome === 'NEEDS_REVIEW') {
+                borderColor = '#fde047'; // yellow-300
+                bgColor = 'bg-yellow-50';
+              }
+            } else if (!log.evaluated) {
+              // Not evaluated rules are more grayed out
+              borderColor = '#e5e7eb'; // gray-200
+              bgColor = 'bg-gray-50';
+            }
+
+            return (
+              <div
+                key={index}
+                className={`border-l-4 pl-4 py-2 rounded-r ${bgColor} ${!log.evaluated ? 'opacity-80' : ''}`}
+                style={{ borderLeftColor: borderColor }}
+              >
+                <div className="flex items-center gap-2 mb-1">
+                  <span className={log.matched ? 'text-blue-600' : !log.evaluated ? 'text-gray-300' : 'text-gray-400'}>
+                    {log.matched ? '→' : '○'}
+                  </span>
+                  <span className={`font-medium ${!log.evaluated ? 'text-gray-400' : ''}`}>Rule {log.order}</span>
+                  {log.matched && (
+                    <Badge variant="default" className="ml-2">MATCHED</Badge>
+                  )}
+                  {log.evaluated && !log.matched && (
+                    <Badge variant="outline" className="ml-2">Evaluated</Badge>
+                  )}
+                  {!log.evaluated && (
+                    <Badge variant="secondary" className="ml-2 opacity-90">Not Evaluated</Badge>
+                  )}
+                </div>
+                <div className={`text-xs space-y-1 mt-2 ${!log.evaluated ? 'text-gray-700' : ''}`}>
+                  <div>
+                    <span className="font-medium">Condition:</span>{' '}
+                    <code className="bg-muted px-1 py-0.5 rounded">{log.condition}</code>
+                  </div>
+                  <div>
+                    <span className="font-medium">Outcome:</span>{' '}
+                    {getStatusBadge(log.outcome)}
+                  </div>
+                  <div>
+                    <span className="font-medium">Reason:</span>{' '}
+                    <span className="text-muted-foreground">{log.reason}</span>
+                  </div>
+                </div>
+              </div>
+            );
+          })}
+        </CardContent>
+      </Card>
+    </div>
+  );
+}
+
 function RunHistoryPage() {
   const [expandedRun, setExpandedRun] = useState(null);
 
   const { data: runsList, isLoading, error } = useQuery({
-    queryKey: ['runs'],
-    queryFn: runs.list,
+    queryKey: ['run-summaries'],
+    queryFn: runSummaries.list,
   });
 
   const getStatusBadge = (status) => {
@@ -68,13 +196,13 @@ function RunHistoryPage() {
               </TableHeader>
               <TableBody>
                 {runsList?.map((run) => (
-                  <Fragment key={run.id}>
+                  <Fragment key={run.run_id}>
                     <TableRow>
                       <TableCell className="font-medium">
-                        {run.application?.applicant_name || `App #${run.application_id}`}
+                        {run.applicant_name}
                       </TableCell>
                       <TableCell>
-                        {run.pipeline?.name || `Pipeline #${run.pipeline_id}`}
+                        {run.pipeline_name}
                       </TableCell>
                       <TableCell>{getStatusBadge(run.final_status)}</TableCell>
                       <TableCell>
@@ -84,125 +212,16 @@ function RunHistoryPage() {
                         <Button
                           variant="outline"
                           size="sm"
-                          onClick={() => toggleExpand(run.id)}
+                          onClick={() => toggleExpand(run.run_id)}
                         >
-                          {expandedRun === run.id ? 'Hide' : 'View'} Details
+                          {expandedRun === run.run_id ? 'Hide' : 'View'} Details
                         </Button>
                       </TableCell>
                     </TableRow>
-                    {expandedRun === run.id && (
+                    {expandedRun === run.run_id && (
                       <TableRow>
                         <TableCell colSpan={5}>
-                          <div className="space-y-4 mt-2">
-                            {/* Step Logs */}
-                            <Card>
-                              <CardHeader>
-                                <CardTitle className="text-base">Step Logs</CardTitle>
-                              </CardHeader>
-                              <CardContent className="space-y-3">
-                                {run.step_logs && run.step_logs.map((log, index) => (
-                                  <div key={index} className="border-l-4 pl-4 py-2" style={{
-                                    borderLeftColor: log.passed ? '#22c55e' : '#ef4444'
-                                  }}>
-                                    <div className="flex items-center gap-2 mb-1">
-                                      <span className={log.passed ? 'text-green-600' : 'text-red-600'}>
-                                        {log.passed ? '✓' : '✗'}
-                                      </span>
-                                      <span className="font-medium">{log.step_type}</span>
-                                      <Badge variant={log.passed ? 'success' : 'destructive'} className="ml-2">
-                                        {log.passed ? 'Passed' : 'Failed'}
-                                      </Badge>
-                                    </div>
-                                    <div className="text-xs space-y-2 mt-2">
-                                      {log.message && (
-                                        <div className="text-muted-foreground">
-                                          {log.message}
-                                        </div>
-                                      )}
-                                      {log.computed_values && Object.keys(log.computed_values).length > 0 && (
-                                        <div>
-                                          <span className="font-medium">Computed Values:</span>
-                                          <pre className="bg-muted p-2 rounded overflow-auto mt-1">
-                                            {JSON.stringify(log.computed_values, null, 2)}
-                                          </pre>
-                                        </div>
-                                      )}
-                                    </div>
-                                  </div>
-                                ))}
-                              </CardContent>
-                            </Card>
-
-                            {/* Terminal Rule Logs */}
-                            <Card>
-                              <CardHeader>
-                                <CardTitle className="text-base">Terminal Rules Evaluation</CardTitle>
-                              </CardHeader>
-                              <CardContent className="space-y-3">
-                                {run.terminal_rule_logs && run.terminal_rule_logs.map((log, index) => {
-                                  // Determine background color and border based on match and outcome
-                                  let borderColor = '#d1d5db'; // default gray
-                                  let bgColor = '';
-
-                                  if (log.matched) {
-                                    // Matched rule gets a light background based on outcome
-                                    if (log.outcome === 'APPROVED') {
-                                      borderColor = '#86efac'; // green-300
-                                      bgColor = 'bg-green-50';
-                                    } else if (log.outcome === 'REJECTED') {
-                                      borderColor = '#fca5a5'; // red-300
-                                      bgColor = 'bg-red-50';
-                                    } else if (log.outcome === 'NEEDS_REVIEW') {
-                                      borderColor = '#fde047'; // yellow-300
-                                      bgColor = 'bg-yellow-50';
-                                    }
-                                  } else if (!log.evaluated) {
-                                    // Not evaluated rules are more grayed out
-                                    borderColor = '#e5e7eb'; // gray-200
-                                    bgColor = 'bg-gray-50';
-                                  }
-
-                                  return (
-                                    <div
-                                      key={index}
-                                      className={`border-l-4 pl-4 py-2 rounded-r ${bgColor} ${!log.evaluated ? 'opacity-80' : ''}`}
-                                      style={{ borderLeftColor: borderColor }}
-                                    >
-                                      <div className="flex items-center gap-2 mb-1">
-                                        <span className={log.matched ? 'text-blue-600' : !log.evaluated ? 'text-gray-300' : 'text-gray-400'}>
-                                          {log.matched ? '→' : '○'}
-                                        </span>
-                                        <span className={`font-medium ${!log.evaluated ? 'text-gray-400' : ''}`}>Rule {log.order}</span>
-                                        {log.matched && (
-                                          <Badge variant="default" className="ml-2">MATCHED</Badge>
-                                        )}
-                                        {log.evaluated && !log.matched && (
-                                          <Badge variant="outline" className="ml-2">Evaluated</Badge>
-                                        )}
-                                        {!log.evaluated && (
-                                          <Badge variant="secondary" className="ml-2 opacity-90">Not Evaluated</Badge>
-                                        )}
-                                      </div>
-                                      <div className={`text-xs space-y-1 mt-2 ${!log.evaluated ? 'text-gray-700' : ''}`}>
-                                        <div>
-                                          <span className="font-medium">Condition:</span>{' '}
-                                          <code className="bg-muted px-1 py-0.5 rounded">{log.condition}</code>
-                                        </div>
-                                        <div>
-                                          <span className="font-medium">Outcome:</span>{' '}
-                                          {getStatusBadge(log.outcome)}
-                                        </div>
-                                        <div>
-                                          <span className="font-medium">Reason:</span>{' '}
-                                          <span className="text-muted-foreground">{log.reason}</span>
-                                        </div>
-                                      </div>
-                                    </div>
-                                  );
-                                })}
-                              </CardContent>
-                            </Card>
-                          </div>
+                          <RunDetails runId={run.run_id} getStatusBadge={getStatusBadge} />
                         </TableCell>
                       </TableRow>
                     )}